@@ -0,0 +1,55 @@
+import sys
+import time
+import tracemalloc
+
+from meditrack_store import CSVManager, Record, TableCache
+
+# Memory benchmark for the slotted record types in meditrack_store.py.
+#
+# Builds the same synthetic rows once as dicts (what the managers return by
+# default) and once as Record instances (as_records=True), and prints the
+# memory held per row by each. Nothing is read from or written to disk.
+#
+#     python bench_records.py [rows]
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+
+def synthetic_row(filename, number):
+    """A plausible raw row for any table, in its layout order"""
+    values = []
+    for column in CSVManager.TABLES[filename]:
+        if column.endswith("ID"):
+            values.append(f"{number * 7919 % 16 ** 8:08x}")
+        elif "Date" in column or column == "DOB":
+            values.append(f"2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}")
+        else:
+            values.append(f"{column.lower()} {number % 1000}")
+    return values
+
+
+def measure(build, rows):
+    tracemalloc.start()
+    started = time.perf_counter()
+    built = [build(row) for row in rows]
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, size, elapsed
+
+
+def main():
+    print(f"{'table':<22}{'dict B/row':>12}{'record B/row':>14}{'saved':>8}{'dict s':>9}{'record s':>10}")
+    for filename, record_type in Record.TYPES.items():
+        rows = [synthetic_row(filename, number) for number in range(ROWS)]
+        headers = CSVManager.TABLES[filename]
+        dicts, dict_size, dict_time = measure(lambda row: TableCache._to_dict(headers, row), rows)
+        del dicts
+        records, record_size, record_time = measure(record_type.from_row, rows)
+        del records
+        print(f"{filename:<22}{dict_size / ROWS:>12.0f}{record_size / ROWS:>14.0f}"
+              f"{1 - record_size / dict_size:>8.0%}{dict_time:>9.2f}{record_time:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,17 @@
-import csv
 import os
+import sys
+import time
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk
 from tkcalendar import DateEntry
 from PIL import Image, ImageTk
-import uuid
 from datetime import datetime
 
-class CSVManager:
-    @staticmethod
-    def create_csv_files():
-        files = {
-            "patients.csv": ["Patient ID", "Name", "DOB", "Gender", "Contact", "Address", "Blood Type", "Allergies"],
-            "appointments.csv": ["Appointment ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name", "Date", "Time", "Reason", "Status"],
-            "doctors.csv": ["Doctor ID", "Name", "Specialization", "Contact No.", "License Number"],
-            "billing.csv": ["Invoice ID", "Patient ID", "Patient Name", "Amount", "Payment Method", "Status", "Date"],
-            "prescriptions.csv": ["Prescription ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name", 
-                                 "Medication", "Dosage", "Instructions", "Issue Date", "Expiry Date"],
-            "medical_records.csv": ["Record ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name", 
-                                   "Visit Date", "Diagnosis", "Treatment", "Notes", "Follow Up"],
-            "admin.csv": ["Username", "Password"],
-            "doctor_login.csv": ["Doctor ID", "Password"],
-            "patient_login.csv": ["Patient ID", "Password"]
-        }
-
-        for filename, headers in files.items():
-            if not os.path.exists(filename):
-                with open(filename, mode='w', newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(headers)
-                    if filename == "admin.csv":
-                        writer.writerow(["admin1", "admin"])  # Default admin credentials
-                    elif filename == "patient_login.csv":
-                        writer.writerow(["1001", "patient1"])  # Default patient credentials
+import meditrack_auth
+import meditrack_fuzzy
+from meditrack_store import (AppendJournal, Appointment, BulkImportManager, ChangeLog, CSVManager, CSVScanner,
+                             FuzzyIndex, IDAllocator, MedicalRecord, NameResolver, Payment, PrefixIndex,
+                             Prescription, RowIndex, TableCache, TableLock, TopK, TrigramIndex, TypedColumns)
 
 class BackgroundManager:
     @staticmethod
@@ -46,49 +25,96 @@ class BackgroundManager:
             return bg_canvas
         return None
 
-class SearchSortManager:
+class TypeAheadPicker(ttk.Combobox):
+    """Editable combobox that lists only the top matches for the text typed so far.
+
+    complete(prefix, limit) returns matching rows (e.g. PatientManager.complete_patients)
+    and label(row) the text shown for one; selected() gives back the chosen row.
+    """
+    LIMIT = 20
+    NAVIGATION_KEYS = {"Up", "Down", "Left", "Right", "Return", "Escape", "Tab", "Home", "End"}
+
+    def __init__(self, parent, complete, label, limit=None, **options):
+        super().__init__(parent, **options)
+        self._complete = complete
+        self._label = label
+        self._limit = limit or TypeAheadPicker.LIMIT
+        self._matches = {}
+        self.bind("<KeyRelease>", self._on_key)
+        self._refresh("")
+
+    def _on_key(self, event):
+        if event.keysym not in TypeAheadPicker.NAVIGATION_KEYS:
+            self._refresh(self.get())
+
+    def _refresh(self, text):
+        rows = self._complete(text, self._limit)
+        self._matches = {self._label(row): row for row in rows}
+        self["values"] = list(self._matches)
+
+    def selected(self):
+        """The row of the chosen entry; typed text that matches exactly one row selects it too"""
+        text = self.get()
+        row = self._matches.get(text)
+        if row is None and text.strip():
+            rows = self._complete(text, 2)
+            if len(rows) == 1:
+                row = rows[0]
+                self.set(self._label(row))
+        return row
+
+class LoginManager:
+    """Password checks against a cached credential map per login file.
+
+    Each map is built once and rebuilt only when its file or change log
+    changes, so finding a user is a dict lookup; the cost of a login is the
+    PBKDF2 check itself. auth_stats keeps the two apart.
+    """
+    auth_stats = {"attempts": 0, "lookup_seconds": 0.0, "hash_seconds": 0.0}
+    _credentials = {}  # file_name -> (table signature, {username: (row key, stored password)})
+
     @staticmethod
-    def bubble_sort(data, sort_key, ascending=True):
-        """Bubble sort implementation for sorting data"""     #arshdeep's code
-        n = len(data)            
-        for i in range(n):
-            for j in range(0, n-i-1):
-                # Handle numeric values differently from strings
-                try:
-                    val1 = float(data[j][sort_key])
-                    val2 = float(data[j+1][sort_key])
-                except (ValueError, KeyError):
-                    val1 = str(data[j][sort_key]).lower()
-                    val2 = str(data[j+1][sort_key]).lower()
-                
-                if ascending:
-                    if val1 > val2:
-                        data[j], data[j+1] = data[j+1], data[j]
-                else:
-                    if val1 < val2:
-                        data[j], data[j+1] = data[j+1], data[j]
-        return data
+    def _get_credentials(file_name):
+        # Login tables are never journaled and hold no names, so they are read directly
+        # rather than through iter_raw_rows, which flushes the journal: never under a table lock
+        with TableLock.shared(file_name):
+            signature = TableCache._table_signature(file_name)
+            cached = LoginManager._credentials.get(file_name)
+            if cached is None or cached[0] != signature:
+                credentials = {}
+                for row in TableCache._read_values(file_name)[1]:
+                    if len(row) >= 2:
+                        credentials.setdefault(row[0].strip(), (row[0], row[1].strip()))
+                cached = (signature, credentials)
+                LoginManager._credentials[file_name] = cached
+            return cached[1]
 
     @staticmethod
-    def linear_search(data, search_key, search_value):
-        """Linear search implementation to find matching records"""
-        results = []             #arshdeep's code
-        for record in data:
-            if str(search_value).lower() in str(record.get(search_key, '')).lower():
-                results.append(record)
-        return results
+    def _upgrade_password(file_name, username, password):
+        """Replace a plaintext or outdated hash after a successful login"""
+        with TableLock.exclusive(file_name):
+            credentials = LoginManager._get_credentials(file_name)
+            key = credentials[username][0]
+            stored = meditrack_auth.hash_password(password)
+            ChangeLog.update(file_name, key, "Password", stored)
+            credentials[username] = (key, stored)
+            LoginManager._credentials[file_name] = (TableCache._table_signature(file_name), credentials)
 
-class LoginManager:
     @staticmethod
     def verify_login(username, password, file_name):
         try:
-            with open(file_name, mode='r') as file:
-                reader = csv.reader(file)
-                next(reader)  # Skip header
-                for row in reader:
-                    if username == row[0].strip() and password == row[1].strip():
-                        return True
-            return False
+            started = time.perf_counter()
+            entry = LoginManager._get_credentials(file_name).get(username)
+            stored = entry[1] if entry else None
+            looked_up = time.perf_counter()
+            valid = meditrack_auth.check_password(password, stored)
+            stats = LoginManager.auth_stats
+            stats["attempts"] += 1
+            stats["lookup_seconds"] += looked_up - started
+            stats["hash_seconds"] += time.perf_counter() - looked_up
+            if valid and meditrack_auth.needs_rehash(stored):
+                LoginManager._upgrade_password(file_name, username, password)
+            return valid
         except Exception as e:
             messagebox.showerror("Login Error", f"Error: {e}")
             return False
@@ -97,16 +123,13 @@ class PatientManager:
     @staticmethod
     def register_patient(name, dob, gender, contact, address, blood_type, allergies):
         try:
-            patient_id = str(uuid.uuid4())[:8]
+            patient_id = IDAllocator.new_id("patients.csv")
             patient_data = [patient_id, name, dob, gender, contact, address, blood_type, allergies]
             
-            with open("patients.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(patient_data)
+            TableCache.append_row("patients.csv", patient_data)
             
-            with open("patient_login.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([patient_id, patient_id])  # Using patient ID as initial password
+            # Using patient ID as initial password
+            TableCache.append_row("patient_login.csv", [patient_id, meditrack_auth.hash_password(patient_id)])
             
             messagebox.showinfo("Success", f"Patient registered successfully!\nPatient ID: {patient_id}")
             return True
@@ -115,48 +138,29 @@ class PatientManager:
             return False
 
     @staticmethod
-    def view_all_patients():
+    def view_all_patients(as_records=False):
+        """All rows as dicts, or as Patient records when as_records is set"""
         try:
-            patients = []
-            with open("patients.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    patients.append(row)
-            return patients
+            if as_records:
+                return list(TableCache.get_records("patients.csv"))
+            return list(TableCache.get_rows("patients.csv"))
         except Exception as e:
             messagebox.showerror("View Error", f"Error: {e}")
             return []
 
+    @staticmethod
+    def iter_patients(predicate=None):
+        """Yield patients one at a time, optionally only those matching predicate"""
+        try:
+            yield from CSVManager.iter_rows("patients.csv", predicate)
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
     @staticmethod
     def delete_patient(patient_id):
         try:
-            # Delete from patients.csv
-            updated_patients = []
-            with open("patients.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_patients.append(headers)
-                for row in reader:
-                    if row[0] != patient_id:
-                        updated_patients.append(row)
-            
-            with open("patients.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_patients)
-            
-            # Delete from patient_login.csv
-            updated_logins = []
-            with open("patient_login.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_logins.append(headers)
-                for row in reader:
-                    if row[0] != patient_id:
-                        updated_logins.append(row)
-            
-            with open("patient_login.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_logins)
+            ChangeLog.delete("patients.csv", patient_id)
+            ChangeLog.delete("patient_login.csv", patient_id)
             
             messagebox.showinfo("Success", f"Patient {patient_id} deleted successfully!")
             return True
@@ -165,14 +169,51 @@ class PatientManager:
             return False
 
     @staticmethod
-    def get_patient_details(patient_id):
+    def delete_patient_cascade(patient_id):
+        """Delete a patient with their login, appointments, prescriptions, records and bills.
+
+        Returns the number of rows deleted per table, or None on failure.
+        """
         try:
-            with open("patients.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if row['Patient ID'] == patient_id:
-                        return row
+            counts = ChangeLog.cascade_delete("Patient ID", patient_id)
+            summary = "\n".join(f"{filename}: {count}" for filename, count in counts.items())
+            messagebox.showinfo("Success", f"Patient {patient_id} deleted successfully!\n\nRows removed:\n{summary}")
+            return counts
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
             return None
+
+    @staticmethod
+    def search_patients(field, term):
+        """Rows whose field contains term, ignoring case, found through the trigram index"""
+        try:
+            return TrigramIndex.search("patients.csv", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def fuzzy_search_patients(term, max_distance=None):
+        """Patients whose name is within max_distance edits of term (word by word), closest first"""
+        try:
+            return [row for _, row in FuzzyIndex.search("patients.csv", "Name", term, max_distance)]
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def complete_patients(prefix, limit=20):
+        """Up to limit patients whose ID, name or a word of the name starts with prefix"""
+        try:
+            return PrefixIndex.complete("patients.csv", prefix, limit)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def get_patient_details(patient_id):
+        try:
+            return RowIndex.lookup("patients.csv", patient_id)
         except Exception as e:
             messagebox.showerror("Error", f"Could not fetch patient details: {e}")
             return None
@@ -181,16 +222,13 @@ class DoctorManager:
     @staticmethod
     def add_doctor(name, specialization, contact, license_no):
         try:
-            doctor_id = str(uuid.uuid4())[:8]
+            doctor_id = IDAllocator.new_id("doctors.csv")
             doctor_data = [doctor_id, name, specialization, contact, license_no]
             
-            with open("doctors.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(doctor_data)
+            TableCache.append_row("doctors.csv", doctor_data)
             
-            with open("doctor_login.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([doctor_id, doctor_id])  # Using doctor ID as initial password
+            # Using doctor ID as initial password
+            TableCache.append_row("doctor_login.csv", [doctor_id, meditrack_auth.hash_password(doctor_id)])
             
             messagebox.showinfo("Success", f"Doctor added successfully!\nDoctor ID: {doctor_id}")
             return True
@@ -199,48 +237,29 @@ class DoctorManager:
             return False
 
     @staticmethod
-    def view_all_doctors():
+    def view_all_doctors(as_records=False):
+        """All rows as dicts, or as Doctor records when as_records is set"""
         try:
-            doctors = []
-            with open("doctors.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    doctors.append(row)
-            return doctors
+            if as_records:
+                return list(TableCache.get_records("doctors.csv"))
+            return list(TableCache.get_rows("doctors.csv"))
         except Exception as e:
             messagebox.showerror("View Error", f"Error: {e}")
             return []
 
+    @staticmethod
+    def iter_doctors(predicate=None):
+        """Yield doctors one at a time, optionally only those matching predicate"""
+        try:
+            yield from CSVManager.iter_rows("doctors.csv", predicate)
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
     @staticmethod
     def delete_doctor(doctor_id):
         try:
-            # Delete from doctors.csv
-            updated_doctors = []
-            with open("doctors.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_doctors.append(headers)
-                for row in reader:
-                    if row[0] != doctor_id:
-                        updated_doctors.append(row)
-            
-            with open("doctors.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_doctors)
-            
-            # Delete from doctor_login.csv
-            updated_logins = []
-            with open("doctor_login.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_logins.append(headers)
-                for row in reader:
-                    if row[0] != doctor_id:
-                        updated_logins.append(row)
-            
-            with open("doctor_login.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_logins)
+            ChangeLog.delete("doctors.csv", doctor_id)
+            ChangeLog.delete("doctor_login.csv", doctor_id)
             
             messagebox.showinfo("Success", f"Doctor {doctor_id} deleted successfully!")
             return True
@@ -249,14 +268,51 @@ class DoctorManager:
             return False
 
     @staticmethod
-    def get_doctor_details(doctor_id):
+    def delete_doctor_cascade(doctor_id):
+        """Delete a doctor with their login, appointments, prescriptions and records.
+
+        Returns the number of rows deleted per table, or None on failure.
+        """
         try:
-            with open("doctors.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if row['Doctor ID'] == doctor_id:
-                        return row
+            counts = ChangeLog.cascade_delete("Doctor ID", doctor_id)
+            summary = "\n".join(f"{filename}: {count}" for filename, count in counts.items())
+            messagebox.showinfo("Success", f"Doctor {doctor_id} deleted successfully!\n\nRows removed:\n{summary}")
+            return counts
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
             return None
+
+    @staticmethod
+    def search_doctors(field, term):
+        """Rows whose field contains term, ignoring case, found through the trigram index"""
+        try:
+            return TrigramIndex.search("doctors.csv", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def fuzzy_search_doctors(term, max_distance=None):
+        """Doctors whose name is within max_distance edits of term (word by word), closest first"""
+        try:
+            return [row for _, row in FuzzyIndex.search("doctors.csv", "Name", term, max_distance)]
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def complete_doctors(prefix, limit=20):
+        """Up to limit doctors whose ID, name or a word of the name starts with prefix"""
+        try:
+            return PrefixIndex.complete("doctors.csv", prefix, limit)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def get_doctor_details(doctor_id):
+        try:
+            return RowIndex.lookup("doctors.csv", doctor_id)
         except Exception as e:
             messagebox.showerror("Error", f"Could not fetch doctor details: {e}")
             return None
@@ -265,13 +321,12 @@ class AppointmentManager:      #arshdeep's code
     @staticmethod
     def make_appointment(patient_id, patient_name, doctor_id, doctor_name, date, time, reason):
         try:
-            appointment_id = str(uuid.uuid4())[:8]
+            appointment_id = IDAllocator.new_id("appointments.csv")
             appointment_data = [appointment_id, patient_id, patient_name, doctor_id, doctor_name, 
                                date, time, reason, "Scheduled"]
             
-            with open("appointments.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(appointment_data)
+            # names are resolved from patients.csv/doctors.csv when read
+            AppendJournal.append("appointments.csv", NameResolver.normaliser("appointments.csv")(appointment_data))
             
             messagebox.showinfo("Success", f"Appointment booked successfully!\nAppointment ID: {appointment_id}")
             return True
@@ -280,19 +335,51 @@ class AppointmentManager:      #arshdeep's code
             return False
 
     @staticmethod
-    def view_appointments(patient_id=None, doctor_id=None):
+    def view_appointments(patient_id=None, doctor_id=None, as_records=False):
+        """Rows as dicts, or as Appointment records when as_records is set"""
         try:
-            appointments = []
-            with open("appointments.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if patient_id and row['Patient ID'] == patient_id:
-                        appointments.append(row)
-                    elif doctor_id and row['Doctor ID'] == doctor_id:
-                        appointments.append(row)
-                    elif not patient_id and not doctor_id:
-                        appointments.append(row)
-            return appointments
+            if patient_id or doctor_id:
+                rows = RowIndex.lookup_owned("appointments.csv", {"Patient ID": patient_id, "Doctor ID": doctor_id})
+                return [Appointment.from_dict(row) for row in rows] if as_records else rows
+            if as_records:
+                return list(TableCache.get_records("appointments.csv"))
+            return list(TableCache.get_rows("appointments.csv"))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def search_appointments(field, term):
+        """Rows whose field contains term, ignoring case, found through the trigram index"""
+        try:
+            return TrigramIndex.search("appointments.csv", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_appointments(patient_id=None, doctor_id=None, predicate=None):
+        """Yield appointments one at a time, filtered like the view method and by predicate"""
+        try:
+            if patient_id or doctor_id:
+                rows = RowIndex.iter_owned("appointments.csv", {"Patient ID": patient_id, "Doctor ID": doctor_id})
+                yield from (row for row in rows if predicate is None or predicate(row))
+            else:
+                yield from CSVManager.iter_rows("appointments.csv", predicate)
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+    @staticmethod
+    def next_appointments(count=10, patient_id=None, doctor_id=None, after=None):
+        """The next count scheduled appointments on or after the date after (default today), soonest first"""
+        try:
+            after = after or datetime.now().date()
+
+            def upcoming(row):
+                day = TypedColumns.decode("Date", row.get("Date"))
+                return row.get("Status") == "Scheduled" and day is not None and day >= after
+            rows = AppointmentManager.iter_appointments(patient_id, doctor_id, upcoming)
+            return TopK.select(rows, count, ["Date", "Time"])
         except Exception as e:
             messagebox.showerror("View Error", f"Error: {e}")
             return []
@@ -300,18 +387,7 @@ class AppointmentManager:      #arshdeep's code
     @staticmethod
     def delete_appointment(appointment_id):
         try:
-            updated_rows = []
-            with open("appointments.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_rows.append(headers)
-                for row in reader:
-                    if row[0] != appointment_id:
-                        updated_rows.append(row)
-            
-            with open("appointments.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_rows)
+            ChangeLog.delete("appointments.csv", appointment_id)
             
             messagebox.showinfo("Success", f"Appointment {appointment_id} deleted successfully!")
             return True
@@ -322,20 +398,7 @@ class AppointmentManager:      #arshdeep's code
     @staticmethod
     def update_appointment_status(appointment_id, new_status):
         try:
-            updated_rows = []
-            with open("appointments.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_rows.append(headers)
-                for row in reader:
-                    if row[0] == appointment_id:
-                        row[8] = new_status  # Update status
-                    updated_rows.append(row)
-            
-            with open("appointments.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_rows)
-            
+            ChangeLog.update("appointments.csv", appointment_id, "Status", new_status)
             return True
         except Exception as e:
             messagebox.showerror("Update Error", f"Error: {e}")
@@ -346,13 +409,11 @@ class PrescriptionManager:
     def create_prescription(patient_id, patient_name, doctor_id, doctor_name, 
                            medication, dosage, instructions, issue_date, expiry_date):
         try:
-            prescription_id = str(uuid.uuid4())[:8]
+            prescription_id = IDAllocator.new_id("prescriptions.csv")
             prescription_data = [prescription_id, patient_id, patient_name, doctor_id, doctor_name,
                                medication, dosage, instructions, issue_date, expiry_date]
             
-            with open("prescriptions.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(prescription_data)
+            AppendJournal.append("prescriptions.csv", NameResolver.normaliser("prescriptions.csv")(prescription_data))
             
             messagebox.showinfo("Success", f"Prescription created successfully!\nPrescription ID: {prescription_id}")
             return True
@@ -361,38 +422,44 @@ class PrescriptionManager:
             return False
 
     @staticmethod
-    def view_prescriptions(patient_id=None, doctor_id=None):
+    def view_prescriptions(patient_id=None, doctor_id=None, as_records=False):
+        """Rows as dicts, or as Prescription records when as_records is set"""
         try:
-            prescriptions = []
-            with open("prescriptions.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if patient_id and row['Patient ID'] == patient_id:
-                        prescriptions.append(row)
-                    elif doctor_id and row['Doctor ID'] == doctor_id:
-                        prescriptions.append(row)
-                    elif not patient_id and not doctor_id:
-                        prescriptions.append(row)
-            return prescriptions
+            if patient_id or doctor_id:
+                rows = RowIndex.lookup_owned("prescriptions.csv", {"Patient ID": patient_id, "Doctor ID": doctor_id})
+                return [Prescription.from_dict(row) for row in rows] if as_records else rows
+            if as_records:
+                return list(TableCache.get_records("prescriptions.csv"))
+            return list(TableCache.get_rows("prescriptions.csv"))
         except Exception as e:
             messagebox.showerror("View Error", f"Error: {e}")
             return []
 
+    @staticmethod
+    def search_prescriptions(field, term):
+        """Rows whose field contains term, ignoring case, found through the trigram index"""
+        try:
+            return TrigramIndex.search("prescriptions.csv", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_prescriptions(patient_id=None, doctor_id=None, predicate=None):
+        """Yield prescriptions one at a time, filtered like the view method and by predicate"""
+        try:
+            if patient_id or doctor_id:
+                rows = RowIndex.iter_owned("prescriptions.csv", {"Patient ID": patient_id, "Doctor ID": doctor_id})
+                yield from (row for row in rows if predicate is None or predicate(row))
+            else:
+                yield from CSVManager.iter_rows("prescriptions.csv", predicate)
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
     @staticmethod
     def delete_prescription(prescription_id):
         try:
-            updated_rows = []
-            with open("prescriptions.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_rows.append(headers)
-                for row in reader:
-                    if row[0] != prescription_id:
-                        updated_rows.append(row)
-            
-            with open("prescriptions.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_rows)
+            ChangeLog.delete("prescriptions.csv", prescription_id)
             
             messagebox.showinfo("Success", f"Prescription {prescription_id} deleted successfully!")
             return True
@@ -405,13 +472,11 @@ class MedicalRecordManager:
     def create_record(patient_id, patient_name, doctor_id, doctor_name, 
                      visit_date, diagnosis, treatment, notes, follow_up):
         try:
-            record_id = str(uuid.uuid4())[:8]
+            record_id = IDAllocator.new_id("medical_records.csv")
             record_data = [record_id, patient_id, patient_name, doctor_id, doctor_name,
                           visit_date, diagnosis, treatment, notes, follow_up]
             
-            with open("medical_records.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(record_data)
+            AppendJournal.append("medical_records.csv", NameResolver.normaliser("medical_records.csv")(record_data))
             
             messagebox.showinfo("Success", f"Medical record created successfully!\nRecord ID: {record_id}")
             return True
@@ -420,19 +485,56 @@ class MedicalRecordManager:
             return False
 
     @staticmethod
-    def view_records(patient_id=None, doctor_id=None):
+    def view_records(patient_id=None, doctor_id=None, as_records=False):
+        """Rows as dicts, or as MedicalRecord records when as_records is set"""
+        try:
+            if patient_id or doctor_id:
+                rows = RowIndex.lookup_owned("medical_records.csv", {"Patient ID": patient_id, "Doctor ID": doctor_id})
+                return [MedicalRecord.from_dict(row) for row in rows] if as_records else rows
+            if as_records:
+                return list(TableCache.get_records("medical_records.csv"))
+            return list(TableCache.get_rows("medical_records.csv"))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def search_records(field, term):
+        """Rows whose field contains term, ignoring case, found through the trigram index"""
         try:
-            records = []
-            with open("medical_records.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if patient_id and row['Patient ID'] == patient_id:
-                        records.append(row)
-                    elif doctor_id and row['Doctor ID'] == doctor_id:
-                        records.append(row)
-                    elif not patient_id and not doctor_id:
-                        records.append(row)
-            return records
+            return TrigramIndex.search("medical_records.csv", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def page_records(start, count):
+        """Return count medical records starting at row number start, without reading the rest"""
+        try:
+            return CSVScanner.open("medical_records.csv").page(start, count)
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_records(patient_id=None, doctor_id=None, predicate=None):
+        """Yield medical records one at a time, filtered like the view method and by predicate"""
+        try:
+            if patient_id or doctor_id:
+                rows = RowIndex.iter_owned("medical_records.csv", {"Patient ID": patient_id, "Doctor ID": doctor_id})
+                yield from (row for row in rows if predicate is None or predicate(row))
+            else:
+                yield from CSVManager.iter_rows("medical_records.csv", predicate)
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+    @staticmethod
+    def recent_records(count=20, patient_id=None, doctor_id=None):
+        """The count most recent medical records by visit date, newest first (undated ones are left out)"""
+        try:
+            dated = lambda row: TypedColumns.decode("Visit Date", row.get("Visit Date")) is not None
+            rows = MedicalRecordManager.iter_records(patient_id, doctor_id, dated)
+            return TopK.select(rows, count, [("Visit Date", False)])
         except Exception as e:
             messagebox.showerror("View Error", f"Error: {e}")
             return []
@@ -440,18 +542,7 @@ class MedicalRecordManager:
     @staticmethod
     def delete_record(record_id):
         try:
-            updated_rows = []
-            with open("medical_records.csv", mode='r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                updated_rows.append(headers)
-                for row in reader:
-                    if row[0] != record_id:
-                        updated_rows.append(row)
-            
-            with open("medical_records.csv", mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_rows)
+            ChangeLog.delete("medical_records.csv", record_id)
             
             messagebox.showinfo("Success", f"Medical record {record_id} deleted successfully!")
             return True
@@ -463,13 +554,11 @@ class PaymentManager:
     @staticmethod
     def process_payment(patient_id, patient_name, amount, method):
         try:
-            invoice_id = str(uuid.uuid4())[:8]
+            invoice_id = IDAllocator.new_id("billing.csv")
             payment_date = datetime.now().strftime("%Y-%m-%d")
             payment_data = [invoice_id, patient_id, patient_name, amount, method, "Paid", payment_date]
             
-            with open("billing.csv", mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(payment_data)
+            AppendJournal.append("billing.csv", NameResolver.normaliser("billing.csv")(payment_data))
             
             messagebox.showinfo("Payment", f"Payment processed successfully!\nInvoice ID: {invoice_id}")
             return True
@@ -478,21 +567,53 @@ class PaymentManager:
             return False
 
     @staticmethod
-    def view_payments(patient_id=None):
+    def view_payments(patient_id=None, as_records=False):
+        """Rows as dicts, or as Payment records when as_records is set"""
         try:
-            payments = []
-            with open("billing.csv", mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if patient_id and row['Patient ID'] == patient_id:
-                        payments.append(row)
-                    elif not patient_id:
-                        payments.append(row)
-            return payments
+            if patient_id:
+                rows = RowIndex.lookup_owned("billing.csv", {"Patient ID": patient_id})
+                return [Payment.from_dict(row) for row in rows] if as_records else rows
+            if as_records:
+                return list(TableCache.get_records("billing.csv"))
+            return list(TableCache.get_rows("billing.csv"))
         except Exception as e:
             messagebox.showerror("View Error", f"Error: {e}")
             return []
 
+    @staticmethod
+    def search_payments(field, term):
+        """Rows whose field contains term, ignoring case, found through the trigram index"""
+        try:
+            return TrigramIndex.search("billing.csv", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_payments(patient_id=None, predicate=None):
+        """Yield payments one at a time, filtered like the view method and by predicate"""
+        try:
+            if patient_id:
+                rows = RowIndex.iter_owned("billing.csv", {"Patient ID": patient_id})
+                yield from (row for row in rows if predicate is None or predicate(row))
+            else:
+                yield from CSVManager.iter_rows("billing.csv", predicate)
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+
+# Storage engine behind the manager API: "csv" (default) or "sqlite"
+STORAGE_BACKEND = os.environ.get("MEDITRACK_BACKEND", "csv")
+if STORAGE_BACKEND == "sqlite":
+    from meditrack_sqlite import (LoginManager, PatientManager, DoctorManager, AppointmentManager,
+                                  PrescriptionManager, MedicalRecordManager, PaymentManager)
+
+# Storage engine behind the manager API: "csv" (default) or "sqlite"
+STORAGE_BACKEND = os.environ.get("MEDITRACK_BACKEND", "csv")
+if STORAGE_BACKEND == "sqlite":
+    from meditrack_sqlite import (LoginManager, PatientManager, DoctorManager, AppointmentManager,
+                                  PrescriptionManager, MedicalRecordManager, PaymentManager)
+
 class MediTrackGUI:
     def __init__(self, root):
         self.root = root
@@ -1038,7 +1159,7 @@ class MediTrackGUI:
         if patients:
             search_window = tk.Toplevel(self.root)
             search_window.title("Search Patients")
-            search_window.geometry("500x300")
+            search_window.geometry("500x380")
 
             tk.Label(search_window, text="Search Patients", font=("Arial", 16)).pack(pady=10)
 
@@ -1053,12 +1174,32 @@ class MediTrackGUI:
             search_entry = tk.Entry(search_window, width=40)
             search_entry.pack(pady=5)
 
+            fuzzy_var = tk.BooleanVar(value=False)
+            tk.Checkbutton(search_window, text="Fuzzy match on Name (tolerates misspellings)",
+                           variable=fuzzy_var).pack(pady=5)
+            tk.Label(search_window, text="Max Distance (edits):").pack()
+            distance_spinbox = tk.Spinbox(search_window, from_=0, to=5, width=5)
+            distance_spinbox.delete(0, tk.END)
+            distance_spinbox.insert(0, str(meditrack_fuzzy.MAX_DISTANCE))
+            distance_spinbox.pack(pady=5)
+
             def perform_search():
                 field = search_field.get()
                 term = search_entry.get().strip()
                 
                 if term:
-                    results = SearchSortManager.linear_search(patients, field, term)
+                    if fuzzy_var.get():
+                        if field != "Name":
+                            messagebox.showwarning("Fuzzy Search", "Fuzzy matching is only available for the Name field.")
+                            return
+                        try:
+                            max_distance = int(distance_spinbox.get())
+                        except ValueError:
+                            messagebox.showerror("Error", "Please enter a whole number of edits")
+                            return
+                        results = PatientManager.fuzzy_search_patients(term, max_distance)  # closest first
+                    else:
+                        results = PatientManager.search_patients(field, term)
                     if results:
                         result_window = tk.Toplevel(search_window)
                         result_window.title("Search Results")
@@ -1111,7 +1252,7 @@ class MediTrackGUI:
                 selected = patient_combobox.get()
                 if selected:
                     patient_id = selected.split(" - ")[0]
-                    if PatientManager.delete_patient(patient_id):
+                    if PatientManager.delete_patient_cascade(patient_id) is not None:
                         delete_window.destroy()
 
             tk.Button(delete_window, text="Delete", command=confirm_delete).pack(pady=10)
@@ -1191,7 +1332,7 @@ class MediTrackGUI:
         if doctors:
             search_window = tk.Toplevel(self.root)
             search_window.title("Search Doctors")
-            search_window.geometry("500x300")
+            search_window.geometry("500x380")
 
             tk.Label(search_window, text="Search Doctors", font=("Arial", 16)).pack(pady=10)
 
@@ -1206,12 +1347,32 @@ class MediTrackGUI:
             search_entry = tk.Entry(search_window, width=40)
             search_entry.pack(pady=5)
 
+            fuzzy_var = tk.BooleanVar(value=False)
+            tk.Checkbutton(search_window, text="Fuzzy match on Name (tolerates misspellings)",
+                           variable=fuzzy_var).pack(pady=5)
+            tk.Label(search_window, text="Max Distance (edits):").pack()
+            distance_spinbox = tk.Spinbox(search_window, from_=0, to=5, width=5)
+            distance_spinbox.delete(0, tk.END)
+            distance_spinbox.insert(0, str(meditrack_fuzzy.MAX_DISTANCE))
+            distance_spinbox.pack(pady=5)
+
             def perform_search():
                 field = search_field.get()
                 term = search_entry.get().strip()
                 
                 if term:
-                    results = SearchSortManager.linear_search(doctors, field, term)
+                    if fuzzy_var.get():
+                        if field != "Name":
+                            messagebox.showwarning("Fuzzy Search", "Fuzzy matching is only available for the Name field.")
+                            return
+                        try:
+                            max_distance = int(distance_spinbox.get())
+                        except ValueError:
+                            messagebox.showerror("Error", "Please enter a whole number of edits")
+                            return
+                        results = DoctorManager.fuzzy_search_doctors(term, max_distance)  # closest first
+                    else:
+                        results = DoctorManager.search_doctors(field, term)
                     if results:
                         result_window = tk.Toplevel(search_window)
                         result_window.title("Search Results")
@@ -1263,7 +1424,7 @@ class MediTrackGUI:
                 selected = doctor_combobox.get()
                 if selected:
                     doctor_id = selected.split(" - ")[0]
-                    if DoctorManager.delete_doctor(doctor_id):
+                    if DoctorManager.delete_doctor_cascade(doctor_id) is not None:
                         delete_window.destroy()
 
             tk.Button(delete_window, text="Delete", command=confirm_delete).pack(pady=10)
@@ -1332,7 +1493,7 @@ class MediTrackGUI:
                 term = search_entry.get().strip()
                 
                 if term:
-                    results = SearchSortManager.linear_search(appointments, field, term)
+                    results = AppointmentManager.search_appointments(field, term)
                     if results:
                         result_window = tk.Toplevel(search_window)
                         result_window.title("Search Results")
@@ -1492,7 +1653,7 @@ class MediTrackGUI:
                 term = search_entry.get().strip()
                 
                 if term:
-                    results = SearchSortManager.linear_search(prescriptions, field, term)
+                    results = PrescriptionManager.search_prescriptions(field, term)
                     if results:
                         result_window = tk.Toplevel(search_window)
                         result_window.title("Search Results")
@@ -1653,7 +1814,7 @@ Follow Up Required: {record['Follow Up']}
                 term = search_entry.get().strip()
                 
                 if term:
-                    results = SearchSortManager.linear_search(records, field, term)
+                    results = MedicalRecordManager.search_records(field, term)
                     if results:
                         result_window = tk.Toplevel(search_window)
                         result_window.title("Search Results")
@@ -1811,7 +1972,7 @@ Follow Up Required: {record['Follow Up']}
                 term = search_entry.get().strip()
                 
                 if term:
-                    results = SearchSortManager.linear_search(payments, field, term)
+                    results = PaymentManager.search_payments(field, term)
                     if results:
                         result_window = tk.Toplevel(search_window)
                         result_window.title("Search Results")
@@ -1850,17 +2011,16 @@ Follow Up Required: {record['Follow Up']}
             messagebox.showinfo("Payments", "No payment records to search.")
 
     def process_payment(self):
-        patients = PatientManager.view_all_patients()
-        if patients:
+        if PatientManager.complete_patients("", 1):
             payment_window = tk.Toplevel(self.root)
             payment_window.title("Process Payment")
             payment_window.geometry("500x400")
 
             tk.Label(payment_window, text="Process Payment", font=("Arial", 16)).pack(pady=10)
 
-            tk.Label(payment_window, text="Select Patient:").pack()
-            patient_names = [f"{patient['Patient ID']} - {patient['Name']}" for patient in patients]
-            patient_combobox = ttk.Combobox(payment_window, values=patient_names, state="readonly")
+            tk.Label(payment_window, text="Select Patient (type a name or ID):").pack()
+            patient_combobox = TypeAheadPicker(payment_window, PatientManager.complete_patients,
+                                               lambda patient: f"{patient['Patient ID']} - {patient['Name']}")
             patient_combobox.pack(pady=10)
 
             tk.Label(payment_window, text="Amount:").pack()
@@ -1874,13 +2034,13 @@ Follow Up Required: {record['Follow Up']}
             method_combobox.pack(pady=10)
 
             def submit_payment():
-                patient_info = patient_combobox.get()
+                patient = patient_combobox.selected()
                 amount = amount_entry.get()
                 method = method_combobox.get()
 
-                if patient_info and amount and method:
-                    patient_id = patient_info.split(" - ")[0]
-                    patient_name = patient_info.split(" - ")[1]
+                if patient and amount and method:
+                    patient_id = patient['Patient ID']
+                    patient_name = patient['Name']
                     
                     try:
                         amount = float(amount)
@@ -1977,9 +2137,34 @@ Follow Up Required: {record['Follow Up']}
             else:
                 messagebox.showinfo("Appointments", "No appointments found.")
 
+        def view_upcoming_appointments():
+            appointments = AppointmentManager.next_appointments(10, doctor_id=self.current_user_id)
+            if appointments:
+                upcoming_window = tk.Toplevel(doctor_window)
+                upcoming_window.title("Next Appointments")
+                upcoming_window.geometry("800x350")
+
+                tree = ttk.Treeview(upcoming_window, columns=("Date", "Time", "Patient", "Reason"), show="headings")
+
+                headings = ["Date", "Time", "Patient Name", "Reason"]
+                for i, heading in enumerate(headings):
+                    tree.heading(tree['columns'][i], text=heading)
+                    tree.column(tree['columns'][i], width=150, anchor='center')
+
+                for appt in appointments:
+                    tree.insert("", tk.END, values=(
+                        appt['Date'],
+                        appt['Time'],
+                        appt['Patient Name'],
+                        appt['Reason']
+                    ))
+
+                tree.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+            else:
+                messagebox.showinfo("Appointments", "No upcoming appointments.")
+
         def create_prescription():
-            patients = PatientManager.view_all_patients()
-            if patients:
+            if PatientManager.complete_patients("", 1):
                 prescription_window = tk.Toplevel(doctor_window)
                 prescription_window.title("Create Prescription")
                 prescription_window.geometry("600x600")
@@ -1987,10 +2172,9 @@ Follow Up Required: {record['Follow Up']}
                 tk.Label(prescription_window, text="Create New Prescription", font=("Arial", 20)).pack(pady=10)
 
                 # Patient Selection
-                tk.Label(prescription_window, text="Select Patient:").pack()
-                patient_names = [f"{patient['Patient ID']} - {patient['Name']}" for patient in patients]
-                patient_var = tk.StringVar()
-                patient_combobox = ttk.Combobox(prescription_window, values=patient_names, state="readonly", textvariable=patient_var)
+                tk.Label(prescription_window, text="Select Patient (type a name or ID):").pack()
+                patient_combobox = TypeAheadPicker(prescription_window, PatientManager.complete_patients,
+                                                   lambda patient: f"{patient['Patient ID']} - {patient['Name']}")
                 patient_combobox.pack(pady=10)
 
                 # Medication Details
@@ -2016,7 +2200,8 @@ Follow Up Required: {record['Follow Up']}
                 expiry_date.pack(pady=5)
 
                 def submit_prescription():
-                    patient_id = patient_var.get().split(" - ")[0] if patient_var.get() else ""
+                    patient = patient_combobox.selected()
+                    patient_id = patient['Patient ID'] if patient else ""
                     medication = medication_entry.get()
                     dosage = dosage_entry.get()
                     instructions = instructions_entry.get("1.0", tk.END).strip()
@@ -2113,8 +2298,7 @@ Expiry Date: {pres['Expiry Date']}
                 messagebox.showinfo("Prescriptions", "No prescriptions found")
 
         def create_medical_record():
-            patients = PatientManager.view_all_patients()
-            if patients:
+            if PatientManager.complete_patients("", 1):
                 record_window = tk.Toplevel(doctor_window)
                 record_window.title("Create Medical Record")
                 record_window.geometry("600x600")
@@ -2122,10 +2306,9 @@ Expiry Date: {pres['Expiry Date']}
                 tk.Label(record_window, text="Create Medical Record", font=("Arial", 20)).pack(pady=10)
 
                 # Patient Selection
-                tk.Label(record_window, text="Select Patient:").pack()
-                patient_names = [f"{patient['Patient ID']} - {patient['Name']}" for patient in patients]
-                patient_var = tk.StringVar()
-                patient_combobox = ttk.Combobox(record_window, values=patient_names, state="readonly", textvariable=patient_var)
+                tk.Label(record_window, text="Select Patient (type a name or ID):").pack()
+                patient_combobox = TypeAheadPicker(record_window, PatientManager.complete_patients,
+                                                   lambda patient: f"{patient['Patient ID']} - {patient['Name']}")
                 patient_combobox.pack(pady=10)
 
                 # Visit Details
@@ -2151,7 +2334,8 @@ Expiry Date: {pres['Expiry Date']}
                 follow_combobox.pack(pady=5)
 
                 def submit_record():
-                    patient_id = patient_var.get().split(" - ")[0] if patient_var.get() else ""
+                    patient = patient_combobox.selected()
+                    patient_id = patient['Patient ID'] if patient else ""
                     diagnosis = diagnosis_entry.get()
                     treatment = treatment_entry.get("1.0", tk.END).strip()
                     notes = notes_entry.get("1.0", tk.END).strip()
@@ -2253,6 +2437,7 @@ Follow Up Required: {record['Follow Up']}
 
         buttons = [
             ("View Appointments", view_appointments),
+            ("Next Appointments", view_upcoming_appointments),
             ("Create Prescription", create_prescription),
             ("View Prescriptions", view_prescriptions),
             ("Create Medical Record", create_medical_record),
@@ -2293,17 +2478,16 @@ Follow Up Required: {record['Follow Up']}
                  bg='white').pack(pady=20)
 
         def make_appointment():
-            doctors = DoctorManager.view_all_doctors()
-            if doctors:
+            if DoctorManager.complete_doctors("", 1):
                 appointment_window = tk.Toplevel(patient_window)
                 appointment_window.title("Make Appointment")
                 appointment_window.geometry("500x500")
 
                 tk.Label(appointment_window, text="Book Appointment", font=("Arial", 20)).pack(pady=10)
 
-                tk.Label(appointment_window, text="Select Doctor:").pack()
-                doctor_names = [f"{doctor['Name']} - {doctor['Specialization']}" for doctor in doctors]
-                doctor_combobox = ttk.Combobox(appointment_window, values=doctor_names, state="readonly")
+                tk.Label(appointment_window, text="Select Doctor (type a name or ID):").pack()
+                doctor_combobox = TypeAheadPicker(appointment_window, DoctorManager.complete_doctors,
+                                                  lambda doctor: f"{doctor['Name']} - {doctor['Specialization']}")
                 doctor_combobox.pack(pady=10)
 
                 tk.Label(appointment_window, text="Select Date:").pack()
@@ -2319,24 +2503,19 @@ Follow Up Required: {record['Follow Up']}
                 reason_entry.pack(pady=10)
 
                 def submit_appointment():
-                    doctor_info = doctor_combobox.get()
+                    doctor = doctor_combobox.selected()
                     date = date_picker.get_date()
                     time = time_entry.get()
                     reason = reason_entry.get()
 
-                    if doctor_info and date and time and reason:
-                        doctor_id = None
-                        for doctor in doctors:
-                            if f"{doctor['Name']} - {doctor['Specialization']}" == doctor_info:
-                                doctor_id = doctor['Doctor ID']
-                                break
-                        
+                    if doctor and date and time and reason:
+                        doctor_id = doctor['Doctor ID']
                         if doctor_id:
                             AppointmentManager.make_appointment(
                                 self.current_user_id,
                                 self.current_patient_name,
                                 doctor_id,
-                                doctor_info.split(" - ")[0],
+                                doctor['Name'],
                                 date,
                                 time,
                                 reason
@@ -2626,6 +2805,52 @@ Follow Up Required: {record['Follow Up']}
         self.root.quit()
 
 if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--import":
+        # python meditrack.py --import patients roster.csv
+        if STORAGE_BACKEND == "sqlite":
+            sys.exit("--import writes the CSV tables and is not available with MEDITRACK_BACKEND=sqlite")
+        CSVManager.create_csv_files()
+        summary = BulkImportManager.import_file(sys.argv[2], sys.argv[3])
+        print(f"Imported {summary['imported']}, skipped {summary['skipped']}")
+        for line, reason in summary["errors"]:
+            print(f"  record {line}: {reason}")
+        sys.exit(0)
+    if sys.argv[1:2] == ["--migrate-sqlite"] and sys.argv[2:] in ([], ["--force"]):
+        # python meditrack.py --migrate-sqlite [--force]
+        from meditrack_sqlite import SQLiteStore
+        CSVManager.create_csv_files()
+        try:
+            counts = SQLiteStore.migrate_from_csv(CSVManager.iter_raw_rows, force=sys.argv[2:] == ["--force"])
+        except ValueError as e:
+            sys.exit(str(e))
+        for table, count in counts.items():
+            print(f"{table}: {count} rows")
+        sys.exit(0)
+    if len(sys.argv) == 2 and sys.argv[1] == "--check-data":
+        # python meditrack.py --check-data
+        CSVManager.create_csv_files()
+        for filename, columns in TypedColumns.report().items():
+            for column, problems in columns.items():
+                for status, examples in problems.items():
+                    for key, raw in examples:
+                        print(f"{filename} {key} {column}: {raw!r} {status}")
+        sys.exit(0)
+    if len(sys.argv) == 2 and sys.argv[1] == "--normalise-names":
+        # python meditrack.py --normalise-names
+        if STORAGE_BACKEND == "sqlite":
+            sys.exit("--normalise-names rewrites the CSV tables and is not available with MEDITRACK_BACKEND=sqlite")
+        CSVManager.create_csv_files()
+        for filename, saved in NameResolver.migrate().items():
+            print(f"{filename}: {saved} bytes saved")
+        sys.exit(0)
+    if len(sys.argv) == 2 and sys.argv[1] == "--migrate-sqlite":
+        # python meditrack.py --migrate-sqlite
+        from meditrack_sqlite import SQLiteStore
+        CSVManager.create_csv_files()
+        for table, count in SQLiteStore.migrate_from_csv(CSVManager.iter_raw_rows).items():
+            print(f"{table}: {count} rows")
+        sys.exit(0)
+
     root = tk.Tk()
     app = MediTrackGUI(root)
     root.protocol("WM_DELETE_WINDOW", app.on_close)
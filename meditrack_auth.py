@@ -0,0 +1,53 @@
+import hashlib
+import hmac
+import os
+import secrets
+
+# Salted password hashing shared by the CSV and SQLite backends.
+#
+# Passwords are stored as "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>".
+# The work factor defaults to ITERATIONS and can be changed with
+# MEDITRACK_PBKDF2_ITERATIONS; hashes made with a different one are
+# re-hashed on the next successful login. Values without the prefix are
+# legacy plaintext passwords, which are still accepted so they can be upgraded.
+
+ALGORITHM = "pbkdf2_sha256"
+ITERATIONS = int(os.environ.get("MEDITRACK_PBKDF2_ITERATIONS", "200000"))
+SALT_BYTES = 16
+
+_dummy_hash = None  # compared against for unknown users, so they take as long as known ones
+
+
+def hash_password(password, iterations=None):
+    """Return the storable salted hash of a password"""
+    iterations = iterations or ITERATIONS
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored):
+    return stored.startswith(ALGORITHM + "$")
+
+
+def check_password(password, stored):
+    """Check a password against a stored hash or legacy plaintext value; stored may be None"""
+    global _dummy_hash
+    if stored is None:
+        if _dummy_hash is None:
+            _dummy_hash = hash_password(secrets.token_hex(8))
+        check_password(password, _dummy_hash)
+        return False
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, iterations, salt, expected = stored.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+def needs_rehash(stored):
+    """True for plaintext passwords and hashes made with another work factor"""
+    return not is_hashed(stored) or stored.split("$")[1] != str(ITERATIONS)
@@ -0,0 +1,118 @@
+# Edit-distance (Levenshtein) name matching shared by the CSV and SQLite backends.
+#
+# BKTree is a metric tree over strings: each child sits at a known distance
+# from its parent, so by the triangle inequality a search for keys within k of
+# a term only descends into children whose distance lies within k of the
+# term's distance to the parent. A lookup computes the distance to a small
+# fraction of the indexed keys instead of to every row. Names are indexed by
+# word, so "jon smyth" finds "John Smith" (1 + 1 edits) in either word order.
+# Keys are only ever added; callers map keys back to their current rows, so
+# stale keys simply match nothing.
+
+MAX_DISTANCE = 2  # default for searches; 1-2 catches most typos without flooding results
+
+
+def levenshtein(a, b):
+    """Number of single-character insertions, deletions and substitutions turning a into b.
+
+    Uses Myers' bit-parallel algorithm (in Hyyrö's formulation): one column of
+    the edit-distance matrix per character of the longer string, held as bit
+    vectors of vertical +1/-1 deltas, so no per-cell Python work is done.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    matches = {}  # character -> bit mask of its positions in b
+    for position, char in enumerate(b):
+        matches[char] = matches.get(char, 0) | (1 << position)
+    mask = (1 << len(b)) - 1
+    last = 1 << (len(b) - 1)
+    positive, negative, distance = mask, 0, len(b)
+    for char in a:
+        equal = matches.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & mask
+        negative = horizontal_positive & vertical & mask
+    return distance
+
+
+def name_words(name):
+    """The lower-cased words of a name, the keys it is indexed under"""
+    return set(str(name or '').lower().split())
+
+
+def match(tree, rows_by_word, term, max_distance=MAX_DISTANCE):
+    """{row: distance} for the rows having, for every word of term, a word within
+    max_distance of it; distance is the sum over the term's words and at most max_distance.
+
+    rows_by_word maps each key in tree to the rows (positions, rowids...) with that word.
+    """
+    totals = None
+    for word in name_words(term):
+        best = {}
+        for distance, key in tree.search(word, max_distance):  # closest first
+            for row in rows_by_word.get(key, ()):
+                best.setdefault(row, distance)
+        if totals is None:
+            totals = best
+        else:
+            totals = {row: totals[row] + distance for row, distance in best.items()
+                      if row in totals and totals[row] + distance <= max_distance}
+    return totals or {}
+
+
+class BKTree:
+    def __init__(self):
+        self._root = None  # [key, {distance: child node}]
+        self._keys = set()
+        self.comparisons = 0  # distance computations made by searches
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def add(self, key):
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        if self._root is None:
+            self._root = [key, {}]
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(key, node[0])
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [key, {}]
+                return
+            node = child
+
+    def search(self, term, max_distance=MAX_DISTANCE):
+        """(distance, key) pairs for every key within max_distance of term, closest first"""
+        matches = []
+        pending = [self._root] if self._root is not None else []
+        while pending:
+            key, children = pending.pop()
+            distance = levenshtein(term, key)
+            self.comparisons += 1
+            if distance <= max_distance:
+                matches.append((distance, key))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    pending.append(child)
+        matches.sort()
+        return matches
@@ -0,0 +1,682 @@
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from tkinter import messagebox
+
+import meditrack_auth
+import meditrack_fuzzy
+from meditrack_store import Record
+
+# Embedded SQLite storage engine for MediTrack.
+#
+# The managers below mirror the static-method API of the CSV managers in
+# meditrack.py and return rows as dicts keyed by the same column names (or as
+# the same Record types when as_records is set), so the GUI works unchanged.
+# Select this backend with MEDITRACK_BACKEND=sqlite; the database file
+# defaults to meditrack.db (override with MEDITRACK_DB).
+
+DATABASE = os.environ.get("MEDITRACK_DB", "meditrack.db")
+
+# table -> (CSV file it is migrated from, column headers in CSV order)
+TABLES = {
+    "patients": ("patients.csv", ["Patient ID", "Name", "DOB", "Gender", "Contact", "Address", "Blood Type", "Allergies"]),
+    "doctors": ("doctors.csv", ["Doctor ID", "Name", "Specialization", "Contact No.", "License Number"]),
+    "appointments": ("appointments.csv", ["Appointment ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name",
+                                          "Date", "Time", "Reason", "Status"]),
+    "prescriptions": ("prescriptions.csv", ["Prescription ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name",
+                                            "Medication", "Dosage", "Instructions", "Issue Date", "Expiry Date"]),
+    "medical_records": ("medical_records.csv", ["Record ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name",
+                                                "Visit Date", "Diagnosis", "Treatment", "Notes", "Follow Up"]),
+    "billing": ("billing.csv", ["Invoice ID", "Patient ID", "Patient Name", "Amount", "Payment Method", "Status", "Date"]),
+    "admin_logins": ("admin.csv", ["Username", "Password"]),
+    "doctor_logins": ("doctor_login.csv", ["Doctor ID", "Password"]),
+    "patient_logins": ("patient_login.csv", ["Patient ID", "Password"]),
+}
+
+# Logins seeded into a new database: the defaults CSVManager.create_csv_files writes
+DEFAULT_LOGINS = {"admin_logins": ("admin1", "admin"), "patient_logins": ("1001", "patient1")}
+
+INDEXES = [
+    ("appointments", "patient_id"), ("appointments", "doctor_id"), ("appointments", "date"),
+    ("prescriptions", "patient_id"), ("prescriptions", "doctor_id"),
+    ("medical_records", "patient_id"), ("medical_records", "doctor_id"), ("medical_records", "visit_date"),
+    ("billing", "patient_id"),
+]
+
+
+def column_name(header):
+    """SQL column name for a CSV header, e.g. "Contact No." -> contact_no"""
+    return re.sub(r'\W+', '_', header.lower()).strip('_')
+
+
+class SQLiteStore:
+    _local = threading.local()
+    _name_trees = {}  # table -> BKTree of the name words seen so far
+
+    @staticmethod
+    def connect():
+        """Return this thread's connection, creating the schema on first use"""
+        connection = getattr(SQLiteStore._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(DATABASE)
+            connection.execute("PRAGMA journal_mode=WAL")  # readers never block the writer
+            connection.execute("PRAGMA synchronous=NORMAL")
+            SQLiteStore.create_tables(connection)
+            SQLiteStore._local.connection = connection
+        return connection
+
+    @staticmethod
+    def create_tables(connection):
+        """Create the schema if missing; a new database also gets the default logins"""
+        with connection:
+            new = connection.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] == 0
+            for table, (_, headers) in TABLES.items():
+                columns = [f"{column_name(headers[0])} TEXT PRIMARY KEY"]
+                columns += [f"{column_name(header)} TEXT" for header in headers[1:]]
+                connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})")
+            for table, column in INDEXES:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+            if new:
+                for table, (username, password) in DEFAULT_LOGINS.items():
+                    # OR IGNORE: another process may be creating the same database
+                    connection.execute(f"INSERT OR IGNORE INTO {table} VALUES (?, ?)",
+                                       (username, meditrack_auth.hash_password(password)))
+
+    @staticmethod
+    def has_data(connection):
+        """True if any table holds a row other than an unchanged default login"""
+        for table in TABLES:
+            rows = connection.execute(f"SELECT * FROM {table} LIMIT 2").fetchall()
+            if table in DEFAULT_LOGINS and len(rows) == 1:
+                username, password = DEFAULT_LOGINS[table]
+                if rows[0][0] == username and meditrack_auth.check_password(password, rows[0][1]):
+                    continue
+            if rows:
+                return True
+        return False
+
+    @staticmethod
+    def _select(table):
+        headers = TABLES[table][1]
+        return "SELECT " + ", ".join(f'{column_name(header)} AS "{header}"' for header in headers) + f" FROM {table}"
+
+    @staticmethod
+    def query(table, where="", params=()):
+        """Yield the rows of a table as dicts keyed by the CSV column names"""
+        cursor = SQLiteStore.connect().execute(f"{SQLiteStore._select(table)} {where}", params)
+        names = [description[0] for description in cursor.description]
+        for row in cursor:
+            yield dict(zip(names, row))
+
+    @staticmethod
+    def records(table, rows):
+        """Rows of a table as its Record type (Patient, Appointment, ...), like the CSV managers'"""
+        record_type = Record.TYPES[TABLES[table][0]]
+        return [record_type.from_dict(row) for row in rows]
+
+    @staticmethod
+    def _owner_condition(patient_id=None, doctor_id=None):
+        """SQL condition (or "") and parameters selecting the rows of a patient or doctor"""
+        conditions, params = [], []
+        if patient_id:
+            conditions.append("patient_id = ?")
+            params.append(patient_id)
+        if doctor_id:
+            conditions.append("doctor_id = ?")
+            params.append(doctor_id)
+        return " OR ".join(conditions), params
+
+    @staticmethod
+    def query_owned(table, patient_id=None, doctor_id=None):
+        """Rows owned by a patient or doctor, matching the CSV managers' filter semantics"""
+        condition, params = SQLiteStore._owner_condition(patient_id, doctor_id)
+        where = ("WHERE " + condition) if condition else ""
+        return SQLiteStore.query(table, where + " ORDER BY rowid", params)
+
+    @staticmethod
+    def insert(table, row):
+        headers = TABLES[table][1]
+        placeholders = ", ".join("?" for _ in headers)
+        columns = ", ".join(column_name(header) for header in headers)
+        connection = SQLiteStore.connect()
+        with connection:
+            connection.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                               ['' if value is None else str(value) for value in row])
+
+    @staticmethod
+    def new_id(table):
+        """A fresh 8-character record ID, checked against the table's primary key"""
+        key_column = column_name(TABLES[table][1][0])
+        connection = SQLiteStore.connect()
+        while True:
+            candidate = str(uuid.uuid4())[:8]
+            if connection.execute(f"SELECT 1 FROM {table} WHERE {key_column} = ?", (candidate,)).fetchone() is None:
+                return candidate
+
+    @staticmethod
+    def search(table, column, term):
+        """Rows whose column contains term, ignoring (ASCII) case"""
+        if column not in TABLES[table][1]:
+            return []
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+        return list(SQLiteStore.query(table, f"WHERE {column_name(column)} LIKE ? ESCAPE '\\' ORDER BY rowid",
+                                      (pattern,)))
+
+    @staticmethod
+    def complete(table, prefix, limit):
+        """Up to limit rows whose primary key, name or a word of the name starts with prefix"""
+        key_column = column_name(TABLES[table][1][0])
+        prefix = re.sub(r"([\\%_])", r"\\\1", prefix.lstrip())
+        return list(SQLiteStore.query(
+            table, f"WHERE {key_column} LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' "
+                   "ORDER BY name, rowid LIMIT ?", (prefix + "%", prefix + "%", "% " + prefix + "%", limit)))
+
+    @staticmethod
+    def fuzzy_search(table, term, max_distance=None):
+        """Rows whose name is within max_distance edits of term (word by word), closest first.
+        Only names are read to map words to rows; distances are computed through the BK-tree."""
+        if max_distance is None:
+            max_distance = meditrack_fuzzy.MAX_DISTANCE
+        tree = SQLiteStore._name_trees.setdefault(table, meditrack_fuzzy.BKTree())
+        words = {}
+        for rowid, name in SQLiteStore.connect().execute(f"SELECT rowid, name FROM {table} ORDER BY rowid"):
+            for word in meditrack_fuzzy.name_words(name):
+                words.setdefault(word, []).append(rowid)
+                tree.add(word)
+        best = meditrack_fuzzy.match(tree, words, term, max_distance)
+        ranked = sorted(best, key=lambda rowid: (best[rowid], rowid))
+        headers = TABLES[table][1]
+        select = "SELECT rowid, " + ", ".join(column_name(header) for header in headers) + f" FROM {table}"
+        rows = {}
+        for start in range(0, len(ranked), 500):  # stay under SQLite's bound parameter limit
+            chunk = ranked[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            for values in SQLiteStore.connect().execute(f"{select} WHERE rowid IN ({placeholders})", chunk):
+                rows[values[0]] = dict(zip(headers, values[1:]))
+        return [rows[rowid] for rowid in ranked if rowid in rows]
+
+    @staticmethod
+    def delete(table, key):
+        key_column = column_name(TABLES[table][1][0])
+        connection = SQLiteStore.connect()
+        with connection:
+            connection.execute(f"DELETE FROM {table} WHERE {key_column} = ?", (str(key),))
+
+    @staticmethod
+    def cascade_delete(column, owner_id):
+        """Delete an owner, its login and every row referencing it in one transaction.
+
+        column is "Patient ID" or "Doctor ID"; returns the rows deleted per table.
+        """
+        counts = {}
+        connection = SQLiteStore.connect()
+        with connection:
+            for table, (_, headers) in TABLES.items():
+                if column in headers:  # the owner's own tables key on it, the rest reference it
+                    cursor = connection.execute(f"DELETE FROM {table} WHERE {column_name(column)} = ?",
+                                                (str(owner_id),))
+                    counts[table] = cursor.rowcount
+        return counts
+
+    @staticmethod
+    def migrate_from_csv(read_rows, force=False):
+        """One-shot copy of every CSV table into the database, in a single transaction.
+
+        read_rows(filename) must yield each data row of a CSV table as a list
+        in CSV column order (meditrack_store.CSVManager.iter_raw_rows does this,
+        with pending deletes and updates already applied). Raises ValueError
+        if the database already holds data, unless force is set; the tables
+        being copied are emptied first either way (a new database only holds
+        the default logins). Returns the number of rows copied per table.
+        """
+        connection = SQLiteStore.connect()
+        counts = {}
+        with connection:
+            if not force and SQLiteStore.has_data(connection):
+                raise ValueError(f"{DATABASE} already holds data; use --force to replace it with the CSV tables")
+            for table, (filename, headers) in TABLES.items():
+                if not os.path.exists(filename):
+                    continue
+                connection.execute(f"DELETE FROM {table}")
+                columns = ", ".join(column_name(header) for header in headers)
+                placeholders = ", ".join("?" for _ in headers)
+                rows = ((row + [''] * len(headers))[:len(headers)] for row in read_rows(filename))
+                cursor = connection.executemany(  # a duplicated ID keeps its first row, as in the CSV readers
+                    f"INSERT OR IGNORE INTO {table} ({columns}) VALUES ({placeholders})", rows)
+                counts[table] = cursor.rowcount
+        return counts
+
+
+class LoginManager:
+    LOGIN_TABLES = {"admin.csv": "admin_logins", "doctor_login.csv": "doctor_logins",
+                    "patient_login.csv": "patient_logins"}
+
+    @staticmethod
+    def verify_login(username, password, file_name):
+        try:
+            table = LoginManager.LOGIN_TABLES[file_name]
+            key_column = column_name(TABLES[table][1][0])
+            connection = SQLiteStore.connect()
+            row = connection.execute(f"SELECT password FROM {table} WHERE {key_column} = ?", (username,)).fetchone()
+            stored = row[0].strip() if row else None
+            valid = meditrack_auth.check_password(password, stored)
+            if valid and meditrack_auth.needs_rehash(stored):
+                with connection:
+                    connection.execute(f"UPDATE {table} SET password = ? WHERE {key_column} = ?",
+                                       (meditrack_auth.hash_password(password), username))
+            return valid
+        except Exception as e:
+            messagebox.showerror("Login Error", f"Error: {e}")
+            return False
+
+
+class PatientManager:
+    @staticmethod
+    def register_patient(name, dob, gender, contact, address, blood_type, allergies):
+        try:
+            patient_id = SQLiteStore.new_id("patients")
+            SQLiteStore.insert("patients", [patient_id, name, dob, gender, contact, address, blood_type, allergies])
+            # Using patient ID as initial password
+            SQLiteStore.insert("patient_logins", [patient_id, meditrack_auth.hash_password(patient_id)])
+            messagebox.showinfo("Success", f"Patient registered successfully!\nPatient ID: {patient_id}")
+            return True
+        except Exception as e:
+            messagebox.showerror("Registration Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def view_all_patients(as_records=False):
+        """All rows as dicts, or as Patient records when as_records is set"""
+        try:
+            rows = list(SQLiteStore.query("patients", "ORDER BY rowid"))
+            return SQLiteStore.records("patients", rows) if as_records else rows
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_patients(predicate=None):
+        try:
+            yield from (row for row in SQLiteStore.query("patients", "ORDER BY rowid")
+                        if predicate is None or predicate(row))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+    @staticmethod
+    def delete_patient(patient_id):
+        try:
+            SQLiteStore.delete("patients", patient_id)
+            SQLiteStore.delete("patient_logins", patient_id)
+            messagebox.showinfo("Success", f"Patient {patient_id} deleted successfully!")
+            return True
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def delete_patient_cascade(patient_id):
+        try:
+            counts = SQLiteStore.cascade_delete("Patient ID", patient_id)
+            summary = "\n".join(f"{table}: {count}" for table, count in counts.items())
+            messagebox.showinfo("Success", f"Patient {patient_id} deleted successfully!\n\nRows removed:\n{summary}")
+            return counts
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
+            return None
+
+    @staticmethod
+    def search_patients(field, term):
+        try:
+            return SQLiteStore.search("patients", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def fuzzy_search_patients(term, max_distance=None):
+        try:
+            return SQLiteStore.fuzzy_search("patients", term, max_distance)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def complete_patients(prefix, limit=20):
+        try:
+            return SQLiteStore.complete("patients", prefix, limit)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def get_patient_details(patient_id):
+        try:
+            return next(SQLiteStore.query("patients", "WHERE patient_id = ?", (patient_id,)), None)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not fetch patient details: {e}")
+            return None
+
+
+class DoctorManager:
+    @staticmethod
+    def add_doctor(name, specialization, contact, license_no):
+        try:
+            doctor_id = SQLiteStore.new_id("doctors")
+            SQLiteStore.insert("doctors", [doctor_id, name, specialization, contact, license_no])
+            # Using doctor ID as initial password
+            SQLiteStore.insert("doctor_logins", [doctor_id, meditrack_auth.hash_password(doctor_id)])
+            messagebox.showinfo("Success", f"Doctor added successfully!\nDoctor ID: {doctor_id}")
+            return True
+        except Exception as e:
+            messagebox.showerror("Doctor Registration Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def view_all_doctors(as_records=False):
+        """All rows as dicts, or as Doctor records when as_records is set"""
+        try:
+            rows = list(SQLiteStore.query("doctors", "ORDER BY rowid"))
+            return SQLiteStore.records("doctors", rows) if as_records else rows
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_doctors(predicate=None):
+        try:
+            yield from (row for row in SQLiteStore.query("doctors", "ORDER BY rowid")
+                        if predicate is None or predicate(row))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+    @staticmethod
+    def delete_doctor(doctor_id):
+        try:
+            SQLiteStore.delete("doctors", doctor_id)
+            SQLiteStore.delete("doctor_logins", doctor_id)
+            messagebox.showinfo("Success", f"Doctor {doctor_id} deleted successfully!")
+            return True
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def delete_doctor_cascade(doctor_id):
+        try:
+            counts = SQLiteStore.cascade_delete("Doctor ID", doctor_id)
+            summary = "\n".join(f"{table}: {count}" for table, count in counts.items())
+            messagebox.showinfo("Success", f"Doctor {doctor_id} deleted successfully!\n\nRows removed:\n{summary}")
+            return counts
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
+            return None
+
+    @staticmethod
+    def search_doctors(field, term):
+        try:
+            return SQLiteStore.search("doctors", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def fuzzy_search_doctors(term, max_distance=None):
+        try:
+            return SQLiteStore.fuzzy_search("doctors", term, max_distance)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def complete_doctors(prefix, limit=20):
+        try:
+            return SQLiteStore.complete("doctors", prefix, limit)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def get_doctor_details(doctor_id):
+        try:
+            return next(SQLiteStore.query("doctors", "WHERE doctor_id = ?", (doctor_id,)), None)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not fetch doctor details: {e}")
+            return None
+
+
+class AppointmentManager:
+    @staticmethod
+    def make_appointment(patient_id, patient_name, doctor_id, doctor_name, date, time, reason):
+        try:
+            appointment_id = SQLiteStore.new_id("appointments")
+            SQLiteStore.insert("appointments", [appointment_id, patient_id, patient_name, doctor_id, doctor_name,
+                                                date, time, reason, "Scheduled"])
+            messagebox.showinfo("Success", f"Appointment booked successfully!\nAppointment ID: {appointment_id}")
+            return True
+        except Exception as e:
+            messagebox.showerror("Booking Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def view_appointments(patient_id=None, doctor_id=None, as_records=False):
+        """Rows as dicts, or as Appointment records when as_records is set"""
+        try:
+            rows = list(SQLiteStore.query_owned("appointments", patient_id, doctor_id))
+            return SQLiteStore.records("appointments", rows) if as_records else rows
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def search_appointments(field, term):
+        try:
+            return SQLiteStore.search("appointments", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_appointments(patient_id=None, doctor_id=None, predicate=None):
+        try:
+            yield from (row for row in SQLiteStore.query_owned("appointments", patient_id, doctor_id)
+                        if predicate is None or predicate(row))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+    @staticmethod
+    def next_appointments(count=10, patient_id=None, doctor_id=None, after=None):
+        try:
+            after = after or datetime.now().date()  # dates are stored as ISO text, which sorts by date
+            condition, params = SQLiteStore._owner_condition(patient_id, doctor_id)
+            where = "WHERE status = 'Scheduled' AND date >= ?" + (f" AND ({condition})" if condition else "")
+            return list(SQLiteStore.query("appointments", where + " ORDER BY date, time, rowid LIMIT ?",
+                                          [str(after)] + params + [count]))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def delete_appointment(appointment_id):
+        try:
+            SQLiteStore.delete("appointments", appointment_id)
+            messagebox.showinfo("Success", f"Appointment {appointment_id} deleted successfully!")
+            return True
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def update_appointment_status(appointment_id, new_status):
+        try:
+            connection = SQLiteStore.connect()
+            with connection:
+                connection.execute("UPDATE appointments SET status = ? WHERE appointment_id = ?",
+                                   (new_status, str(appointment_id)))
+            return True
+        except Exception as e:
+            messagebox.showerror("Update Error", f"Error: {e}")
+            return False
+
+
+class PrescriptionManager:
+    @staticmethod
+    def create_prescription(patient_id, patient_name, doctor_id, doctor_name,
+                            medication, dosage, instructions, issue_date, expiry_date):
+        try:
+            prescription_id = SQLiteStore.new_id("prescriptions")
+            SQLiteStore.insert("prescriptions", [prescription_id, patient_id, patient_name, doctor_id, doctor_name,
+                                                 medication, dosage, instructions, issue_date, expiry_date])
+            messagebox.showinfo("Success", f"Prescription created successfully!\nPrescription ID: {prescription_id}")
+            return True
+        except Exception as e:
+            messagebox.showerror("Prescription Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def view_prescriptions(patient_id=None, doctor_id=None, as_records=False):
+        """Rows as dicts, or as Prescription records when as_records is set"""
+        try:
+            rows = list(SQLiteStore.query_owned("prescriptions", patient_id, doctor_id))
+            return SQLiteStore.records("prescriptions", rows) if as_records else rows
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def search_prescriptions(field, term):
+        try:
+            return SQLiteStore.search("prescriptions", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_prescriptions(patient_id=None, doctor_id=None, predicate=None):
+        try:
+            yield from (row for row in SQLiteStore.query_owned("prescriptions", patient_id, doctor_id)
+                        if predicate is None or predicate(row))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+    @staticmethod
+    def delete_prescription(prescription_id):
+        try:
+            SQLiteStore.delete("prescriptions", prescription_id)
+            messagebox.showinfo("Success", f"Prescription {prescription_id} deleted successfully!")
+            return True
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
+            return False
+
+
+class MedicalRecordManager:
+    @staticmethod
+    def create_record(patient_id, patient_name, doctor_id, doctor_name,
+                      visit_date, diagnosis, treatment, notes, follow_up):
+        try:
+            record_id = SQLiteStore.new_id("medical_records")
+            SQLiteStore.insert("medical_records", [record_id, patient_id, patient_name, doctor_id, doctor_name,
+                                                   visit_date, diagnosis, treatment, notes, follow_up])
+            messagebox.showinfo("Success", f"Medical record created successfully!\nRecord ID: {record_id}")
+            return True
+        except Exception as e:
+            messagebox.showerror("Record Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def view_records(patient_id=None, doctor_id=None, as_records=False):
+        """Rows as dicts, or as MedicalRecord records when as_records is set"""
+        try:
+            rows = list(SQLiteStore.query_owned("medical_records", patient_id, doctor_id))
+            return SQLiteStore.records("medical_records", rows) if as_records else rows
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def search_records(field, term):
+        try:
+            return SQLiteStore.search("medical_records", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def page_records(start, count):
+        try:
+            return list(SQLiteStore.query("medical_records", "ORDER BY rowid LIMIT ? OFFSET ?", (count, start)))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_records(patient_id=None, doctor_id=None, predicate=None):
+        try:
+            yield from (row for row in SQLiteStore.query_owned("medical_records", patient_id, doctor_id)
+                        if predicate is None or predicate(row))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+
+    @staticmethod
+    def recent_records(count=20, patient_id=None, doctor_id=None):
+        try:
+            condition, params = SQLiteStore._owner_condition(patient_id, doctor_id)
+            where = "WHERE visit_date != ''" + (f" AND ({condition})" if condition else "")
+            return list(SQLiteStore.query("medical_records", where + " ORDER BY visit_date DESC, rowid LIMIT ?",
+                                          params + [count]))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def delete_record(record_id):
+        try:
+            SQLiteStore.delete("medical_records", record_id)
+            messagebox.showinfo("Success", f"Medical record {record_id} deleted successfully!")
+            return True
+        except Exception as e:
+            messagebox.showerror("Delete Error", f"Error: {e}")
+            return False
+
+
+class PaymentManager:
+    @staticmethod
+    def process_payment(patient_id, patient_name, amount, method):
+        try:
+            invoice_id = SQLiteStore.new_id("billing")
+            payment_date = datetime.now().strftime("%Y-%m-%d")
+            SQLiteStore.insert("billing", [invoice_id, patient_id, patient_name, amount, method, "Paid", payment_date])
+            messagebox.showinfo("Payment", f"Payment processed successfully!\nInvoice ID: {invoice_id}")
+            return True
+        except Exception as e:
+            messagebox.showerror("Payment Error", f"Error: {e}")
+            return False
+
+    @staticmethod
+    def view_payments(patient_id=None, as_records=False):
+        """Rows as dicts, or as Payment records when as_records is set"""
+        try:
+            rows = list(SQLiteStore.query_owned("billing", patient_id))
+            return SQLiteStore.records("billing", rows) if as_records else rows
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def search_payments(field, term):
+        try:
+            return SQLiteStore.search("billing", field, term)
+        except Exception as e:
+            messagebox.showerror("Search Error", f"Error: {e}")
+            return []
+
+    @staticmethod
+    def iter_payments(patient_id=None, predicate=None):
+        try:
+            yield from (row for row in SQLiteStore.query_owned("billing", patient_id)
+                        if predicate is None or predicate(row))
+        except Exception as e:
+            messagebox.showerror("View Error", f"Error: {e}")
@@ -0,0 +1,2554 @@
+import array
+import atexit
+import bisect
+import collections.abc
+import contextlib
+import csv
+import decimal
+import heapq
+import io
+import locale
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import uuid
+import warnings
+from datetime import date, datetime
+
+import meditrack_auth
+import meditrack_fuzzy
+
+# CSV storage engine behind the MediTrack managers: the table cache, row index,
+# change log, append journal, locks, snapshots, typed columns, search indexes
+# and the query planner. Nothing here imports Tk, so the engine can be used
+# (and tested) headless; meditrack.py builds the GUI and its managers on top.
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CSV_ENCODING = locale.getpreferredencoding(False)  # same encoding open() uses in text mode
+# Every read and write of the tables uses this, so a stray byte (e.g. a cp1252 "£" in a
+# UTF-8 locale) neither fails the read nor changes when a compaction rewrites the file
+CSV_ERRORS = "surrogateescape"
+
+class CSVManager:
+    # Column layout every manager writes rows in
+    TABLES = {
+        "patients.csv": ["Patient ID", "Name", "DOB", "Gender", "Contact", "Address", "Blood Type", "Allergies"],
+        "appointments.csv": ["Appointment ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name", "Date", "Time", "Reason", "Status"],
+        "doctors.csv": ["Doctor ID", "Name", "Specialization", "Contact No.", "License Number"],
+        "billing.csv": ["Invoice ID", "Patient ID", "Patient Name", "Amount", "Payment Method", "Status", "Date"],
+        "prescriptions.csv": ["Prescription ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name", 
+                             "Medication", "Dosage", "Instructions", "Issue Date", "Expiry Date"],
+        "medical_records.csv": ["Record ID", "Patient ID", "Patient Name", "Doctor ID", "Doctor Name", 
+                               "Visit Date", "Diagnosis", "Treatment", "Notes", "Follow Up"],
+        "admin.csv": ["Username", "Password"],
+        "doctor_login.csv": ["Doctor ID", "Password"],
+        "patient_login.csv": ["Patient ID", "Password"]
+    }
+
+    @staticmethod
+    def create_csv_files():
+        files = CSVManager.TABLES
+
+        with contextlib.ExitStack() as locks:
+            for filename in sorted(files):  # fixed lock order; no commit can be in progress
+                locks.enter_context(TableLock.exclusive(filename))
+            AtomicWriter.recover()
+            with AtomicWriter() as batch:
+                for filename, headers in files.items():
+                    if not os.path.exists(filename):
+                        writer = csv.writer(batch.open(filename))
+                        writer.writerow(headers)
+                        if filename == "admin.csv":
+                            writer.writerow(["admin1", meditrack_auth.hash_password("admin")])  # Default admin credentials
+                        elif filename == "patient_login.csv":
+                            # Default patient credentials
+                            writer.writerow(["1001", meditrack_auth.hash_password("patient1")])
+        AppendJournal.replay()
+
+    @staticmethod
+    def iter_rows(filename, predicate=None):
+        """Stream the rows of a table straight from disk, merged with its change log.
+
+        Only one row is held in memory at a time, so this suits exports and
+        scans of tables too large to materialise. Rows for which predicate
+        returns False are skipped.
+        """
+        AppendJournal.flush()  # read your own queued appends
+        resolve = NameResolver.resolver(filename)
+        with TableLock.shared(filename):
+            with open(filename, mode='r', newline='', errors=CSV_ERRORS) as file:
+                reader = csv.reader(file)
+                headers = SchemaRegistry.check(filename, next(reader, []))
+                for row in ChangeLog.merge(filename, reader):
+                    record = TableCache._to_dict(headers, resolve(row))
+                    if predicate is None or predicate(record):
+                        yield record
+
+    @staticmethod
+    def iter_raw_rows(filename):
+        """Stream the data rows of a table as lists in column order, merged with its change log
+        and with patient/doctor names filled in"""
+        AppendJournal.flush()
+        resolve = NameResolver.resolver(filename)
+        with TableLock.shared(filename):
+            with open(filename, mode='r', newline='', errors=CSV_ERRORS) as file:
+                reader = csv.reader(file)
+                next(reader, None)  # Skip header
+                for row in ChangeLog.merge(filename, reader):
+                    yield resolve(row)
+
+    @staticmethod
+    def iter_tuples(filename, predicate=None):
+        """Stream the rows of a table as fixed-width tuples in the layout of SchemaRegistry.
+
+        Cheaper than iter_rows when only a few columns are needed; use
+        SchemaRegistry.position() to find them. predicate receives the tuple.
+        """
+        parse = SchemaRegistry.parser(filename)
+        for row in CSVManager.iter_raw_rows(filename):
+            values = parse(row)
+            if predicate is None or predicate(values):
+                yield values
+
+class AtomicWriter:
+    """Crash-safe rewrite of one or more files as a single commit.
+
+    Each file is written to a temp file in the same directory. On commit the
+    temp files are fsynced, a manifest naming them is made durable, and they
+    are renamed over the originals. Every commit has its own manifest, so
+    commits on unrelated tables can run at the same time. If the process dies
+    after the manifest is written, recover() finishes the renames on the next
+    start; if it dies before, the originals are untouched.
+
+        with AtomicWriter() as batch:
+            csv.writer(batch.open("patients.csv")).writerows(rows)
+            csv.writer(batch.open("patient_login.csv")).writerows(logins)
+    """
+    MANIFEST = "meditrack.commit"  # manifests are MANIFEST.<random>; plain MANIFEST is from older versions
+    BUFFER_SIZE = 1024 * 1024  # safe to buffer heavily: nothing is visible until commit
+
+    def __init__(self):
+        self._pending = []  # (target, temp name, open file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def open(self, filename):
+        """Return a text file to write the new contents of filename into"""
+        temp_name = filename + ".tmp"
+        file = open(temp_name, mode='w', newline='', errors=CSV_ERRORS, buffering=AtomicWriter.BUFFER_SIZE)
+        self._pending.append((filename, temp_name, file))
+        return file
+
+    @staticmethod
+    def _fsync_directory(path):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        except OSError:
+            return  # directories cannot be opened on Windows; rename durability is up to the OS there
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def commit(self):
+        if not self._pending:
+            return
+        for _, _, file in self._pending:
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+
+        renames = [(temp_name, target) for target, temp_name, _ in self._pending]
+        manifest_name = f"{AtomicWriter.MANIFEST}.{uuid.uuid4().hex[:8]}"
+        with open(manifest_name, mode='w', newline='') as manifest:
+            csv.writer(manifest).writerows(renames)
+            manifest.flush()
+            os.fsync(manifest.fileno())
+        AtomicWriter._fsync_directory(manifest_name)
+
+        AtomicWriter._apply(manifest_name, renames)
+        self._pending = []
+
+    def abort(self):
+        for _, temp_name, file in self._pending:
+            file.close()
+            try:
+                os.remove(temp_name)
+            except FileNotFoundError:
+                pass
+        self._pending = []
+
+    @staticmethod
+    def _apply(manifest_name, renames):
+        for temp_name, target in renames:
+            if os.path.exists(temp_name):
+                os.replace(temp_name, target)
+        if renames:
+            AtomicWriter._fsync_directory(renames[0][1])
+        os.remove(manifest_name)
+
+    @staticmethod
+    def recover():
+        """Finish every commit that was interrupted after its manifest became durable.
+
+        Run with the tables' exclusive locks held, so no commit is in progress.
+        """
+        for manifest_name in sorted(os.listdir(".")):
+            if manifest_name != AtomicWriter.MANIFEST and not manifest_name.startswith(AtomicWriter.MANIFEST + "."):
+                continue
+            with open(manifest_name, mode='r', newline='') as manifest:
+                renames = [tuple(row) for row in csv.reader(manifest) if len(row) == 2]
+            AtomicWriter._apply(manifest_name, renames)
+            for _, target in renames:
+                TableCache.invalidate(target)
+
+class SchemaRegistry:
+    """Column layout and value type of every table, with a compiled tuple parser per table.
+
+    The layout rows are written in is CSVManager.TABLES, but files created by
+    older versions carry headers that drifted from it (a renamed "Blood group",
+    an appointments header without its ID columns). check() compares a file's
+    header with the layout once per distinct header, records any drift in
+    SchemaRegistry.drift with a warning, and readers then key rows by the
+    layout, so every reader sees the same column names whatever the file says.
+    """
+    # Value type of each column; columns not listed are free text
+    TYPES = {
+        "DOB": "birth_date", "Date": "date", "Visit Date": "date", "Issue Date": "date", "Expiry Date": "date",
+        "Time": "time",
+        "Amount": "amount",
+    }
+    drift = {}  # filename -> how its header differs from the layout
+    _checked = {}  # filename -> last on-disk header checked
+    _parsers = {}
+
+    @staticmethod
+    def columns(filename):
+        return CSVManager.TABLES[filename]
+
+    @staticmethod
+    def column_type(column):
+        return SchemaRegistry.TYPES.get(column, "text")
+
+    @staticmethod
+    def position(filename, column):
+        """Index of a column in the tuples produced by parser(filename)"""
+        return CSVManager.TABLES[filename].index(column)
+
+    @staticmethod
+    def check(filename, headers):
+        """Return the column names to key the rows of filename by, given its on-disk header"""
+        layout = CSVManager.TABLES.get(filename)
+        if layout is None or headers == layout:
+            SchemaRegistry.drift.pop(filename, None)
+            return layout or headers
+        if SchemaRegistry._checked.get(filename) != headers:
+            SchemaRegistry._checked[filename] = list(headers)
+            missing = [column for column in layout if column not in headers]
+            unknown = [column for column in headers if column not in layout]
+            problems = []
+            if missing:
+                problems.append(f"missing {', '.join(missing)}")
+            if unknown:
+                problems.append(f"unknown {', '.join(unknown)}")
+            SchemaRegistry.drift[filename] = "; ".join(problems) or "columns out of order"
+            warnings.warn(f"{filename} header does not match its layout ({SchemaRegistry.drift[filename]}); "
+                          f"reading it by the layout", stacklevel=2)
+        return layout
+
+    @staticmethod
+    def parser(filename):
+        """Return the compiled parser turning a raw row of filename into a tuple of exactly one
+        value per layout column, padded with None like csv.DictReader"""
+        parse = SchemaRegistry._parsers.get(filename)
+        if parse is None:
+            width = len(CSVManager.TABLES[filename])
+            padding = (None,) * width
+
+            def parse(row):
+                if len(row) == width:
+                    return tuple(row)
+                return (tuple(row) + padding)[:width]
+            SchemaRegistry._parsers[filename] = parse
+        return parse
+
+class TypedColumns:
+    """Native values for the date, time and amount columns of SchemaRegistry.TYPES.
+
+    Every distinct raw string is decoded once (dates such as "3/3/25" and
+    "2025-03-03", times, amounts such as "100.0" or "100£") and remembered,
+    and the decoded column of a cached table is kept alongside its rows, so
+    sorting and range filters compare datetime/Decimal values directly.
+    Values that cannot be decoded become None and are listed in report();
+    values decoded only after cleaning (stray currency signs, thousands
+    separators) are listed as normalised.
+    """
+    DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%y", "%m/%d/%Y", "%d/%m/%y", "%d/%m/%Y", "%Y/%m/%d")
+    TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p")
+    REPORT_LIMIT = 20  # example values kept per table and column
+    UNDECODABLE = re.compile("[\udc80-\udcff]")  # bytes the encoding could not decode, escaped by CSV_ERRORS
+    DECODED_LIMIT = 65536  # distinct raw values remembered across the typed columns
+    _decoded = {}  # (type, raw) -> (value, "ok" | "normalised" | "invalid"), typed columns only
+    _columns = {}  # (filename, column) -> (rows object, decoded values)
+    _report = {}  # filename -> {column: {"normalised": [...], "invalid": [...]}}
+
+    @staticmethod
+    def _decode_date(raw):
+        for date_format in TypedColumns.DATE_FORMATS:
+            try:
+                return datetime.strptime(raw, date_format).date()
+            except ValueError:
+                pass
+        return None
+
+    @staticmethod
+    def _decode_birth_date(raw):
+        """A date of birth is never in the future: "5/5/45" is 1945, not 2045"""
+        value = TypedColumns._decode_date(raw)
+        if value is not None and value > date.today() and re.fullmatch(r"\d{1,2}/\d{1,2}/\d\d", raw):
+            value = value.replace(year=value.year - 100)
+        return value
+
+    @staticmethod
+    def _decode_time(raw):
+        for time_format in TypedColumns.TIME_FORMATS:
+            try:
+                return datetime.strptime(raw, time_format).time()
+            except ValueError:
+                pass
+        return None
+
+    @staticmethod
+    def _decode_amount(raw):
+        try:
+            return decimal.Decimal(re.sub(r"[^\d.\-]", "", raw))
+        except decimal.InvalidOperation:
+            return None
+
+    @staticmethod
+    def decode_value(column_type, raw):
+        """Return (native value or None, "ok" | "normalised" | "invalid") for one raw value"""
+        if column_type == "text":
+            return raw, "ok"
+        cached = TypedColumns._decoded.get((column_type, raw))
+        if cached is None:
+            text = (raw or "").strip()
+            if not text:
+                return None, "ok"
+            value = getattr(TypedColumns, "_decode_" + column_type)(text)
+            if value is None:
+                cached = (None, "invalid")
+            elif column_type == "amount" and not re.fullmatch(r"-?\d+(\.\d+)?", text):
+                cached = (value, "normalised")
+            else:
+                cached = (value, "ok")
+            if len(TypedColumns._decoded) >= TypedColumns.DECODED_LIMIT:
+                TypedColumns._decoded.clear()  # keeps memory bounded when values are mostly distinct
+            TypedColumns._decoded[(column_type, raw)] = cached
+        return cached
+
+    @staticmethod
+    def decode(column, raw):
+        """Native value of a raw value of the named column (None if empty or undecodable)"""
+        return TypedColumns.decode_value(SchemaRegistry.column_type(column), raw)[0]
+
+    @staticmethod
+    def get_column(filename, column):
+        """Decoded values of one column of a table, in the order of TableCache.get_rows"""
+        rows = TableCache.get_rows(filename)
+        cached = TypedColumns._columns.get((filename, column))
+        if cached is not None and cached[0] is rows:
+            values = cached[1]  # same cached table; only rows appended since need decoding
+        else:
+            values = []
+            TypedColumns._report.setdefault(filename, {}).pop(column, None)
+        report = TypedColumns._report.setdefault(filename, {}).setdefault(column, {"normalised": [], "invalid": []})
+        if len(values) < len(rows):
+            column_type = SchemaRegistry.column_type(column)
+            for row in rows[len(values):]:
+                raw = row.get(column)
+                value, status = TypedColumns.decode_value(column_type, raw)
+                values.append(value)
+                if status != "ok" and len(report[status]) < TypedColumns.REPORT_LIMIT:
+                    report[status].append((next(iter(row.values()), None), raw))
+        TypedColumns._columns[(filename, column)] = (rows, values)
+        return values
+
+    @staticmethod
+    def report(filename=None):
+        """Decode every typed column of a table (or of all tables) and return what needed fixing:
+        {filename: {column: {"normalised": [(key, raw)], "invalid": [(key, raw)], "undecodable": [(key, raw)]}}}
+
+        "undecodable" lists values (of any column) holding bytes the file's encoding cannot
+        decode; a table that cannot be read at all is reported under the column "" as "unreadable".
+        """
+        filenames = [filename] if filename else list(CSVManager.TABLES)
+        result = {}
+        for name in filenames:
+            try:
+                problems = TypedColumns._table_report(name)
+            except UnicodeError as e:  # one unreadable table must not hide the others' problems
+                problems = {"": {"unreadable": [("", str(e))]}}
+            if problems:
+                result[name] = problems
+        return result
+
+    @staticmethod
+    def _table_report(filename):
+        problems = {}
+        for column in CSVManager.TABLES[filename]:
+            if SchemaRegistry.column_type(column) != "text":
+                TypedColumns.get_column(filename, column)
+                found = TypedColumns._report[filename][column]
+                if found["normalised"] or found["invalid"]:
+                    problems[column] = {status: examples for status, examples in found.items() if examples}
+        for row in TableCache.get_rows(filename):
+            for column, raw in row.items():
+                if isinstance(raw, str) and TypedColumns.UNDECODABLE.search(raw):
+                    examples = problems.setdefault(column, {}).setdefault("undecodable", [])
+                    if len(examples) < TypedColumns.REPORT_LIMIT:
+                        examples.append((next(iter(row.values()), None), raw))
+        return problems
+
+    @staticmethod
+    def range_filter(data, column, low=None, high=None):
+        """Rows of data whose column decodes to a value within [low, high]; either bound may be None"""
+        results = []
+        for row in data:
+            value = TypedColumns.decode(column, row.get(column))
+            if value is None:
+                continue
+            if (low is None or value >= low) and (high is None or value <= high):
+                results.append(row)
+        return results
+
+class Record:
+    """Compact in-memory row: one slot per column instead of a dict per row.
+
+    Subclasses list a table's layout columns as attributes (patient.blood_type)
+    and also answer record["Blood Type"] and record.get(...), so they can stand
+    in for the row dicts the managers return.
+    """
+    __slots__ = ()
+    TABLE = None
+    TYPES = {}  # filename -> Record subclass, filled in by register()
+
+    @staticmethod
+    def attribute(column):
+        """Attribute name of a layout column, e.g. "Contact No." -> contact_no"""
+        return re.sub(r'\W+', '_', column.lower()).strip('_')
+
+    @staticmethod
+    def slots(filename):
+        return tuple(Record.attribute(column) for column in CSVManager.TABLES[filename])
+
+    @staticmethod
+    def register(record_type):
+        record_type._columns = dict(zip(CSVManager.TABLES[record_type.TABLE], record_type.__slots__))
+        Record.TYPES[record_type.TABLE] = record_type
+        return record_type
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a record from a raw row in layout order; missing values become None"""
+        record = cls.__new__(cls)
+        for slot, value in zip(cls.__slots__, SchemaRegistry.parser(cls.TABLE)(row)):
+            setattr(record, slot, value)
+        return record
+
+    @classmethod
+    def from_dict(cls, row):
+        return cls.from_row([row.get(column) for column in cls._columns])
+
+    def __getitem__(self, column):
+        try:
+            return getattr(self, self._columns[column])
+        except KeyError:
+            raise KeyError(column) from None
+
+    def get(self, column, default=None):
+        slot = self._columns.get(column)
+        return default if slot is None else getattr(self, slot)
+
+    def keys(self):
+        return self._columns.keys()
+
+    def values(self):
+        return [getattr(self, slot) for slot in self.__slots__]
+
+    def items(self):
+        return [(column, getattr(self, slot)) for column, slot in self._columns.items()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.values() == other.values()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{slot}={getattr(self, slot)!r}' for slot in self.__slots__)})"
+
+@Record.register
+class Patient(Record):
+    TABLE = "patients.csv"
+    __slots__ = Record.slots(TABLE)
+
+@Record.register
+class Doctor(Record):
+    TABLE = "doctors.csv"
+    __slots__ = Record.slots(TABLE)
+
+@Record.register
+class Appointment(Record):
+    TABLE = "appointments.csv"
+    __slots__ = Record.slots(TABLE)
+
+@Record.register
+class Prescription(Record):
+    TABLE = "prescriptions.csv"
+    __slots__ = Record.slots(TABLE)
+
+@Record.register
+class MedicalRecord(Record):
+    TABLE = "medical_records.csv"
+    __slots__ = Record.slots(TABLE)
+
+@Record.register
+class Payment(Record):
+    TABLE = "billing.csv"
+    __slots__ = Record.slots(TABLE)
+
+class RowIndex:
+    """Persistent row index stored next to each CSV.
+
+    Maps the primary key (first column) to the row's byte offset and length, and
+    the owner columns listed in OWNER_COLUMNS to every row that references them.
+    Every row read through the index is checked against the key or owner it was
+    found by; a row that does not match means the CSV was rewritten behind the
+    index's back, and the index is rebuilt from a full scan before reading on.
+    """
+    # Foreign keys the per-user dashboards filter on
+    OWNER_COLUMNS = {
+        "appointments.csv": ["Patient ID", "Doctor ID"],
+        "prescriptions.csv": ["Patient ID", "Doctor ID"],
+        "medical_records.csv": ["Patient ID", "Doctor ID"],
+        "billing.csv": ["Patient ID"],
+    }
+    _indexes = {}  # filename -> {"headers", "covered", "last", "signature", "keys", "owners"}
+
+    @staticmethod
+    def _index_file(filename):
+        return filename + ".idx"
+
+    @staticmethod
+    def _owner_positions(filename):
+        """Positions of the owner columns in the layout rows are written in"""
+        layout = CSVManager.TABLES.get(filename, [])
+        return [layout.index(column) for column in RowIndex.OWNER_COLUMNS.get(filename, [])]
+
+    @staticmethod
+    def scan(filename, start=0):
+        """Yield (offset, length, row) for every CSV record from byte position start onwards"""
+        with open(filename, mode='rb') as file:
+            file.seek(start)
+            position = start
+
+            def lines():
+                nonlocal position
+                for raw in file:
+                    position += len(raw)
+                    yield raw.decode(CSV_ENCODING, CSV_ERRORS)
+
+            reader = csv.reader(lines())
+            while True:
+                offset = position
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    return
+                if row:
+                    yield offset, position - offset, row
+
+    @staticmethod
+    def read_record(filename, offset, length):
+        """Parse the single CSV record stored at the given byte range"""
+        with open(filename, mode='rb') as file:
+            file.seek(offset)
+            raw = file.read(length)
+        return next(csv.reader(io.StringIO(raw.decode(CSV_ENCODING, CSV_ERRORS), newline='')), [])
+
+    @staticmethod
+    def _empty_index(filename):
+        with open(filename, mode='r', newline='', errors=CSV_ERRORS) as file:
+            headers = SchemaRegistry.check(filename, next(csv.reader(file), []))
+        owners = {column: {} for column in RowIndex.OWNER_COLUMNS.get(filename, [])}
+        return {"headers": headers, "covered": 0, "last": None, "signature": None, "keys": {}, "owners": owners}
+
+    @staticmethod
+    def _add_entry(index, key, offset, length, owner_values):
+        entry = (offset, length)
+        index["keys"].setdefault(key, entry)
+        for column, value in zip(index["owners"], owner_values):
+            index["owners"][column].setdefault(value, []).append(entry)
+        if offset + length > index["covered"]:
+            index["covered"] = offset + length
+            index["last"] = (key, offset, length)
+
+    @staticmethod
+    def _load(filename):
+        """Load the on-disk index for a CSV file; a missing or damaged one starts out empty"""
+        index = RowIndex._empty_index(filename)
+        try:
+            with open(RowIndex._index_file(filename), mode='r', newline='', errors=CSV_ERRORS) as file:
+                for key, offset, length, *owner_values in csv.reader(file):
+                    if len(owner_values) != len(index["owners"]):
+                        raise ValueError("index layout does not match OWNER_COLUMNS")
+                    RowIndex._add_entry(index, key, int(offset), int(length), owner_values)
+        except (FileNotFoundError, ValueError):
+            RowIndex._discard_file(filename)
+            index = RowIndex._empty_index(filename)
+        return index
+
+    @staticmethod
+    def _matches(filename, row, column, value):
+        """True if a row read at an indexed offset really holds value in column"""
+        position = CSVManager.TABLES[filename].index(column)
+        return position < len(row) and row[position] == value
+
+    @staticmethod
+    def _rebuild(filename):
+        """Index a table afresh after a read found a stale entry; call with the table locked"""
+        RowIndex.invalidate(filename)
+        return RowIndex.get_index(filename)
+
+    @staticmethod
+    def _is_consistent(filename, index):
+        """Cheap check that the indexed prefix of the CSV has not been rewritten behind our back"""
+        if os.path.getsize(filename) < index["covered"]:
+            return False
+        if index["last"] is None:
+            return True
+        key, offset, length = index["last"]
+        record = RowIndex.read_record(filename, offset, length)
+        return bool(record) and record[0] == key
+
+    @staticmethod
+    def _catch_up(filename, index):
+        """Index the records appended since the index was last written"""
+        positions = RowIndex._owner_positions(filename)
+        new_entries = []
+        for offset, length, row in RowIndex.scan(filename, index["covered"]):
+            if offset == 0:
+                continue  # header row
+            owner_values = [row[position] if position < len(row) else '' for position in positions]
+            RowIndex._add_entry(index, row[0], offset, length, owner_values)
+            new_entries.append([row[0], offset, length] + owner_values)
+        if new_entries:
+            with open(RowIndex._index_file(filename), mode='a', newline='', errors=CSV_ERRORS) as file:
+                csv.writer(file).writerows(new_entries)
+
+    @staticmethod
+    def get_index(filename):
+        """Return the up-to-date in-memory index for a CSV file.
+
+        Does not flush AppendJournal: that may wait for a table lock, so callers
+        flush before taking theirs (see lookup).
+        """
+        with TableLock.shared(filename):
+            signature = TableCache._signature(filename)
+            index = RowIndex._indexes.get(filename)
+            if index is not None and index["signature"] == signature:
+                return index
+            if index is None:
+                index = RowIndex._load(filename)
+            if not RowIndex._is_consistent(filename, index):
+                RowIndex._discard_file(filename)
+                index = RowIndex._empty_index(filename)
+            if signature[1] > index["covered"]:
+                RowIndex._catch_up(filename, index)
+            index["signature"] = signature
+            RowIndex._indexes[filename] = index
+            return index
+
+    @staticmethod
+    def lookup(filename, key):
+        """Return the row dict for a primary key with one seek, or None if it is not present"""
+        AppendJournal.flush()  # read your own queued appends; never done under a table lock
+        return RowIndex._lookup(filename, key)
+
+    @staticmethod
+    def _lookup(filename, key):
+        """lookup without the journal flush, for callers already holding the table lock"""
+        resolve = NameResolver.resolver(filename)
+        key_column = CSVManager.TABLES[filename][0]
+        with TableLock.shared(filename):
+            index = RowIndex.get_index(filename)
+            entry = index["keys"].get(key)
+            if entry is None:
+                return None
+            row = RowIndex.read_record(filename, *entry)
+            if not RowIndex._matches(filename, row, key_column, key):
+                index = RowIndex._rebuild(filename)
+                entry = index["keys"].get(key)
+                if entry is None:
+                    return None
+                row = RowIndex.read_record(filename, *entry)
+            record = ChangeLog.apply(row, *ChangeLog.get_state(filename))
+            return TableCache._to_dict(index["headers"], resolve(record)) if record else None
+
+    @staticmethod
+    def lookup_owned(filename, owners):
+        """Return, in file order, the rows whose owner column matches any of the given values.
+
+        owners maps owner columns to IDs, e.g. {"Patient ID": "b43ccc35", "Doctor ID": None};
+        empty values are ignored.
+        """
+        return list(RowIndex.iter_owned(filename, owners))
+
+    @staticmethod
+    def iter_owned(filename, owners):
+        """Generator form of lookup_owned that reads one matching row at a time"""
+        AppendJournal.flush()
+        resolve = NameResolver.resolver(filename)
+        owners = {column: value for column, value in owners.items() if value}
+        with TableLock.shared(filename):
+            index = RowIndex.get_index(filename)
+            deleted, updates = ChangeLog.get_state(filename)
+            read = set()  # offsets already checked; the table cannot change while we hold its lock
+            rebuilt = False
+            with open(filename, mode='rb') as file:
+                while True:
+                    entries = set()
+                    for column, value in owners.items():
+                        entries.update(index["owners"][column].get(value, []))
+                    for offset, length in sorted(entries):
+                        if offset in read:
+                            continue
+                        file.seek(offset)
+                        raw = file.read(length).decode(CSV_ENCODING, CSV_ERRORS)
+                        row = next(csv.reader(io.StringIO(raw, newline='')), [])
+                        if not any(RowIndex._matches(filename, row, column, value) for column, value in owners.items()):
+                            if rebuilt:
+                                continue
+                            index, rebuilt = RowIndex._rebuild(filename), True
+                            break  # read on from the rebuilt index, skipping the rows already read
+                        read.add(offset)
+                        record = ChangeLog.apply(row, deleted, updates)
+                        if record is not None:
+                            yield TableCache._to_dict(index["headers"], resolve(record))
+                    else:
+                        return
+
+    @staticmethod
+    def owned_keys(filename, column, value):
+        """Primary keys of the live rows whose owner column equals value; queued journal
+        appends are not seen, so flush AppendJournal before locking the table"""
+        with TableLock.shared(filename):
+            index = RowIndex.get_index(filename)
+            deleted, _ = ChangeLog.get_state(filename)
+            rows = [RowIndex.read_record(filename, offset, length)
+                    for offset, length in index["owners"][column].get(value, [])]
+            if not all(RowIndex._matches(filename, row, column, value) for row in rows):
+                index = RowIndex._rebuild(filename)
+                rows = [RowIndex.read_record(filename, offset, length)
+                        for offset, length in index["owners"][column].get(value, [])]
+            keys = []
+            for row in rows:
+                if row and row[0] not in deleted and row[0] not in keys:
+                    keys.append(row[0])
+            return keys
+
+    @staticmethod
+    def note_append(filename, row, offset, length):
+        """Record a freshly appended row without rescanning the file"""
+        index = RowIndex._indexes.get(filename)
+        if index is None or index["covered"] != offset:
+            return  # picked up by the next catch-up scan
+        owner_values = [row[position] for position in RowIndex._owner_positions(filename)]
+        RowIndex._add_entry(index, row[0], offset, length, owner_values)
+        index["signature"] = TableCache._signature(filename)
+        with open(RowIndex._index_file(filename), mode='a', newline='', errors=CSV_ERRORS) as file:
+            csv.writer(file).writerow([row[0], offset, length] + owner_values)
+
+    @staticmethod
+    def _discard_file(filename):
+        try:
+            os.remove(RowIndex._index_file(filename))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def invalidate(filename):
+        RowIndex._indexes.pop(filename, None)
+        RowIndex._discard_file(filename)
+
+class TableCache:
+    """Process-wide cache of parsed CSV tables, reloaded only when a file changes"""
+    _tables = {}  # filename -> (signature, headers, rows, NameResolver.version)
+    _records = {}  # filename -> (signature, NameResolver.version, records)
+
+    @staticmethod
+    def _signature(filename):
+        stat = os.stat(filename)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _to_dict(headers, row):
+        """Build a row dict the same way csv.DictReader does"""
+        record = dict(zip(headers, row))
+        if len(row) > len(headers):
+            record[None] = row[len(headers):]
+        for header in headers[len(row):]:
+            record[header] = None
+        return record
+
+    @staticmethod
+    def _table_signature(filename):
+        """Signature of a table: the base CSV plus its pending change log"""
+        return (TableCache._signature(filename), ChangeLog.signature(filename))
+
+    @staticmethod
+    def _read_values(filename):
+        """Headers and raw rows (value lists, names unresolved) of a table with its change
+        log merged; call with the table locked"""
+        with open(filename, mode='r', newline='', errors=CSV_ERRORS) as file:
+            reader = csv.reader(file)
+            headers = SchemaRegistry.check(filename, next(reader, []))
+            return headers, list(ChangeLog.merge(filename, reader))
+
+    @staticmethod
+    def get_rows(filename):
+        """Return the parsed rows of a table, re-parsing only if the CSV, its change log
+        or the names it refers to changed"""
+        AppendJournal.flush()  # read your own queued appends
+        resolve = NameResolver.resolver(filename)
+        with TableLock.shared(filename):
+            signature = TableCache._table_signature(filename)
+            cached = TableCache._tables.get(filename)
+            if cached is None or cached[0] != signature or cached[3] != NameResolver.version:
+                snapshot = TableSnapshot.load(filename, signature)
+                if snapshot is not None:
+                    headers = snapshot.headers = SchemaRegistry.check(filename, snapshot.headers)
+                    rows = snapshot
+                    snapshot.resolve = resolve
+                else:
+                    headers, values = TableCache._read_values(filename)
+                    if len(values) >= TableSnapshot.MIN_ROWS:
+                        TableSnapshot.write(filename, signature, headers, values)
+                    rows = [TableCache._to_dict(headers, resolve(row)) for row in values]
+                cached = (signature, headers, rows, NameResolver.version)
+                TableCache._tables[filename] = cached
+            return cached[2]
+
+    @staticmethod
+    def get_records(filename):
+        """Like get_rows, but as the table's Record type, cached separately from the dicts"""
+        signature = TableCache._table_signature(filename)
+        cached = TableCache._records.get(filename)
+        if cached is None or cached[0] != signature or cached[1] != NameResolver.version:
+            record_type = Record.TYPES[filename]
+            records = [record_type.from_row(row) for row in CSVManager.iter_raw_rows(filename)]
+            cached = (signature, NameResolver.version, records)
+            TableCache._records[filename] = cached
+        return cached[2]
+
+    @staticmethod
+    def append_row(filename, row):
+        """Append one row to a CSV file, keeping an up-to-date cache entry in step"""
+        TableCache.append_rows(filename, [row])
+
+    @staticmethod
+    def append_rows(filename, rows):
+        """Append rows to a CSV file with a single write, keeping the cache and row index in step"""
+        resolve = NameResolver.resolver(filename)
+        with TableLock.exclusive(filename):
+            cached = TableCache._tables.get(filename)
+            fresh = (cached is not None and cached[0] == TableCache._table_signature(filename)
+                     and cached[3] == NameResolver.version)
+
+            offset = os.path.getsize(filename)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            chunks, appended = [], []
+            for row in rows:
+                writer.writerow(row)
+                encoded = buffer.getvalue().encode(CSV_ENCODING, CSV_ERRORS)
+                buffer.seek(0)
+                buffer.truncate()
+                values = ['' if value is None else str(value) for value in row]
+                chunks.append(encoded)
+                appended.append((values, offset, len(encoded)))
+                offset += len(encoded)
+            with open(filename, mode='ab') as file:
+                file.write(b''.join(chunks))
+            for values, row_offset, length in appended:
+                RowIndex.note_append(filename, values, row_offset, length)
+
+            if fresh:
+                _, headers, cached_rows, version = cached
+                cached_rows.extend(TableCache._to_dict(headers, resolve(values)) for values, _, _ in appended)
+                TableCache._tables[filename] = (TableCache._table_signature(filename), headers, cached_rows, version)
+            else:
+                TableCache._tables.pop(filename, None)
+
+    @staticmethod
+    def invalidate(filename):
+        """Drop the cached rows and the row index after a file has been rewritten"""
+        TableCache._tables.pop(filename, None)
+        TableCache._records.pop(filename, None)
+        RowIndex.invalidate(filename)
+
+class SnapshotTable(collections.abc.Sequence):
+    """Rows of a memory-mapped snapshot, decoded into dicts only when accessed"""
+
+    def __init__(self, mapping, headers, row_lengths, columns):
+        self._mapping = mapping
+        self.headers = headers
+        self._row_lengths = row_lengths
+        self._columns = columns  # per column: (offsets, blob) memoryviews
+        self._decoded = [None] * len(row_lengths)
+        self._appended = []
+        self.resolve = None  # fills in names on decode, see NameResolver
+
+    def __len__(self):
+        return len(self._row_lengths) + len(self._appended)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if position >= len(self._row_lengths):
+            return self._appended[position - len(self._row_lengths)]
+        record = self._decoded[position]
+        if record is None:
+            values = self.row_values(position)
+            record = TableCache._to_dict(self.headers, self.resolve(values) if self.resolve else values)
+            self._decoded[position] = record
+        return record
+
+    def row_values(self, position):
+        """The raw values of one row, without building a dict"""
+        return [self.value(position, column) for column in range(self._row_lengths[position])]
+
+    def value(self, position, column):
+        offsets, blob = self._columns[column]
+        return str(blob[offsets[position]:offsets[position + 1]], 'utf-8', 'surrogatepass')
+
+    def column(self, header):
+        """Decode a single column for every snapshot row, e.g. for a scan over one field"""
+        column = self.headers.index(header)
+        return [self.value(position, column) if column < length else None
+                for position, length in enumerate(self._row_lengths)] + \
+            [record.get(header) for record in self._appended]
+
+    def append(self, record):
+        self._appended.append(record)
+
+    def extend(self, records):
+        self._appended.extend(records)
+
+class TableSnapshot:
+    """Compact binary, columnar snapshot of a table, written next to its CSV as <file>.snap.
+
+    The CSV stays the source of truth: a snapshot is only used while the CSV
+    and its change log still have the signature recorded in it. Layout (native
+    byte order, which the magic records):
+
+        magic, CSV mtime/size, log mtime/size, row count, column count, header count
+        column headers as length-prefixed UTF-8
+        array('H') of values per row
+        per column: array('Q') of row_count + 1 offsets into that column's UTF-8 blob, then the blob
+
+    Loading only maps the file and slices out these arrays, so opening a large
+    table is independent of its row count; values are decoded on access.
+    """
+    MAGIC = b"MTSNAP1" + (b"L" if sys.byteorder == "little" else b"B")
+    HEADER = struct.Struct("<8sqqqqQII")
+    MIN_ROWS = 1000  # smaller tables parse quickly enough without one
+    _current = {}  # filename -> signature of the snapshot on disk
+
+    @staticmethod
+    def _snapshot_file(filename):
+        return filename + ".snap"
+
+    @staticmethod
+    def _pad(file):
+        file.write(b"\0" * (-file.tell() % 8))
+
+    @staticmethod
+    def write(filename, signature, headers, rows):
+        """Write a snapshot of raw rows (lists of values) taken at the given table signature"""
+        (csv_mtime, csv_size), log_signature = signature
+        log_mtime, log_size = log_signature or (-1, -1)
+        width = max([len(headers)] + [len(row) for row in rows])
+        # callers hold only the shared lock, so another process may be writing the same snapshot
+        temp_name = f"{TableSnapshot._snapshot_file(filename)}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(temp_name, mode='wb') as file:
+                file.write(TableSnapshot.HEADER.pack(TableSnapshot.MAGIC, csv_mtime, csv_size,
+                                                     log_mtime, log_size, len(rows), width, len(headers)))
+                for header in headers:
+                    encoded = header.encode('utf-8', 'surrogatepass')
+                    file.write(struct.pack("<I", len(encoded)) + encoded)
+                TableSnapshot._pad(file)
+                file.write(array.array('H', [len(row) for row in rows]).tobytes())
+                TableSnapshot._pad(file)
+                for column in range(width):
+                    values = [row[column].encode('utf-8', 'surrogatepass') if column < len(row) else b""
+                              for row in rows]
+                    offsets = array.array('Q', [0])
+                    for value in values:
+                        offsets.append(offsets[-1] + len(value))
+                    file.write(offsets.tobytes())
+                    file.write(b"".join(values))
+                    TableSnapshot._pad(file)
+            os.replace(temp_name, TableSnapshot._snapshot_file(filename))
+            TableSnapshot._current[filename] = signature
+        except OSError:
+            # A snapshot is only an accelerator (and Windows refuses to replace a mapped file)
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+    @staticmethod
+    def load(filename, signature):
+        """Map the snapshot of a table, or return None if it is missing or stale"""
+        try:
+            with open(TableSnapshot._snapshot_file(filename), mode='rb') as file:
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        view = memoryview(mapping)
+        try:
+            magic, csv_mtime, csv_size, log_mtime, log_size, row_count, width, header_count = \
+                TableSnapshot.HEADER.unpack_from(view, 0)
+            log_signature = None if log_size < 0 else (log_mtime, log_size)
+            if magic != TableSnapshot.MAGIC or ((csv_mtime, csv_size), log_signature) != signature:
+                raise ValueError("stale snapshot")
+
+            position = TableSnapshot.HEADER.size
+            headers = []
+            while len(headers) < header_count:
+                (length,) = struct.unpack_from("<I", view, position)
+                headers.append(str(view[position + 4:position + 4 + length], 'utf-8', 'surrogatepass'))
+                position += 4 + length
+            position += -position % 8
+            row_lengths = view[position:position + 2 * row_count].cast('H')
+            position += 2 * row_count
+            position += -position % 8
+
+            columns = []
+            for _ in range(width):
+                offsets = view[position:position + 8 * (row_count + 1)].cast('Q')
+                position += 8 * (row_count + 1)
+                blob = view[position:position + offsets[row_count]]
+                position += offsets[row_count]
+                position += -position % 8
+                columns.append((offsets, blob))
+        except (ValueError, struct.error, IndexError, TypeError):
+            view.release()
+            mapping.close()
+            return None
+        TableSnapshot._current[filename] = signature
+        return SnapshotTable(mapping, headers, row_lengths, columns)
+
+    @staticmethod
+    def save_all():
+        """Snapshot every large cached table that changed since its snapshot was taken.
+
+        The cached rows have their names resolved, so the raw rows are re-read from disk.
+        """
+        for filename, (signature, _, rows, _) in list(TableCache._tables.items()):
+            if len(rows) < TableSnapshot.MIN_ROWS or TableSnapshot._current.get(filename) == signature:
+                continue
+            with TableLock.shared(filename):
+                try:
+                    if TableCache._table_signature(filename) != signature:
+                        continue
+                except FileNotFoundError:
+                    continue
+                headers, values = TableCache._read_values(filename)
+                TableSnapshot.write(filename, signature, headers, values)
+
+atexit.register(TableSnapshot.save_all)
+
+class CSVScanner:
+    """Memory-mapped scanner over one CSV table.
+
+    Keeps the byte range of every live data row in two array('Q')s, so rows
+    can be addressed by number for paging, and decodes only the columns a
+    scan asks for instead of building a dict per row. The mapping is only
+    held for the duration of a call, so it never blocks a compaction.
+    """
+    _scanners = {}  # filename -> CSVScanner
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.headers = []
+        self._signature = None
+        self._inode = None
+        self._covered = 0  # bytes of the file already split into rows
+        self._starts = array.array('Q')
+        self._ends = array.array('Q')
+        self._updates = {}
+        self._updated = set()  # numbers of the rows with pending updates
+        self._resolve = None
+        self._name_positions = NameResolver.name_positions(filename)
+
+    @staticmethod
+    def open(filename):
+        """Return the shared scanner of a table"""
+        scanner = CSVScanner._scanners.get(filename)
+        if scanner is None:
+            scanner = CSVScanner._scanners[filename] = CSVScanner(filename)
+        return scanner
+
+    @contextlib.contextmanager
+    def _mapped(self):
+        """Lock the table, bring the row offsets up to date and yield the mapped file"""
+        AppendJournal.flush()  # read your own queued appends
+        self._resolve = NameResolver.resolver(self.filename)
+        with TableLock.shared(self.filename):
+            with open(self.filename, mode='rb') as file:
+                stat = os.fstat(file.fileno())
+                if stat.st_size == 0:
+                    self._reset(None, 0)
+                    yield b""
+                    return
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    self._refresh(data, stat)
+                    yield data
+
+    def _reset(self, inode, signature):
+        self.headers = []
+        self._signature, self._inode, self._covered = signature, inode, 0
+        self._starts, self._ends = array.array('Q'), array.array('Q')
+        self._updated = set()
+
+    def _refresh(self, data, stat):
+        signature = TableCache._table_signature(self.filename)
+        if signature == self._signature:
+            return
+        log_changed = self._signature is None or signature[1] != self._signature[1]
+        if log_changed or stat.st_ino != self._inode or stat.st_size < self._covered:
+            self._reset(stat.st_ino, signature)
+        deleted, self._updates = ChangeLog.get_state(self.filename)
+
+        for start, end in self._split(data, self._covered, len(data)):
+            raw = data[start:end]
+            if not raw.strip():
+                continue
+            if start == 0:
+                self.headers = SchemaRegistry.check(self.filename, self._parse(raw))
+                continue
+            key = self._parse(raw, (0,))[0] if deleted or self._updates else None
+            if key in deleted:
+                continue
+            if key in self._updates:
+                self._updated.add(len(self._starts))
+            self._starts.append(start)
+            self._ends.append(end)
+        self._covered = len(data)
+        self._signature = signature
+
+    @staticmethod
+    def _split(data, start, end):
+        """Yield the byte range of each CSV record, keeping quoted newlines inside their record"""
+        while start < end:
+            stop = data.find(b"\n", start, end)
+            stop = end if stop < 0 else stop + 1
+            while data.find(b'"', start, stop) >= 0 and data[start:stop].count(b'"') % 2 and stop < end:
+                stop = data.find(b"\n", stop, end)
+                stop = end if stop < 0 else stop + 1
+            yield start, stop
+            start = stop
+
+    @staticmethod
+    def _parse(raw, positions=None):
+        """Decode a raw record: every field, or only those at the given positions (None if absent)"""
+        if positions is None or b'"' in raw:
+            row = next(csv.reader(io.StringIO(raw.decode(CSV_ENCODING, CSV_ERRORS), newline='')), [])
+            if positions is None:
+                return row
+            return [row[position] if position < len(row) else None for position in positions]
+        fields = raw.rstrip(b"\r\n").split(b",", max(positions) + 1)
+        return [fields[position].decode(CSV_ENCODING, CSV_ERRORS) if position < len(fields) else None
+                for position in positions]
+
+    def _record(self, data, number):
+        row = self._parse(data[self._starts[number]:self._ends[number]])
+        return self._resolve(ChangeLog.apply(row, (), self._updates))
+
+    def _values(self, data, number, positions):
+        if number in self._updated or self._name_positions.intersection(positions):
+            row = self._record(data, number)
+            return [row[position] if position < len(row) else None for position in positions]
+        return self._parse(data[self._starts[number]:self._ends[number]], positions)
+
+    def __len__(self):
+        with self._mapped():
+            return len(self._starts)
+
+    def page(self, start, count):
+        """Return up to count row dicts starting at row number start"""
+        with self._mapped() as data:
+            return [TableCache._to_dict(self.headers, self._record(data, number))
+                    for number in range(start, min(start + count, len(self._starts)))]
+
+    def column(self, header):
+        """Return the values of one column for every row, decoding nothing else"""
+        with self._mapped() as data:
+            positions = (self.headers.index(header),)
+            return [self._values(data, number, positions)[0] for number in range(len(self._starts))]
+
+    def _find(self, data, header, value):
+        if header not in self.headers:
+            return []
+        value = str(value).lower()
+        position = self.headers.index(header)
+        positions = (position,)
+        matches = []
+        for number, (start, end) in enumerate(zip(self._starts, self._ends)):
+            raw = data[start:end]
+            if number in self._updated or position in self._name_positions or b'"' in raw:
+                field = self._values(data, number, positions)[0]
+            else:
+                # fast path for plain records: split only as far as the wanted column
+                fields = raw.rstrip(b"\r\n").split(b",", position + 1)
+                field = fields[position].decode(CSV_ENCODING, CSV_ERRORS) if position < len(fields) else None
+            if field and value in field.lower():
+                matches.append(number)
+        return matches
+
+    def find(self, header, value):
+        """Return the numbers of the rows whose column contains value, ignoring case"""
+        with self._mapped() as data:
+            return self._find(data, header, value)
+
+    def search(self, header, value):
+        """Return the row dicts whose column contains value, ignoring case"""
+        with self._mapped() as data:
+            return [TableCache._to_dict(self.headers, self._record(data, number))
+                    for number in self._find(data, header, value)]
+
+class TableLock:
+    """Inter-process reader/writer locks for MediTrack instances sharing a data directory.
+
+    Locks are taken on a <file>.lock sidecar rather than the CSV itself, so
+    they survive the CSV being replaced by an atomic rewrite. Readers take a
+    shared lock and run in parallel; writers and compaction take an exclusive
+    one. Within a process the locks are re-entrant. On Windows only exclusive
+    locks are available, so readers there queue up behind each other.
+
+        with TableLock.exclusive("appointments.csv"):
+            ...
+    """
+    wait_stats = {}  # filename -> {"acquisitions", "wait_seconds", "max_wait_seconds"}
+    _held = {}  # filename -> {"fd", "exclusive", "depth"}
+    _thread_locks = {}
+    _guard = threading.Lock()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def shared(filename):
+        TableLock._acquire(filename, exclusive=False)
+        try:
+            yield
+        finally:
+            TableLock._release(filename)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def exclusive(filename):
+        TableLock._acquire(filename, exclusive=True)
+        try:
+            yield
+        finally:
+            TableLock._release(filename)
+
+    @staticmethod
+    def _os_lock(fd, exclusive):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            return
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(0.01)
+
+    @staticmethod
+    def _os_unlock(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _acquire(filename, exclusive):
+        with TableLock._guard:
+            thread_lock = TableLock._thread_locks.setdefault(filename, threading.RLock())
+        start = time.perf_counter()
+        thread_lock.acquire()
+        try:
+            held = TableLock._held.get(filename)
+            if held is None:
+                fd = os.open(filename + ".lock", os.O_RDWR | os.O_CREAT)
+                TableLock._os_lock(fd, exclusive)
+                held = TableLock._held[filename] = {"fd": fd, "exclusive": exclusive, "depth": 0}
+            elif exclusive and not held["exclusive"]:
+                TableLock._os_lock(held["fd"], True)  # upgrade; kept until the outermost release
+                held["exclusive"] = True
+            held["depth"] += 1
+        except BaseException:
+            thread_lock.release()
+            raise
+        waited = time.perf_counter() - start
+
+        stats = TableLock.wait_stats.setdefault(
+            filename, {"acquisitions": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0})
+        stats["acquisitions"] += 1
+        stats["wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    @staticmethod
+    def _release(filename):
+        held = TableLock._held[filename]
+        held["depth"] -= 1
+        if held["depth"] == 0:
+            del TableLock._held[filename]
+            TableLock._os_unlock(held["fd"])
+            os.close(held["fd"])
+        TableLock._thread_locks[filename].release()
+
+class ChangeLog:
+    """Append-only log of deletes and updates kept next to each CSV.
+
+    Deleting or updating a row appends one line to <file>.log instead of
+    rewriting the table; readers merge the log on the fly. Once the log grows
+    past COMPACTION_THRESHOLD bytes a background thread folds it into the
+    base file.
+    """
+    COMPACTION_THRESHOLD = 64 * 1024
+    # Tables that are always changed together and so are compacted in one commit
+    COMPACTION_GROUPS = [
+        ("patients.csv", "patient_login.csv"),
+        ("doctors.csv", "doctor_login.csv"),
+    ]
+    # Tables holding an owner's own rows, by the column other tables reference it with
+    CASCADES = {
+        "Patient ID": ("patients.csv", "patient_login.csv"),
+        "Doctor ID": ("doctors.csv", "doctor_login.csv"),
+    }
+    _states = {}  # filename -> (signature, deleted keys, {key: {position: value}})
+
+    @staticmethod
+    def _log_file(filename):
+        return filename + ".log"
+
+    @staticmethod
+    def signature(filename):
+        try:
+            stat = os.stat(ChangeLog._log_file(filename))
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def get_state(filename):
+        """Return (deleted keys, pending updates) for a table, re-reading the log only when it changed"""
+        with TableLock.shared(filename):
+            signature = ChangeLog.signature(filename)
+            cached = ChangeLog._states.get(filename)
+            if cached is not None and cached[0] == signature:
+                return cached[1], cached[2]
+
+            deleted, updates = set(), {}
+            if signature is not None:
+                with open(ChangeLog._log_file(filename), mode='r', newline='', errors=CSV_ERRORS) as file:
+                    for entry in csv.reader(file):
+                        if not entry:
+                            continue
+                        if entry[0] == "D":
+                            deleted.add(entry[1])
+                            updates.pop(entry[1], None)
+                        elif entry[0] == "U" and entry[1] not in deleted:
+                            updates.setdefault(entry[1], {})[int(entry[2])] = entry[3]
+            ChangeLog._states[filename] = (signature, deleted, updates)
+            return deleted, updates
+
+    @staticmethod
+    def apply(row, deleted, updates):
+        """Return the row with pending updates applied, or None if it has been deleted"""
+        if not row or row[0] in deleted:
+            return None
+        changes = updates.get(row[0])
+        if changes:
+            row = list(row)
+            for position, value in changes.items():
+                row.extend([''] * (position + 1 - len(row)))
+                row[position] = value
+        return row
+
+    @staticmethod
+    def merge(filename, rows):
+        """Yield the rows of a table (header excluded) with its change log applied"""
+        deleted, updates = ChangeLog.get_state(filename)
+        for row in rows:
+            row = ChangeLog.apply(row, deleted, updates)
+            if row is not None:
+                yield row
+
+    @staticmethod
+    def _append(filename, *entries):
+        with TableLock.exclusive(filename):
+            with open(ChangeLog._log_file(filename), mode='a', newline='', errors=CSV_ERRORS) as file:
+                csv.writer(file).writerows(entries)
+            needs_compaction = ChangeLog.signature(filename)[1] >= ChangeLog.COMPACTION_THRESHOLD
+        if needs_compaction:
+            group = next((group for group in ChangeLog.COMPACTION_GROUPS if filename in group), (filename,))
+            threading.Thread(target=ChangeLog.compact, args=group, daemon=True).start()
+
+    @staticmethod
+    def delete(filename, key):
+        """Delete every row with the given primary key by appending a tombstone"""
+        ChangeLog._append(filename, ["D", key])
+
+    @staticmethod
+    def update(filename, key, column, value):
+        """Set one column of the rows with the given primary key by appending an update"""
+        position = CSVManager.TABLES[filename].index(column)
+        ChangeLog._append(filename, ["U", key, position, value])
+
+    @staticmethod
+    def cascade_delete(column, owner_id):
+        """Delete an owner (patient or doctor), its login and every row that references it.
+
+        All affected tables are locked together and each gets at most one
+        append to its log; dependent rows are found through the owner index.
+        Returns the number of rows deleted per table.
+        """
+        owner_tables = ChangeLog.CASCADES[column]
+        dependents = [filename for filename, columns in RowIndex.OWNER_COLUMNS.items() if column in columns]
+        AppendJournal.flush()  # queued appends may reference the owner too
+        with contextlib.ExitStack() as locks:
+            for filename in sorted(owner_tables + tuple(dependents)):  # fixed lock order
+                locks.enter_context(TableLock.exclusive(filename))
+            doomed = {filename: [owner_id] if RowIndex._lookup(filename, owner_id) else []
+                      for filename in owner_tables}
+            for filename in dependents:
+                doomed[filename] = RowIndex.owned_keys(filename, column, owner_id)
+            for filename, keys in doomed.items():
+                if keys:
+                    ChangeLog._append(filename, *(["D", key] for key in keys))
+        return {filename: len(keys) for filename, keys in doomed.items()}
+
+    @staticmethod
+    def compact(*filenames):
+        """Fold the change logs of the given tables into their base CSVs in one atomic commit"""
+        filenames = sorted(filenames)  # fixed lock order
+        AppendJournal.settle()
+        with contextlib.ExitStack() as locks:
+            for filename in filenames:
+                locks.enter_context(TableLock.exclusive(filename))
+            pending = [filename for filename in filenames if ChangeLog.signature(filename) is not None]
+            if not pending:
+                return
+            dimensions = {dimension for dimension, _ in NameResolver.DIMENSIONS.values()}
+            with AtomicWriter() as batch:
+                for filename in pending:
+                    if filename in dimensions:
+                        NameResolver.retain(batch, filename)
+                    with open(filename, mode='r', newline='', errors=CSV_ERRORS) as source:
+                        reader = csv.reader(source)
+                        writer = csv.writer(batch.open(filename))
+                        writer.writerow(next(reader, []))
+                        writer.writerows(ChangeLog.merge(filename, reader))
+            for filename in pending:
+                os.remove(ChangeLog._log_file(filename))
+                ChangeLog._states.pop(filename, None)
+                TableCache.invalidate(filename)
+
+class IDAllocator:
+    """Hands out record IDs that are unique within their table.
+
+    Candidates keep the existing 8-character format and are checked against
+    the primary keys of the row index, the change log's tombstones (a reused
+    ID would be hit by the old delete) and the IDs this process has already
+    handed out but may not have written yet, all of which are in-memory sets.
+    """
+    PRUNE_THRESHOLD = 10000  # reserved IDs kept before those already on disk are dropped
+    _reserved = {}  # filename -> IDs handed out by this process
+
+    @staticmethod
+    def new_id(filename):
+        return IDAllocator.allocate_block(filename, 1)[0]
+
+    @staticmethod
+    def allocate_block(filename, count):
+        """Reserve count fresh IDs at once, e.g. for a bulk import"""
+        AppendJournal.flush()  # queued rows' IDs must be seen; never done under a table lock
+        return IDAllocator._allocate_block(filename, count)
+
+    @staticmethod
+    def _allocate_block(filename, count):
+        """allocate_block without the journal flush, for callers already holding the table lock"""
+        with TableLock.shared(filename):
+            keys = RowIndex.get_index(filename)["keys"]
+            deleted, _ = ChangeLog.get_state(filename)
+            reserved = IDAllocator._reserved.setdefault(filename, set())
+            if len(reserved) > IDAllocator.PRUNE_THRESHOLD:
+                reserved.difference_update(keys)
+            ids = []
+            while len(ids) < count:
+                candidate = str(uuid.uuid4())[:8]
+                if candidate not in keys and candidate not in deleted and candidate not in reserved:
+                    reserved.add(candidate)
+                    ids.append(candidate)
+            return ids
+
+class NameResolver:
+    """Patient and doctor names for the tables that reference them, resolved at read time.
+
+    Appointments, prescriptions, medical records and bills store the
+    patient/doctor ID and leave the name columns empty; readers fill the
+    names in from an in-memory {ID: name} map of patients.csv and
+    doctors.csv. The maps grow incrementally as people are added and are
+    rebuilt when their table is rewritten or its change log moves, which
+    bumps version so that cached rows holding old names are re-read. A name
+    stored in the row itself (older rows, or IDs the dimension table does not
+    know) is kept as the fallback.
+
+    Compaction physically drops deleted people, so it first saves their names
+    to <dimension>.names in the same commit; rows that still reference them
+    keep resolving to the name instead of going blank.
+
+    Resolvers must be built before the table that uses them is locked, so a
+    reader never holds its own table's lock while waiting on patients.csv
+    or doctors.csv.
+    """
+    # ID column -> (dimension table, name column filled from it)
+    DIMENSIONS = {
+        "Patient ID": ("patients.csv", "Patient Name"),
+        "Doctor ID": ("doctors.csv", "Doctor Name"),
+    }
+    version = 0
+    _maps = {}  # dimension table -> {"log", "inode", "covered", "names", "live"}
+
+    @staticmethod
+    def _columns(filename):
+        """(ID position, name position, dimension table) for each name column of a table"""
+        layout = CSVManager.TABLES.get(filename, [])
+        return [(layout.index(id_column), layout.index(name_column), dimension)
+                for id_column, (dimension, name_column) in NameResolver.DIMENSIONS.items()
+                if id_column in layout and name_column in layout]
+
+    @staticmethod
+    def name_positions(filename):
+        return {name_position for _, name_position, _ in NameResolver._columns(filename)}
+
+    @staticmethod
+    def _retained_file(dimension):
+        return dimension + ".names"
+
+    @staticmethod
+    def _retained(dimension):
+        """{ID: name} of the people compaction has dropped from a dimension table"""
+        try:
+            with open(NameResolver._retained_file(dimension), mode='r', newline='',
+                      errors=CSV_ERRORS) as file:
+                return {row[0]: row[1] for row in csv.reader(file) if len(row) == 2}
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def retain(batch, dimension):
+        """Add the names of the people a compaction of dimension drops to its .names file.
+
+        Written into the compaction's AtomicWriter batch, under its lock.
+        """
+        deleted, _ = ChangeLog.get_state(dimension)
+        if not deleted:
+            return
+        retained = NameResolver._retained(dimension)
+        with open(dimension, mode='r', newline='', errors=CSV_ERRORS) as source:
+            reader = csv.reader(source)
+            next(reader, None)
+            for row in reader:
+                if len(row) > 1 and row[0] in deleted and row[1]:
+                    retained.setdefault(row[0], row[1])
+        csv.writer(batch.open(NameResolver._retained_file(dimension))).writerows(retained.items())
+
+    @staticmethod
+    def get_names(dimension):
+        """The {ID: name} map of patients.csv or doctors.csv, brought up to date"""
+        with TableLock.shared(dimension):
+            log = ChangeLog.signature(dimension)
+            stat = os.stat(dimension)
+            state = NameResolver._maps.get(dimension)
+            if (state is None or state["log"] != log or state["inode"] != stat.st_ino
+                    or stat.st_size < state["covered"]):
+                if state is not None:
+                    NameResolver.version += 1
+                state = {"log": log, "inode": stat.st_ino, "covered": 0,
+                         "names": NameResolver._retained(dimension), "live": set()}
+                NameResolver._maps[dimension] = state
+            if stat.st_size > state["covered"]:
+                # deleted people keep their name until compaction, so orphaned rows still show it
+                _, updates = ChangeLog.get_state(dimension)
+                for offset, _, row in RowIndex.scan(dimension, state["covered"]):
+                    row = ChangeLog.apply(row, (), updates) if offset else None
+                    if row and len(row) > 1 and row[1] and row[0] not in state["live"]:
+                        state["live"].add(row[0])  # the first live row wins, over a retained name too
+                        state["names"][row[0]] = row[1]
+                state["covered"] = stat.st_size
+            return state["names"]
+
+    @staticmethod
+    def resolver(filename):
+        """Return a function that fills in the names of a raw row of filename in place"""
+        columns = [(id_position, name_position, NameResolver.get_names(dimension))
+                   for id_position, name_position, dimension in NameResolver._columns(filename)]
+
+        def resolve(row):
+            for id_position, name_position, names in columns:
+                if name_position < len(row):
+                    row[name_position] = names.get(row[id_position], row[name_position])
+            return row
+        return resolve
+
+    @staticmethod
+    def normaliser(filename):
+        """Return a function that blanks, in place, the names of a row that readers can resolve"""
+        columns = [(id_position, name_position, NameResolver.get_names(dimension))
+                   for id_position, name_position, dimension in NameResolver._columns(filename)]
+
+        def normalise(row):
+            for id_position, name_position, names in columns:
+                if name_position < len(row) and row[id_position] in names:
+                    row[name_position] = ''
+            return row
+        return normalise
+
+    @staticmethod
+    def migrate():
+        """Rewrite the referencing tables without the names readers can resolve.
+
+        Pending change logs are folded in on the way. Returns the bytes saved per table.
+        """
+        tables = sorted(filename for filename in CSVManager.TABLES if NameResolver._columns(filename))
+        normalisers = {filename: NameResolver.normaliser(filename) for filename in tables}
+        AppendJournal.flush()
+        AppendJournal.settle()  # pending deletes are dropped too
+        with contextlib.ExitStack() as locks:
+            for filename in tables:
+                locks.enter_context(TableLock.exclusive(filename))
+            before = {filename: os.path.getsize(filename) for filename in tables}
+            with AtomicWriter() as batch:
+                for filename in tables:
+                    with open(filename, mode='r', newline='', errors=CSV_ERRORS) as source:
+                        reader = csv.reader(source)
+                        writer = csv.writer(batch.open(filename))
+                        writer.writerow(next(reader, []))
+                        writer.writerows(normalisers[filename](row) for row in ChangeLog.merge(filename, reader))
+            for filename in tables:
+                if ChangeLog.signature(filename) is not None:
+                    os.remove(ChangeLog._log_file(filename))
+                ChangeLog._states.pop(filename, None)
+                TableCache.invalidate(filename)
+            return {filename: before[filename] - os.path.getsize(filename) for filename in tables}
+
+class AppendJournal:
+    """Optional group-commit write-ahead journal for appends.
+
+    With ENABLED set (or MEDITRACK_JOURNAL=1 in the environment), appends are
+    queued in memory and flushed as a group once MAX_BATCH rows are waiting
+    or MAX_DELAY seconds have passed. A flush writes the whole group to this
+    process's journal with one fsync, then appends the rows to their tables.
+    Each process journals to its own meditrack.journal.<pid>.<random> file
+    and holds an exclusive lock on it while it runs. The journal is only
+    truncated at a checkpoint, after the tables have been fsynced, and
+    removed at exit. replay() re-applies the journals nobody holds any more
+    (their process crashed) on start-up. Rows whose ID is already in the table
+    are skipped, so replaying twice is harmless. A row that was deleted and
+    then compacted away has no ID left to skip it by, so rewrites that drop
+    rows call settle() first.
+    """
+    ENABLED = os.environ.get("MEDITRACK_JOURNAL") == "1"
+    JOURNAL = "meditrack.journal"  # file name prefix; also matches the single journal of older versions
+    MAX_BATCH = 100
+    MAX_DELAY = 0.5  # seconds
+    CHECKPOINT_SIZE = 1024 * 1024  # bytes of journal before the tables are fsynced and it is truncated
+    _queue = []  # (filename, row)
+    _dirty = set()  # tables appended to since the last checkpoint
+    _journal = None  # (path, file) of this process's journal, opened and locked on the first flush
+    _timer = None
+    _lock = threading.RLock()
+
+    @staticmethod
+    def append(filename, row):
+        """Append a row, through the journal when it is enabled"""
+        if not AppendJournal.ENABLED:
+            TableCache.append_row(filename, row)
+            return
+        with AppendJournal._lock:
+            AppendJournal._queue.append((filename, ['' if value is None else str(value) for value in row]))
+            if len(AppendJournal._queue) >= AppendJournal.MAX_BATCH:
+                AppendJournal.flush()
+            elif AppendJournal._timer is None:
+                AppendJournal._timer = threading.Timer(AppendJournal.MAX_DELAY, AppendJournal.flush)
+                AppendJournal._timer.daemon = True
+                AppendJournal._timer.start()
+
+    @staticmethod
+    def _try_lock(fd):
+        """Take an exclusive lock on a journal without waiting; False if a live process holds it"""
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _open_journal():
+        while AppendJournal._journal is None:
+            path = f"{AppendJournal.JOURNAL}.{os.getpid()}.{uuid.uuid4().hex[:8]}"
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND)
+            TableLock._os_lock(fd, True)
+            try:
+                ours = os.path.samestat(os.fstat(fd), os.stat(path))
+            except FileNotFoundError:
+                ours = False
+            if ours:
+                AppendJournal._journal = (path, os.fdopen(fd, mode='a', newline='', errors=CSV_ERRORS))
+            else:
+                os.close(fd)  # a replay took it for an orphan before we locked it; pick another name
+        return AppendJournal._journal[1]
+
+    @staticmethod
+    def flush():
+        """Make every queued append durable with one fsync and apply it to the tables"""
+        with AppendJournal._lock:
+            if AppendJournal._timer is not None:
+                AppendJournal._timer.cancel()
+                AppendJournal._timer = None
+            batch, AppendJournal._queue = AppendJournal._queue, []
+            if not batch:
+                return
+
+            journal = AppendJournal._open_journal()
+            csv.writer(journal).writerows([filename] + row for filename, row in batch)
+            journal.flush()
+            os.fsync(journal.fileno())
+
+            AppendJournal._apply(batch)
+            if os.fstat(journal.fileno()).st_size >= AppendJournal.CHECKPOINT_SIZE:
+                AppendJournal.checkpoint()
+
+    @staticmethod
+    def _apply(batch):
+        by_table = {}
+        for filename, row in batch:
+            by_table.setdefault(filename, []).append(row)
+        for filename, rows in by_table.items():
+            TableCache.append_rows(filename, rows)
+            AppendJournal._dirty.add(filename)
+
+    @staticmethod
+    def _sync_tables():
+        for filename in AppendJournal._dirty:
+            with open(filename, mode='rb') as file:
+                os.fsync(file.fileno())
+        AppendJournal._dirty.clear()
+
+    @staticmethod
+    def checkpoint():
+        """fsync the tables written since the last checkpoint, then truncate this process's journal"""
+        with AppendJournal._lock:
+            if AppendJournal._journal is None:
+                return
+            AppendJournal._sync_tables()
+            journal = AppendJournal._journal[1]
+            journal.truncate(0)
+            os.fsync(journal.fileno())
+
+    @staticmethod
+    def replay():
+        """Re-apply the journals left behind by processes that crashed; live processes' are skipped"""
+        with AppendJournal._lock:
+            own = AppendJournal._journal[0] if AppendJournal._journal else None
+            for path in sorted(os.listdir(".")):
+                if path == own or not (path == AppendJournal.JOURNAL or path.startswith(AppendJournal.JOURNAL + ".")):
+                    continue
+                try:
+                    fd = os.open(path, os.O_RDWR)
+                except FileNotFoundError:
+                    continue
+                # closing it releases the lock
+                with os.fdopen(fd, mode='r', newline='', errors=CSV_ERRORS) as journal:
+                    if not AppendJournal._try_lock(fd):
+                        continue
+                    batch = []
+                    for entry in csv.reader(journal):
+                        if not entry or entry[0] not in CSVManager.TABLES \
+                                or len(entry) - 1 < len(CSVManager.TABLES[entry[0]]):
+                            continue  # torn final write from the crash
+                        filename, row = entry[0], entry[1:]
+                        if row[0] not in RowIndex.get_index(filename)["keys"]:
+                            batch.append((filename, row))
+                    AppendJournal._apply(batch)
+                    AppendJournal._sync_tables()
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)  # after closing, as Windows cannot remove open files
+
+    @staticmethod
+    def settle():
+        """Replay orphaned journals and checkpoint this process's, so that no journal still
+        holds rows a rewrite is about to drop; call before locking the tables"""
+        AppendJournal.replay()
+        AppendJournal.checkpoint()
+
+    @staticmethod
+    def close():
+        """Flush queued appends, checkpoint and remove this process's journal; run at interpreter exit"""
+        with AppendJournal._lock:
+            AppendJournal.flush()
+            if AppendJournal._journal is None:
+                return
+            AppendJournal.checkpoint()
+            path, journal = AppendJournal._journal
+            AppendJournal._journal = None
+            journal.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+atexit.register(AppendJournal.close)
+
+class SortEngine:
+    """Stable O(n log n) sorting of row dicts (or records) on one or more columns.
+
+    A typed key is computed once per row and column: native values for the
+    typed columns of SchemaRegistry, numbers for numeric text, case-folded
+    text otherwise. Rows are then ordered with Python's stable sort, one pass
+    per column from the least significant, each ascending or descending.
+    """
+
+    @staticmethod
+    def key(record, column):
+        """Comparable key of one field; undecodable typed values sort last, text after numbers"""
+        return SortEngine._raw_key(SchemaRegistry.column_type(column), record.get(column))
+
+    @staticmethod
+    def _raw_key(column_type, raw):
+        if column_type != "text":
+            value = TypedColumns.decode_value(column_type, raw)[0]
+            return (1, 0) if value is None else (0, value)
+        try:
+            return (0, float(raw))
+        except (TypeError, ValueError):
+            return (1, str(raw).casefold())
+
+    @staticmethod
+    def keys(data, column):
+        """The key of every row for one column, computing each distinct value's key once"""
+        column_type = SchemaRegistry.column_type(column)
+        known = {}
+        keys = []
+        for record in data:
+            raw = record.get(column)
+            key = known.get(raw)
+            if key is None:
+                key = known[raw] = SortEngine._raw_key(column_type, raw)
+            keys.append(key)
+        return keys
+
+    @staticmethod
+    def sort(data, columns):
+        """Sort data in place and return it.
+
+        columns lists column names or (column, ascending) pairs, most significant first,
+        e.g. SortEngine.sort(appointments, [("Date", False), "Time"]).
+        """
+        columns = [(column, True) if isinstance(column, str) else column for column in columns]
+        order = list(range(len(data)))
+        for column, ascending in reversed(columns):
+            keys = SortEngine.keys(data, column)
+            order.sort(key=keys.__getitem__, reverse=not ascending)
+        data[:] = [data[position] for position in order]
+        return data
+
+class TopK:
+    """The first k rows of an ordering without sorting everything: O(n log k) time, O(k) memory.
+
+    Rows may be any iterable, e.g. AppointmentManager.iter_appointments(), and
+    are consumed one at a time. Each row's key is computed once, with the same
+    typed keys as SortEngine, and only the best k (key, row) pairs are kept
+    in a bounded heap, so select(rows, k, columns) returns exactly
+    SortEngine.sort(list(rows), columns)[:k], ties in arrival order.
+    """
+    KNOWN_LIMIT = 4096  # distinct raw values whose keys are remembered per column
+
+    class _Descending:
+        """Inverts the order of one key inside a mixed-direction tuple key"""
+        __slots__ = ("key",)
+
+        def __init__(self, key):
+            self.key = key
+
+        def __lt__(self, other):
+            return other.key < self.key
+
+        def __eq__(self, other):
+            return self.key == other.key
+
+    @staticmethod
+    def select(rows, k, columns):
+        """The k first rows in the order of SortEngine.sort(rows, columns), best first"""
+        if k <= 0:
+            return []
+        columns = [(column, True) if isinstance(column, str) else column for column in columns]
+        specs = [(column, SchemaRegistry.column_type(column), {}, ascending) for column, ascending in columns]
+        raw_key, descending = SortEngine._raw_key, TopK._Descending
+        mixed = len({ascending for _, ascending in columns}) > 1
+
+        def key(row):
+            values = []
+            for column, column_type, known, ascending in specs:
+                raw = row.get(column)
+                value = known.get(raw)
+                if value is None:
+                    if len(known) >= TopK.KNOWN_LIMIT:
+                        known.clear()  # keeps memory bounded on columns with many distinct values
+                    value = raw_key(column_type, raw)
+                    if mixed and not ascending:
+                        value = descending(value)
+                    known[raw] = value
+                values.append(value)
+            return tuple(values)
+        select = heapq.nlargest if not mixed and not columns[0][1] else heapq.nsmallest
+        return select(k, rows, key=key)
+
+class TrigramIndex:
+    """Inverted index from lower-cased trigrams to rows, per table column, for substring search.
+
+    A search for "ackso" only checks the rows whose column contains every
+    trigram of the term ("ack", "cks", "kso") instead of scanning the table.
+    Postings are keyed by primary key. When the cached table grows only the
+    new rows are indexed; when it is re-read (after deletes or updates) the
+    index is diffed against it and only rows whose value changed or that
+    disappeared are re-indexed.
+    """
+    MIN_TERM = 3  # shorter terms have no trigram and fall back to a scan
+    _indexes = {}  # (filename, column) -> {"rows", "covered", "postings", "values", "positions", "duplicates"}
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @staticmethod
+    def _reindex(state, key, value):
+        old = state["values"].get(key)
+        if old == value:
+            return
+        postings = state["postings"]
+        if old is None:
+            for gram in {value[i:i + 3] for i in range(len(value) - 2)}:
+                keys = postings.get(gram)
+                if keys is None:
+                    postings[gram] = {key}
+                else:
+                    keys.add(key)
+            state["values"][key] = value
+            return
+        old_grams = TrigramIndex.trigrams(old) if old is not None else set()
+        new_grams = TrigramIndex.trigrams(value) if value is not None else set()
+        for gram in old_grams - new_grams:
+            keys = postings[gram]
+            keys.discard(key)
+            if not keys:
+                del postings[gram]
+        for gram in new_grams - old_grams:
+            postings.setdefault(gram, set()).add(key)
+        if value is None:
+            del state["values"][key]
+        else:
+            state["values"][key] = value
+
+    @staticmethod
+    def _sync(state, rows, key_column, column, start):
+        """Index rows[start:]; from 0 this rebuilds the row maps and diffs the postings"""
+        if start == 0:
+            state["positions"], state["duplicates"] = {}, {}
+        positions, duplicates = state["positions"], state["duplicates"]
+        changed = {}
+        for position in range(start, len(rows)):
+            row = rows[position]
+            key = row.get(key_column)
+            value = str(row.get(column, '')).lower()
+            if key in positions:
+                duplicates.setdefault(key, []).append(position)
+                value = changed.get(key, state["values"].get(key)) + "\0" + value
+            else:
+                positions[key] = position
+            changed[key] = value
+        for key, value in changed.items():
+            TrigramIndex._reindex(state, key, value)
+        if start == 0:
+            for key in [key for key in state["values"] if key not in positions]:
+                TrigramIndex._reindex(state, key, None)
+        state["rows"], state["covered"] = rows, len(rows)
+
+    @staticmethod
+    def get_index(filename, column):
+        rows = TableCache.get_rows(filename)
+        state = TrigramIndex._indexes.get((filename, column))
+        if state is None:
+            state = {"rows": None, "covered": 0, "postings": {}, "values": {}, "positions": {}, "duplicates": {}}
+            TrigramIndex._indexes[(filename, column)] = state
+        key_column = CSVManager.TABLES[filename][0]
+        if state["rows"] is not rows:
+            TrigramIndex._sync(state, rows, key_column, column, 0)
+        elif state["covered"] < len(rows):
+            TrigramIndex._sync(state, rows, key_column, column, state["covered"])
+        return state
+
+    @staticmethod
+    def search(filename, column, term):
+        """Rows of a table whose column contains term, ignoring case, in table order
+        (the same result as linear_search over the whole table)"""
+        term = str(term).lower()
+        if len(term) < TrigramIndex.MIN_TERM:
+            return SearchSortManager.linear_search(TableCache.get_rows(filename), column, term)
+        state = TrigramIndex.get_index(filename, column)
+        postings = sorted((state["postings"].get(gram, set()) for gram in TrigramIndex.trigrams(term)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        rows, positions, duplicates = state["rows"], state["positions"], state["duplicates"]
+        matches = []
+        for key in candidates:
+            matches.append(positions[key])
+            matches.extend(duplicates.get(key, ()))
+        return [rows[position] for position in sorted(matches)
+                if term in str(rows[position].get(column, '')).lower()]
+
+class PrefixIndex:
+    """Sorted (key, row position) array over the ID and name words of a table, for prefix completion.
+
+    Each row is entered under its lower-cased primary key, its full name and
+    every later word of the name, so "smi" finds "John Smith". A prefix lookup
+    is a bisection into the array; entries for appended rows are merged in and
+    the array is only rebuilt when the cached table is re-read.
+    """
+    _indexes = {}  # filename -> {"rows", "covered", "entries"}
+
+    @staticmethod
+    def _keys(row, columns):
+        keys = set()
+        for column in columns:
+            value = str(row.get(column) or '').lower()
+            words = value.split()
+            keys.add(value)
+            keys.update(" ".join(words[i:]) for i in range(1, len(words)))
+        keys.discard('')
+        return keys
+
+    @staticmethod
+    def get_index(filename, columns):
+        rows = TableCache.get_rows(filename)
+        state = PrefixIndex._indexes.get((filename, columns))
+        if state is None or state["rows"] is not rows:
+            entries = [(key, position) for position, row in enumerate(rows)
+                       for key in PrefixIndex._keys(row, columns)]
+            entries.sort()
+            state = {"rows": rows, "covered": len(rows), "entries": entries}
+            PrefixIndex._indexes[(filename, columns)] = state
+        elif state["covered"] < len(rows):
+            state["entries"].extend((key, position) for position in range(state["covered"], len(rows))
+                                    for key in PrefixIndex._keys(rows[position], columns))
+            state["entries"].sort()  # one sorted run plus the new entries: merged in linear time
+            state["covered"] = len(rows)
+        return state
+
+    @staticmethod
+    def complete(filename, prefix, limit=20, columns=None):
+        """Up to limit rows with an ID, name or name word starting with prefix, ignoring case,
+        in key order; columns defaults to the primary key and "Name" """
+        columns = tuple(columns or (CSVManager.TABLES[filename][0], "Name"))
+        state = PrefixIndex.get_index(filename, columns)
+        entries, rows = state["entries"], state["rows"]
+        prefix = str(prefix).lower().lstrip()
+        seen, matches = set(), []
+        for position in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            key, row = entries[position]
+            if not key.startswith(prefix) or len(matches) >= limit:
+                break
+            if row not in seen:
+                seen.add(row)
+                matches.append(rows[row])
+        return matches
+
+class FuzzyIndex:
+    """BK-tree over the words of a name column, for misspelling-tolerant search.
+
+    Each row is filed under the words of its value, so "smiht" finds every
+    Smith and "jonh smiht" finds John Smith within 4 edits. The tree only
+    grows: a re-read table just rebuilds the word -> rows map and adds the
+    words it has not seen before.
+    """
+    _indexes = {}  # (filename, column) -> {"rows", "covered", "tree", "words"}
+
+    @staticmethod
+    def _add_rows(state, rows, column, start):
+        words, tree = state["words"], state["tree"]
+        for position in range(start, len(rows)):
+            for word in meditrack_fuzzy.name_words(rows[position].get(column)):
+                words.setdefault(word, []).append(position)
+                tree.add(word)
+        state["rows"], state["covered"] = rows, len(rows)
+
+    @staticmethod
+    def get_index(filename, column):
+        rows = TableCache.get_rows(filename)
+        state = FuzzyIndex._indexes.get((filename, column))
+        if state is None:
+            state = {"rows": None, "covered": 0, "tree": meditrack_fuzzy.BKTree(), "words": {}}
+            FuzzyIndex._indexes[(filename, column)] = state
+        if state["rows"] is not rows:
+            state["words"] = {}
+            FuzzyIndex._add_rows(state, rows, column, 0)
+        elif state["covered"] < len(rows):
+            FuzzyIndex._add_rows(state, rows, column, state["covered"])
+        return state
+
+    @staticmethod
+    def search(filename, column, term, max_distance=None):
+        """(distance, row) pairs for rows within max_distance edits of term, word by word
+        and ignoring case; closest first, then in table order"""
+        if max_distance is None:
+            max_distance = meditrack_fuzzy.MAX_DISTANCE
+        state = FuzzyIndex.get_index(filename, column)
+        distances = meditrack_fuzzy.match(state["tree"], state["words"], term, max_distance)
+        rows = state["rows"]
+        return [(distance, rows[position]) for position, distance in
+                sorted(distances.items(), key=lambda item: (item[1], item[0]))]
+
+class RangeIndex:
+    """Sorted (value, row position) array over a typed column, for range lookups with bisect.
+
+    Built from the decoded values of TypedColumns.get_column, so "3/3/25" and
+    "2025-03-03" sort as the same date; undecodable values are left out.
+    Appended rows are merged in; the array is rebuilt when the table is re-read.
+    """
+    _indexes = {}  # (filename, column) -> {"rows", "covered", "entries"}
+
+    @staticmethod
+    def get_index(filename, column):
+        rows = TableCache.get_rows(filename)
+        values = TypedColumns.get_column(filename, column)
+        state = RangeIndex._indexes.get((filename, column))
+        if state is None or state["rows"] is not rows:
+            state = {"rows": rows, "covered": 0, "entries": []}
+            RangeIndex._indexes[(filename, column)] = state
+        if state["covered"] < len(values):
+            state["entries"].extend((values[position], position) for position in range(state["covered"], len(values))
+                                    if values[position] is not None)
+            state["entries"].sort()
+            state["covered"] = len(values)
+        return state
+
+    @staticmethod
+    def _bounds(state, low, high):
+        entries = state["entries"]
+        start = 0 if low is None else bisect.bisect_left(entries, (low,))
+        end = len(entries) if high is None else bisect.bisect_right(entries, (high, len(state["rows"])))
+        return start, end
+
+    @staticmethod
+    def count(filename, column, low=None, high=None):
+        """Number of rows whose column decodes to a value within [low, high]"""
+        start, end = RangeIndex._bounds(RangeIndex.get_index(filename, column), low, high)
+        return max(end - start, 0)
+
+    @staticmethod
+    def rows(filename, column, low=None, high=None):
+        """Rows whose column decodes to a value within [low, high], in table order"""
+        state = RangeIndex.get_index(filename, column)
+        start, end = RangeIndex._bounds(state, low, high)
+        rows = state["rows"]
+        return [rows[position] for position in sorted(position for _, position in state["entries"][start:end])]
+
+class Eq:
+    """column == value; typed columns compare decoded values, so Eq("Date", "3/3/25") matches "2025-03-03" """
+    def __init__(self, column, value):
+        self.column = column
+        self.typed = SchemaRegistry.column_type(column) != "text"
+        self.undecodable = False  # a typed value that cannot be decoded matches no row
+        if self.typed and isinstance(value, str):
+            decoded, status = TypedColumns.decode_value(SchemaRegistry.column_type(column), value)
+            self.undecodable = status == "invalid"
+            value = value if self.undecodable else decoded
+        self.value = value
+
+    def matches(self, row):
+        if self.undecodable:
+            return False
+        raw = row.get(self.column)
+        return (TypedColumns.decode(self.column, raw) if self.typed else raw) == self.value
+
+    def __str__(self):
+        if self.typed and not self.undecodable:
+            return f"{self.column} = {self.value}"
+        return f"{self.column} = {self.value!r}"
+
+class Range:
+    """low <= column <= high, either bound optional; typed columns compare decoded values"""
+    def __init__(self, column, low=None, high=None):
+        self.column = column
+        self.typed = SchemaRegistry.column_type(column) != "text"
+        self.undecodable = False  # a typed bound that cannot be decoded matches no row, it does not drop the bound
+        bounds = []
+        for bound in (low, high):
+            if self.typed and isinstance(bound, str):
+                decoded, status = TypedColumns.decode_value(SchemaRegistry.column_type(column), bound)
+                self.undecodable = self.undecodable or status == "invalid"
+                bound = bound if status == "invalid" else decoded
+            bounds.append(bound)
+        self.low, self.high = bounds
+
+    def matches(self, row):
+        if self.undecodable:
+            return False
+        raw = row.get(self.column)
+        value = TypedColumns.decode(self.column, raw) if self.typed else raw
+        if value is None:
+            return False
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+    def __str__(self):
+        if self.undecodable:
+            return f"{self.column} between {self.low!r} and {self.high!r}"
+        if self.high is None:
+            return f"{self.column} >= {self.low}"
+        if self.low is None:
+            return f"{self.column} <= {self.high}"
+        return f"{self.column} between {self.low} and {self.high}"
+
+class Contains:
+    """term occurs in column, ignoring case (the matching of linear_search)"""
+    def __init__(self, column, term):
+        self.column = column
+        self.term = str(term).lower()
+
+    def matches(self, row):
+        return self.term in str(row.get(self.column, '')).lower()
+
+    def __str__(self):
+        return f"{self.column} contains {self.term!r}"
+
+class And:
+    def __init__(self, *predicates):
+        self.predicates = []
+        for predicate in predicates:  # flatten nested ANDs so the planner sees every conjunct
+            self.predicates.extend(predicate.predicates if isinstance(predicate, And) else [predicate])
+
+    def matches(self, row):
+        return all(predicate.matches(row) for predicate in self.predicates)
+
+    def __str__(self):
+        return " AND ".join(f"({predicate})" if isinstance(predicate, Or) else str(predicate)
+                            for predicate in self.predicates)
+
+class Or:
+    def __init__(self, *predicates):
+        self.predicates = []
+        for predicate in predicates:
+            self.predicates.extend(predicate.predicates if isinstance(predicate, Or) else [predicate])
+
+    def matches(self, row):
+        return any(predicate.matches(row) for predicate in self.predicates)
+
+    def __str__(self):
+        return " OR ".join(f"({predicate})" if isinstance(predicate, And) else str(predicate)
+                           for predicate in self.predicates)
+
+class Query:
+    """A compound filter over one CSV table, run through the most selective index available.
+
+        query = Query("appointments.csv", And(Eq("Doctor ID", doctor_id),
+                                              Range("Date", "2025-01-01", "2025-03-31"),
+                                              Eq("Status", "Scheduled")))
+        print(query.explain())
+        rows = query.all()
+
+    The planner estimates how many rows each usable index would return: the
+    primary key and owner columns of RowIndex, RangeIndex for typed columns
+    and TrigramIndex for substrings of 3+ characters. It reads the cheapest
+    one (or streams the whole table) and applies the remaining predicates to
+    each row as it goes. An Eq or Range whose value cannot be decoded for its
+    typed column matches nothing and is answered without reading the table.
+    An OR is answered as a union of its branches when every branch can use
+    an index, and by a scan otherwise. Rows come in table order, except that
+    a union returns each branch's rows in turn.
+    """
+    def __init__(self, filename, where=None):
+        self.filename = filename
+        self.where = where
+
+    def _table_size(self):
+        with TableLock.shared(self.filename):
+            return len(RowIndex.get_index(self.filename)["keys"])
+
+    def _paths(self, predicate):
+        """(estimated rows, access, predicate) for every index that can answer a single predicate"""
+        filename = self.filename
+        paths = []
+        if isinstance(predicate, (Eq, Range)) and predicate.undecodable:
+            paths.append((0, "no match", predicate))
+        elif isinstance(predicate, Eq) and not predicate.typed:
+            if predicate.column == CSVManager.TABLES[filename][0]:
+                paths.append((1, "key lookup", predicate))
+            elif predicate.column in RowIndex.OWNER_COLUMNS.get(filename, []):
+                with TableLock.shared(filename):
+                    entries = RowIndex.get_index(filename)["owners"][predicate.column].get(predicate.value, [])
+                paths.append((len(entries), "owner index", predicate))
+        elif isinstance(predicate, Range) and predicate.typed or isinstance(predicate, Eq) and predicate.typed \
+                and predicate.value is not None:
+            low, high = (predicate.value, predicate.value) if isinstance(predicate, Eq) else (predicate.low, predicate.high)
+            paths.append((RangeIndex.count(filename, predicate.column, low, high), "range index", predicate))
+        elif isinstance(predicate, Contains) and len(predicate.term) >= TrigramIndex.MIN_TERM:
+            state = TrigramIndex.get_index(filename, predicate.column)
+            estimate = min(len(state["postings"].get(gram, ())) for gram in TrigramIndex.trigrams(predicate.term))
+            paths.append((estimate, "trigram index", predicate))
+        return paths
+
+    def _plan(self, predicate):
+        """Cheapest indexed plan for a predicate, or None if it needs a scan"""
+        if isinstance(predicate, Or):
+            branches = [self._plan(branch) for branch in predicate.predicates]
+            if any(branch is None for branch in branches):
+                return None
+            return {"access": "union", "estimate": sum(branch["estimate"] for branch in branches),
+                    "branches": branches, "filter": None, "considered": []}
+        conjuncts = predicate.predicates if isinstance(predicate, And) else [predicate]
+        considered = []
+        for conjunct in conjuncts:
+            if isinstance(conjunct, Or):
+                plan = self._plan(conjunct)
+                if plan is not None:
+                    considered.append((plan["estimate"], "union", conjunct, plan))
+            else:
+                considered.extend(path + (None,) for path in self._paths(conjunct))
+        if not considered:
+            return None
+        estimate, access, chosen, union = min(considered, key=lambda path: path[0])
+        rest = [conjunct for conjunct in conjuncts if conjunct is not chosen]
+        if union is not None:
+            plan = dict(union)
+        else:
+            plan = {"access": access, "predicate": chosen, "estimate": estimate}
+        plan["filter"] = (rest[0] if len(rest) == 1 else And(*rest)) if rest else None
+        plan["considered"] = [(path[0], path[1], path[2]) for path in considered]
+        return plan
+
+    def plan(self):
+        """The plan the query will run, as a dict with "access", "estimate", "filter" (the predicate
+        applied while streaming, or None), "considered" and, for a union, "branches" """
+        AppendJournal.flush()  # the index estimates below run under table locks
+        plan = self._plan(self.where) if self.where is not None else None
+        scan_estimate = self._table_size()
+        if plan is None or plan["estimate"] >= scan_estimate:
+            considered = plan["considered"] if plan else []
+            plan = {"access": "full scan", "estimate": scan_estimate, "filter": self.where,
+                    "considered": considered}
+        return plan
+
+    @staticmethod
+    def _describe(plan, indent):
+        pad = "  " * indent
+        if plan["access"] == "union":
+            lines = [f"{pad}union of {len(plan['branches'])} branches (~{plan['estimate']} rows)"]
+            for branch in plan["branches"]:
+                lines.extend(Query._describe(branch, indent + 2))
+        elif plan["access"] == "full scan":
+            lines = [f"{pad}full scan (~{plan['estimate']} rows)"]
+        else:
+            lines = [f"{pad}{plan['access']} on {plan['predicate']} (~{plan['estimate']} rows)"]
+        if plan["filter"] is not None:
+            lines.append(f"{pad}  then filter: {plan['filter']}")
+        return lines
+
+    def explain(self):
+        """Human-readable description of the chosen plan and the indexes it was chosen over"""
+        plan = self.plan()
+        lines = [f"{self.filename}: {self.where if self.where is not None else 'all rows'}"]
+        lines.extend(Query._describe(plan, 1))
+        if plan["considered"]:
+            lines.append("  considered: " + "; ".join(f"{access} on {predicate} (~{estimate} rows)"
+                                                      for estimate, access, predicate in plan["considered"]))
+        return "\n".join(lines)
+
+    def _fetch(self, plan):
+        filename = self.filename
+        access = plan["access"]
+        if access == "no match":
+            rows = []
+        elif access == "full scan":
+            rows = CSVManager.iter_rows(filename)
+        elif access == "key lookup":
+            row = RowIndex.lookup(filename, plan["predicate"].value)
+            rows = [row] if row is not None else []
+        elif access == "owner index":
+            rows = RowIndex.iter_owned(filename, {plan["predicate"].column: plan["predicate"].value})
+        elif access == "range index":
+            predicate = plan["predicate"]
+            low, high = (predicate.value, predicate.value) if isinstance(predicate, Eq) else (predicate.low, predicate.high)
+            rows = RangeIndex.rows(filename, predicate.column, low, high)
+        elif access == "trigram index":
+            rows = TrigramIndex.search(filename, plan["predicate"].column, plan["predicate"].term)
+        else:
+            rows = self._union(plan["branches"])
+        predicate = plan["filter"]
+        for row in rows:
+            if predicate is None or predicate.matches(row):
+                yield row
+
+    def _union(self, branches):
+        key_column = CSVManager.TABLES[self.filename][0]
+        seen = set()
+        for branch in branches:
+            for row in self._fetch(branch):
+                if row.get(key_column) not in seen:
+                    seen.add(row.get(key_column))
+                    yield row
+
+    def __iter__(self):
+        return self._fetch(self.plan())
+
+    def all(self):
+        return list(self)
+
+class SearchSortManager:
+    @staticmethod
+    def bubble_sort(data, sort_key, ascending=True):
+        """Sort data in place by one field and return it (now done by SortEngine)"""     #arshdeep's code
+        return SortEngine.sort(data, [(sort_key, ascending)])
+
+    @staticmethod
+    def linear_search(data, search_key, search_value):
+        """Linear search implementation to find matching records.
+
+        data may also be a CSVScanner, which only decodes the searched column.
+        """
+        if isinstance(data, CSVScanner):
+            return data.search(search_key, search_value)
+        return list(SearchSortManager.iter_search(data, search_key, search_value))   #arshdeep's code
+
+    @staticmethod
+    def iter_search(data, search_key, search_value):
+        """Streaming linear search: data may be any iterable, e.g. PatientManager.iter_patients()"""
+        search_value = str(search_value).lower()
+        for record in data:
+            if search_value in str(record.get(search_key, '')).lower():
+                yield record
+class BulkImportManager:
+    """Headless bulk ingest of records from another system.
+
+    Each import takes an iterable of dicts keyed by the column names in
+    CSVManager.TABLES (the ID column is generated), writes every row through
+    one buffered writer per file and returns a summary instead of showing
+    message boxes.
+    """
+    BUFFER_SIZE = 1024 * 1024
+    BATCH_SIZE = 1000  # IDs are reserved this many rows at a time
+    # Work factor of the imported logins' hashes; raised to the full one on their first login
+    LOGIN_ITERATIONS = 1000
+
+    @staticmethod
+    def _import(filename, records, required, login_file=None):
+        summary = {"imported": 0, "skipped": 0, "errors": [], "ids": []}
+        columns = CSVManager.TABLES[filename][1:]
+        files = [filename] + ([login_file] if login_file else [])
+        AppendJournal.flush()  # before the locks below; queued rows must not collide with new IDs
+        normalise = NameResolver.normaliser(filename)
+        with contextlib.ExitStack() as stack:
+            for name in sorted(files):
+                stack.enter_context(TableLock.exclusive(name))
+            try:
+                outputs = [stack.enter_context(open(name, mode='a', newline='', errors=CSV_ERRORS,
+                                                    buffering=BulkImportManager.BUFFER_SIZE))
+                           for name in files]
+                writers = [csv.writer(output) for output in outputs]
+                writer = writers[0]
+                ids = []
+                for number, record in enumerate(records, start=1):
+                    missing = [column for column in required if not str(record.get(column, '')).strip()]
+                    if missing:
+                        summary["skipped"] += 1
+                        summary["errors"].append((number, f"missing {', '.join(missing)}"))
+                        continue
+                    if not ids:
+                        outputs[0].flush()  # the allocator's index must only see whole rows
+                        ids = IDAllocator._allocate_block(filename, BulkImportManager.BATCH_SIZE)
+                    record_id = ids.pop()
+                    writer.writerow(normalise([record_id] + [record.get(column, '') for column in columns]))
+                    if login_file:
+                        # ID doubles as initial password
+                        writers[1].writerow([record_id, meditrack_auth.hash_password(
+                            record_id, BulkImportManager.LOGIN_ITERATIONS)])
+                    summary["imported"] += 1
+                    summary["ids"].append(record_id)
+            finally:
+                for name in files:
+                    TableCache._tables.pop(name, None)  # the row index catches up on the appended tail
+        return summary
+
+    @staticmethod
+    def import_patients(records):
+        return BulkImportManager._import("patients.csv", records, ["Name"], login_file="patient_login.csv")
+
+    @staticmethod
+    def import_doctors(records):
+        return BulkImportManager._import("doctors.csv", records, ["Name"], login_file="doctor_login.csv")
+
+    @staticmethod
+    def import_appointments(records):
+        records = ({"Status": "Scheduled", **record} for record in records)
+        return BulkImportManager._import("appointments.csv", records, ["Patient ID", "Doctor ID", "Date"])
+
+    @staticmethod
+    def import_file(kind, path):
+        """Import a CSV export whose header uses the MediTrack column names"""
+        importers = {
+            "patients": BulkImportManager.import_patients,
+            "doctors": BulkImportManager.import_doctors,
+            "appointments": BulkImportManager.import_appointments,
+        }
+        with open(path, mode='r', newline='') as file:
+            return importers[kind](csv.DictReader(file))
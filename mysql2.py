@@ -4,7 +4,7 @@ import mysql.connector
 from mysql.connector import Error
 import datetime
 import random
-from heapq import heappush, heappop
+from heapq import heappush, heappop, nlargest, nsmallest
 from abc import ABC, abstractmethod
 
 # Abstract base class for database operations
@@ -481,6 +481,49 @@ class SortContext:
     def sort(self, data, key, reverse=False):
         return self._strategy.sort(data, key, reverse)
 
+# Top-k selection: the first k entries of an ordering without sorting the rest
+class TopKSelector:
+    DATE_KEYS = ['date_of_birth', 'last_visit_date', 'entry_date', 'appointment_date']
+    TIME_KEYS = ['start_time', 'end_time']
+
+    def select(self, data, k, key, reverse=False):
+        """Return the k first entries of data ordered by key (a column or tuple of columns).
+
+        Each entry's sort value is computed once and only the best k are kept in a
+        bounded heap, so this takes O(n log k) time and O(k) memory and data may be
+        any iterable. Ties keep their input order, as with a stable sort.
+        """
+        if k <= 0:
+            return []
+        keys = (key,) if isinstance(key, str) else tuple(key)
+        pick = nlargest if reverse else nsmallest
+        return pick(k, data, key=lambda entry: tuple(self._value(entry.get(column), column) for column in keys))
+
+    def _value(self, value, key):
+        if key in self.DATE_KEYS:
+            return self._parse_date(value)
+        if key in self.TIME_KEYS:
+            return self._parse_time(value)
+        if key == 'severity':
+            return value if value is not None else 0
+        return value if value is not None else ""
+
+    def _parse_date(self, date_str):
+        if isinstance(date_str, datetime.datetime):
+            return date_str.date()
+        if isinstance(date_str, datetime.date):
+            return date_str
+        if date_str is None:
+            return datetime.date.min
+        return datetime.datetime.strptime(str(date_str)[:10], '%Y-%m-%d').date()
+
+    def _parse_time(self, time_str):
+        if isinstance(time_str, datetime.time):
+            return time_str
+        if time_str is None:
+            return datetime.time.min
+        return datetime.datetime.strptime(str(time_str), '%H:%M:%S').time()  # MySQL TIME arrives as a timedelta
+
 # Main application class
 class PatientRecordSystem:
     def __init__(self):
@@ -508,6 +551,7 @@ class PatientRecordSystem:
             self.quick_sort = SortContext(QuickSortStrategy())
             self.heap_sort = SortContext(HeapSortStrategy())
             self.merge_sort = SortContext(MergeSortStrategy())
+            self.top_k = TopKSelector()
     
     # Patient operations
     def add_patient(self, first_name, last_name, date_of_birth, gender, 
@@ -576,6 +620,19 @@ class PatientRecordSystem:
     def merge_sort_appointments(self, appointments, key='start_time', reverse=False):
         return self.merge_sort.sort(appointments, key, reverse)
     
+    # Top-k operations
+    def top_k_patients(self, patients, k, key, reverse=False):
+        return self.top_k.select(patients, k, key, reverse)
+    
+    def recent_medical_history(self, patient_id, k=20):
+        return self.top_k.select(self.get_medical_history(patient_id), k, 'entry_date', reverse=True)
+    
+    def next_appointments(self, k=10, patient_id=None):
+        today = datetime.date.today()
+        upcoming = (appointment for appointment in self.get_appointments(patient_id=patient_id, status='Scheduled')
+                    if self.top_k._parse_date(appointment['appointment_date']) >= today)
+        return self.top_k.select(upcoming, k, ('appointment_date', 'start_time'))
+    
     # Utility methods
     def record_last_visit(self, patient_id, visit_date=None):
         if visit_date is None:
@@ -0,0 +1,75 @@
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import meditrack_store  # noqa: E402
+
+# Process-wide caches of the engine; every test starts (and ends) with them empty
+CACHES = [
+    meditrack_store.SchemaRegistry.drift,
+    meditrack_store.SchemaRegistry._checked,
+    meditrack_store.SchemaRegistry._parsers,
+    meditrack_store.TypedColumns._decoded,
+    meditrack_store.TypedColumns._columns,
+    meditrack_store.TypedColumns._report,
+    meditrack_store.RowIndex._indexes,
+    meditrack_store.TableCache._tables,
+    meditrack_store.TableCache._records,
+    meditrack_store.TableSnapshot._current,
+    meditrack_store.CSVScanner._scanners,
+    meditrack_store.ChangeLog._states,
+    meditrack_store.IDAllocator._reserved,
+    meditrack_store.NameResolver._maps,
+    meditrack_store.TrigramIndex._indexes,
+    meditrack_store.PrefixIndex._indexes,
+    meditrack_store.FuzzyIndex._indexes,
+    meditrack_store.RangeIndex._indexes,
+]
+
+
+def clear_caches():
+    for cache in CACHES:
+        cache.clear()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """meditrack_store working in an empty directory with freshly created tables"""
+    monkeypatch.chdir(tmp_path)
+    clear_caches()
+    meditrack_store.CSVManager.create_csv_files()
+    yield meditrack_store
+    meditrack_store.AppendJournal.close()
+    meditrack_store.AppendJournal._queue.clear()
+    meditrack_store.AppendJournal._dirty.clear()
+    clear_caches()
+
+
+def restart():
+    """Forget everything this process knows, as a freshly started instance would"""
+    clear_caches()
+    meditrack_store.AppendJournal._journal = None
+    meditrack_store.AppendJournal._queue.clear()
+    meditrack_store.AppendJournal._dirty.clear()
+
+
+def write_rows(filename, rows):
+    """Append raw rows to a table behind the engine's back, like another program would"""
+    with open(filename, mode='a', newline='') as file:
+        csv.writer(file).writerows(rows)
+
+
+def appointment(key, patient_id="p1", doctor_id="d1", date="2025-03-03", status="Scheduled"):
+    return [key, patient_id, "", doctor_id, "", date, "10:00", "Checkup", status]
+
+
+def patient(key, name="Ann Smith", dob="1/1/80"):
+    return [key, name, dob, "Female", "0123", "london", "A+", "none"]
+
+
+def doctor(key, name="Dr Jones", specialization="General"):
+    return [key, name, specialization, "0456", "L-1"]
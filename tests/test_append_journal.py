@@ -0,0 +1,89 @@
+import csv
+import os
+
+import pytest
+
+from conftest import appointment, restart
+
+
+@pytest.fixture
+def journal(store, monkeypatch):
+    monkeypatch.setattr(store.AppendJournal, "ENABLED", True)
+    return store.AppendJournal
+
+
+def crash(store):
+    """Die without closing: the journal stays on disk and its lock goes with the process"""
+    _, file = store.AppendJournal._journal
+    file.close()
+    restart()
+
+
+def journal_files():
+    return [name for name in os.listdir(".") if name.startswith("meditrack.journal")]
+
+
+def write_orphan(entries):
+    """A journal left behind by a process that crashed"""
+    with open("meditrack.journal.999.deadbeef", mode='w', newline='') as file:
+        csv.writer(file).writerows(entries)
+
+
+def appointment_ids(store):
+    return [row["Appointment ID"] for row in store.CSVManager.iter_rows("appointments.csv")]
+
+
+def test_flush_applies_the_queued_rows(store, journal):
+    journal.append("appointments.csv", appointment("a1"))
+    assert appointment_ids(store) == ["a1"]  # readers flush first
+    assert len(journal_files()) == 1
+
+
+def test_close_removes_the_journal(store, journal):
+    journal.append("appointments.csv", appointment("a1"))
+    journal.close()
+    assert journal_files() == []
+
+
+def test_orphaned_journal_is_replayed_once(store):
+    write_orphan([["appointments.csv"] + appointment("a1")])
+    store.CSVManager.create_csv_files()
+    assert appointment_ids(store) == ["a1"]
+    assert journal_files() == []
+
+    write_orphan([["appointments.csv"] + appointment("a1"), ["appointments.csv", "torn"]])
+    store.CSVManager.create_csv_files()
+    assert appointment_ids(store) == ["a1"]
+
+
+def test_live_journal_is_not_replayed(store, journal):
+    journal.append("appointments.csv", appointment("a1"))
+    journal.flush()
+    store.AppendJournal.replay()
+    assert appointment_ids(store) == ["a1"]
+    assert len(journal_files()) == 1
+
+
+def test_row_deleted_and_compacted_away_stays_deleted_after_a_crash(store, journal):
+    journal.append("appointments.csv", appointment("a1"))
+    journal.append("appointments.csv", appointment("a2"))
+    journal.flush()
+    store.ChangeLog.delete("appointments.csv", "a1")
+    store.ChangeLog.compact("appointments.csv")
+    crash(store)
+
+    store.CSVManager.create_csv_files()
+    assert appointment_ids(store) == ["a2"]
+    assert store.RowIndex.lookup("appointments.csv", "a1") is None
+
+
+def test_orphan_is_replayed_before_a_compaction_drops_its_rows(store):
+    store.TableCache.append_row("appointments.csv", appointment("a1"))
+    write_orphan([["appointments.csv"] + appointment("a1")])  # applied before its process crashed
+    store.ChangeLog.delete("appointments.csv", "a1")
+    store.ChangeLog.compact("appointments.csv")
+    assert journal_files() == []
+
+    restart()
+    store.CSVManager.create_csv_files()
+    assert appointment_ids(store) == []
@@ -0,0 +1,52 @@
+import csv
+import os
+
+import pytest
+
+from conftest import appointment, write_rows
+
+
+def read(filename):
+    with open(filename, newline='') as file:
+        return file.read()
+
+
+def test_commit_replaces_every_file_at_once(store):
+    with store.AtomicWriter() as batch:
+        batch.open("a.txt").write("new a")
+        batch.open("b.txt").write("new b")
+    assert (read("a.txt"), read("b.txt")) == ("new a", "new b")
+    assert [name for name in os.listdir(".") if name.endswith(".tmp") or name.startswith("meditrack.commit")] == []
+
+
+def test_failed_batch_leaves_the_originals(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    before = read("appointments.csv")
+    with pytest.raises(RuntimeError):
+        with store.AtomicWriter() as batch:
+            batch.open("appointments.csv").write("half written")
+            raise RuntimeError("disk full")
+    assert read("appointments.csv") == before
+    assert not os.path.exists("appointments.csv.tmp")
+
+
+def test_commit_interrupted_after_its_manifest_is_finished_on_start(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    store.TableCache.get_rows("appointments.csv")
+    header = read("appointments.csv").splitlines()[0]
+    with open("appointments.csv.tmp", mode='w', newline='') as file:
+        csv.writer(file).writerows([header.split(","), appointment("a2")])
+    with open("meditrack.commit.deadbeef", mode='w', newline='') as manifest:
+        csv.writer(manifest).writerow(["appointments.csv.tmp", "appointments.csv"])
+
+    store.CSVManager.create_csv_files()
+    assert not os.path.exists("meditrack.commit.deadbeef")
+    assert [row["Appointment ID"] for row in store.TableCache.get_rows("appointments.csv")] == ["a2"]
+
+
+def test_temp_file_without_a_manifest_is_ignored(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    with open("appointments.csv.tmp", mode='w') as file:
+        file.write("torn")
+    store.CSVManager.create_csv_files()
+    assert [row["Appointment ID"] for row in store.CSVManager.iter_rows("appointments.csv")] == ["a1"]
@@ -0,0 +1,43 @@
+import csv
+
+from conftest import patient, write_rows
+
+
+def test_patients_are_imported_with_logins(store):
+    records = [{"Name": "Ann"}, {"Name": " "}, {"Name": "Bob", "DOB": "2/2/90"}]
+    summary = store.BulkImportManager.import_patients(records)
+    assert (summary["imported"], summary["skipped"]) == (2, 1)
+    assert summary["errors"] == [(2, "missing Name")]
+    rows = store.TableCache.get_rows("patients.csv")
+    assert [(row["Patient ID"], row["Name"]) for row in rows] == list(zip(summary["ids"], ["Ann", "Bob"]))
+    logins = {row["Patient ID"]: row["Password"] for row in store.CSVManager.iter_rows("patient_login.csv")}
+    for patient_id in summary["ids"]:
+        assert store.meditrack_auth.check_password(patient_id, logins[patient_id])
+
+
+def test_imported_ids_do_not_collide_with_existing_ones(store):
+    write_rows("patients.csv", [patient("p1")])
+    summary = store.BulkImportManager.import_patients({"Name": f"Patient {n}"} for n in range(2500))
+    ids = summary["ids"]
+    assert len(ids) == len(set(ids)) == 2500 and "p1" not in ids
+    assert len(store.TableCache.get_rows("patients.csv")) == 2501
+    assert store.RowIndex.lookup("patients.csv", ids[-1])["Name"] == "Patient 2499"
+
+
+def test_appointments_default_to_scheduled_and_drop_resolvable_names(store):
+    write_rows("patients.csv", [patient("p1", "Ann")])
+    summary = store.BulkImportManager.import_appointments(
+        [{"Patient ID": "p1", "Patient Name": "Ann", "Doctor ID": "d1", "Date": "2025-03-03"},
+         {"Patient ID": "p1", "Doctor ID": "d1"}])
+    assert summary["errors"] == [(2, "missing Date")]
+    with open("appointments.csv", newline='') as file:
+        stored = list(csv.reader(file))[1]
+    assert stored[2] == "" and stored[-1] == "Scheduled"
+    assert store.TableCache.get_rows("appointments.csv")[0]["Patient Name"] == "Ann"
+
+
+def test_import_file_reads_a_csv_export(store, tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("Name,Specialization\nDr Who,Time\n")
+    assert store.BulkImportManager.import_file("doctors", str(path))["imported"] == 1
+    assert store.TableCache.get_rows("doctors.csv")[0]["Specialization"] == "Time"
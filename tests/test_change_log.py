@@ -0,0 +1,76 @@
+import os
+
+from conftest import appointment, doctor, patient, write_rows
+
+
+def appointment_ids(store):
+    return [row["Appointment ID"] for row in store.CSVManager.iter_rows("appointments.csv")]
+
+
+def test_delete_appends_a_tombstone_instead_of_rewriting(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2")])
+    size = os.path.getsize("appointments.csv")
+    store.ChangeLog.delete("appointments.csv", "a1")
+    assert os.path.getsize("appointments.csv") == size
+    assert appointment_ids(store) == ["a2"]
+
+
+def test_later_entries_win(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    store.ChangeLog.update("appointments.csv", "a1", "Status", "Completed")
+    store.ChangeLog.update("appointments.csv", "a1", "Status", "Cancelled")
+    assert store.RowIndex.lookup("appointments.csv", "a1")["Status"] == "Cancelled"
+    store.ChangeLog.delete("appointments.csv", "a1")
+    store.ChangeLog.update("appointments.csv", "a1", "Status", "Scheduled")
+    assert appointment_ids(store) == []
+
+
+def test_compaction_folds_the_log_into_the_table(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2"), appointment("a3")])
+    store.ChangeLog.delete("appointments.csv", "a2")
+    store.ChangeLog.update("appointments.csv", "a3", "Status", "Completed")
+    store.ChangeLog.compact("appointments.csv")
+
+    assert not os.path.exists("appointments.csv.log")
+    with open("appointments.csv", newline='') as file:
+        lines = file.read().splitlines()
+    assert len(lines) == 3 and lines[2].endswith("Completed")
+    assert appointment_ids(store) == ["a1", "a3"]
+    assert store.RowIndex.lookup("appointments.csv", "a3")["Status"] == "Completed"
+
+
+def test_log_past_the_threshold_is_compacted_in_the_background(store, monkeypatch):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2")])
+    compactions = []
+    monkeypatch.setattr(store.ChangeLog, "COMPACTION_THRESHOLD", 1)
+    monkeypatch.setattr(store.ChangeLog, "compact", lambda *filenames: compactions.append(filenames))
+    store.ChangeLog.delete("appointments.csv", "a1")
+    store.ChangeLog.delete("patients.csv", "p1")
+    for _ in range(100):
+        if len(compactions) == 2:
+            break
+        store.time.sleep(0.01)
+    assert sorted(compactions) == [("appointments.csv",), ("patients.csv", "patient_login.csv")]
+
+
+def test_cascade_delete_removes_every_row_of_a_patient(store):
+    write_rows("patients.csv", [patient("p1"), patient("p2", "Bob Brown")])
+    write_rows("patient_login.csv", [["p1", "x"], ["p2", "y"]])
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2", patient_id="p2"), appointment("a3")])
+    write_rows("billing.csv", [["i1", "p1", "", "100", "Cash", "Paid", "2025-03-26"]])
+
+    counts = store.ChangeLog.cascade_delete("Patient ID", "p1")
+    assert counts == {"patients.csv": 1, "patient_login.csv": 1, "appointments.csv": 2, "prescriptions.csv": 0,
+                      "medical_records.csv": 0, "billing.csv": 1}
+    assert appointment_ids(store) == ["a2"]
+    assert [row["Patient ID"] for row in store.CSVManager.iter_rows("patients.csv")] == ["p2"]
+    assert store.RowIndex.lookup("patient_login.csv", "p1") is None
+
+
+def test_compacted_doctor_keeps_the_name_on_old_rows(store):
+    write_rows("doctors.csv", [doctor("d1", "Dr Who")])
+    write_rows("appointments.csv", [appointment("a1")])
+    store.ChangeLog.delete("doctors.csv", "d1")
+    store.ChangeLog.compact("doctors.csv", "doctor_login.csv")
+    assert store.RowIndex.lookup("doctors.csv", "d1") is None
+    assert store.RowIndex.lookup("appointments.csv", "a1")["Doctor Name"] == "Dr Who"
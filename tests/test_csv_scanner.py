@@ -0,0 +1,29 @@
+from conftest import appointment, write_rows
+
+
+def test_pages_are_addressed_by_row_number(store):
+    write_rows("appointments.csv", [appointment(f"a{number}") for number in range(10)])
+    scanner = store.CSVScanner.open("appointments.csv")
+    assert len(scanner) == 10
+    assert [row["Appointment ID"] for row in scanner.page(8, 5)] == ["a8", "a9"]
+    assert scanner.column("Appointment ID")[:3] == ["a0", "a1", "a2"]
+
+
+def test_search_decodes_only_the_matching_rows(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2", status="Completed"),
+                                    appointment("a3", status="completed")])
+    scanner = store.CSVScanner.open("appointments.csv")
+    assert scanner.find("Status", "COMPL") == [1, 2]
+    assert [row["Appointment ID"] for row in scanner.search("Status", "compl")] == ["a2", "a3"]
+
+
+def test_scanner_follows_appends_deletes_and_quoted_newlines(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    scanner = store.CSVScanner.open("appointments.csv")
+    assert len(scanner) == 1
+    row = appointment("a2")
+    row[7] = "Checkup,\nthen bloods"
+    write_rows("appointments.csv", [row, appointment("a3")])
+    store.ChangeLog.delete("appointments.csv", "a1")
+    assert [row["Appointment ID"] for row in scanner.page(0, 10)] == ["a2", "a3"]
+    assert scanner.page(0, 1)[0]["Reason"] == "Checkup,\nthen bloods"
@@ -0,0 +1,53 @@
+import pytest
+
+import meditrack_store
+
+
+def undecodable_byte():
+    """A byte the locale's encoding cannot decode, like the cp1252 pound sign in a UTF-8 locale"""
+    for byte in (b"\xa3", b"\x81", b"\x8d"):
+        try:
+            byte.decode(meditrack_store.CSV_ENCODING)
+        except UnicodeDecodeError:
+            return byte
+    pytest.skip(f"{meditrack_store.CSV_ENCODING} decodes every byte")
+
+
+@pytest.fixture
+def billing(store):
+    byte = undecodable_byte()
+    with open("billing.csv", mode='ab') as file:
+        file.write(b"i1,p1,,100" + byte + b",Cash,Paid,2025-03-26\r\n")
+        file.write(b"i2,p2,,50,Card,Paid,2025-03-27\r\n")
+    return byte
+
+
+def test_readers_tolerate_an_undecodable_byte(store, billing):
+    assert [row["Invoice ID"] for row in store.CSVManager.iter_rows("billing.csv")] == ["i1", "i2"]
+    rows = store.TableCache.get_rows("billing.csv")
+    assert rows[0]["Amount"].startswith("100")
+    assert store.RowIndex.lookup("billing.csv", "i2")["Amount"] == "50"
+    assert [row["Invoice ID"] for row in store.RowIndex.iter_owned("billing.csv", {"Patient ID": "p1"})] == ["i1"]
+    assert len(store.SearchSortManager.linear_search(rows, "Payment Method", "cash")) == 1
+    assert len(store.CSVScanner.open("billing.csv").search("Payment Method", "card")) == 1
+
+
+def test_cascade_delete_still_deletes_the_rows(store, billing):
+    counts = store.ChangeLog.cascade_delete("Patient ID", "p1")
+    assert counts["billing.csv"] == 1
+    assert [row["Invoice ID"] for row in store.CSVManager.iter_rows("billing.csv")] == ["i2"]
+
+
+def test_compaction_keeps_the_original_byte(store, billing):
+    store.ChangeLog.update("billing.csv", "i2", "Status", "Refunded")
+    store.ChangeLog.compact("billing.csv")
+    with open("billing.csv", mode='rb') as file:
+        data = file.read()
+    assert b"100" + billing + b",Cash" in data
+    assert b"i2,p2,,50,Card,Refunded" in data
+
+
+def test_name_migration_keeps_the_original_byte(store, billing):
+    store.NameResolver.migrate()
+    with open("billing.csv", mode='rb') as file:
+        assert b"100" + billing + b",Cash" in file.read()
@@ -0,0 +1,29 @@
+import uuid
+
+from conftest import appointment, write_rows
+
+
+def candidates(monkeypatch, store, *prefixes):
+    values = iter(uuid.UUID(prefix + "-0000-0000-0000-000000000000") for prefix in prefixes)
+    monkeypatch.setattr(store.uuid, "uuid4", lambda: next(values))
+
+
+def test_new_ids_skip_existing_deleted_and_reserved_keys(store, monkeypatch):
+    write_rows("appointments.csv", [appointment("aaaaaaaa"), appointment("bbbbbbbb")])
+    store.ChangeLog.delete("appointments.csv", "bbbbbbbb")
+    candidates(monkeypatch, store, "aaaaaaaa", "bbbbbbbb", "cccccccc", "cccccccc", "dddddddd")
+    assert store.IDAllocator.new_id("appointments.csv") == "cccccccc"
+    assert store.IDAllocator.new_id("appointments.csv") == "dddddddd"
+
+
+def test_blocks_are_unique(store):
+    ids = store.IDAllocator.allocate_block("appointments.csv", 5000)
+    assert len(set(ids)) == 5000 and all(len(record_id) == 8 for record_id in ids)
+
+
+def test_queued_appends_are_seen(store, monkeypatch):
+    monkeypatch.setattr(store.AppendJournal, "ENABLED", True)
+    store.AppendJournal.append("appointments.csv", appointment("aaaaaaaa"))
+    store.IDAllocator._reserved.clear()  # as if another process had queued it
+    candidates(monkeypatch, store, "aaaaaaaa", "eeeeeeee")
+    assert store.IDAllocator.new_id("appointments.csv") == "eeeeeeee"
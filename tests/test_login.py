@@ -0,0 +1,31 @@
+import pytest
+
+from conftest import appointment, write_rows
+
+meditrack = pytest.importorskip("meditrack")  # the GUI module needs tkcalendar and Pillow
+
+
+@pytest.fixture(autouse=True)
+def credentials():
+    meditrack.LoginManager._credentials.clear()
+    yield
+    meditrack.LoginManager._credentials.clear()
+
+
+def test_login_reads_credentials_without_flushing_the_journal(store, monkeypatch):
+    monkeypatch.setattr(store.AppendJournal, "ENABLED", True)
+    write_rows("patient_login.csv", [["p1", "secret"]])
+    store.AppendJournal.append("appointments.csv", appointment("a1"))
+
+    assert meditrack.LoginManager.verify_login("p1", "secret", "patient_login.csv")
+    assert len(store.AppendJournal._queue) == 1  # only readers of the journaled tables flush it
+    assert not meditrack.LoginManager.verify_login("p1", "wrong", "patient_login.csv")
+
+
+def test_plaintext_password_is_upgraded_on_login(store):
+    write_rows("patient_login.csv", [["p1", "secret"]])
+    assert meditrack.LoginManager.verify_login("p1", "secret", "patient_login.csv")
+    stored = meditrack.LoginManager._get_credentials("patient_login.csv")["p1"][1]
+    assert stored != "secret" and not meditrack.meditrack_auth.needs_rehash(stored)
+    meditrack.LoginManager._credentials.clear()
+    assert meditrack.LoginManager.verify_login("p1", "secret", "patient_login.csv")
@@ -0,0 +1,44 @@
+import csv
+
+from conftest import appointment, doctor, patient, write_rows
+
+
+def stored_rows(filename):
+    with open(filename, newline='') as file:
+        return list(csv.reader(file))[1:]
+
+
+def test_names_are_filled_in_from_the_dimension_tables(store):
+    write_rows("patients.csv", [patient("p1", "Ann")])
+    write_rows("doctors.csv", [doctor("d1", "Dr Who")])
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2", patient_id="p9")])
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert (rows[0]["Patient Name"], rows[0]["Doctor Name"]) == ("Ann", "Dr Who")
+    assert rows[1]["Patient Name"] == ""
+
+
+def test_renaming_a_patient_renames_every_row(store):
+    write_rows("patients.csv", [patient("p1", "Ann")])
+    write_rows("appointments.csv", [appointment("a1")])
+    store.TableCache.get_rows("appointments.csv")
+    store.ChangeLog.update("patients.csv", "p1", "Name", "Ann Jones")
+    assert store.TableCache.get_rows("appointments.csv")[0]["Patient Name"] == "Ann Jones"
+    assert store.RowIndex.lookup("appointments.csv", "a1")["Patient Name"] == "Ann Jones"
+
+
+def test_stored_name_is_the_fallback(store):
+    row = appointment("a1", patient_id="p9")
+    row[2] = "Old Name"
+    write_rows("appointments.csv", [row])
+    assert store.TableCache.get_rows("appointments.csv")[0]["Patient Name"] == "Old Name"
+
+
+def test_migrate_blanks_the_names_it_can_resolve(store):
+    write_rows("patients.csv", [patient("p1", "Ann")])
+    known, unknown = appointment("a1"), appointment("a2", patient_id="p9")
+    known[2], unknown[2] = "Ann", "Old Name"
+    write_rows("appointments.csv", [known, unknown])
+    saved = store.NameResolver.migrate()
+    assert saved["appointments.csv"] == len("Ann")
+    assert [row[2] for row in stored_rows("appointments.csv")] == ["", "Old Name"]
+    assert [row["Patient Name"] for row in store.CSVManager.iter_rows("appointments.csv")] == ["Ann", "Old Name"]
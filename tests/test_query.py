@@ -0,0 +1,38 @@
+from conftest import appointment, write_rows
+
+
+def ids(rows):
+    return [row["Appointment ID"] for row in rows]
+
+
+def test_compound_query_uses_the_owner_index(store):
+    write_rows("appointments.csv", [appointment("a1", date="2025-03-03"), appointment("a2", doctor_id="d2"),
+                                    appointment("a3", date="3/20/25", status="Completed")])
+    query = store.Query("appointments.csv", store.And(store.Eq("Doctor ID", "d1"),
+                                                      store.Range("Date", "2025-03-01", "3/31/25")))
+    assert "owner index" in query.explain()
+    assert ids(query.all()) == ["a1", "a3"]
+
+
+def test_undecodable_eq_value_matches_nothing(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    query = store.Query("appointments.csv", store.Eq("Date", "someday"))
+    assert "no match" in query.explain()
+    assert query.all() == []
+
+
+def test_undecodable_range_bound_matches_nothing(store):
+    write_rows("appointments.csv", [appointment("a1", date="2025-03-03"), appointment("a2", date="2025-03-27")])
+    predicate = store.Range("Date", "garbage", "2025-03-27")
+    assert predicate.undecodable
+    query = store.Query("appointments.csv", predicate)
+    assert "no match" in query.explain()
+    assert query.all() == []
+    assert ids(store.Query("appointments.csv", store.Range("Date", "", "2025-03-27")).all()) == ["a1", "a2"]
+
+
+def test_or_of_indexed_branches_is_a_union(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2", patient_id="p2"),
+                                    appointment("a3", patient_id="p3")])
+    query = store.Query("appointments.csv", store.Or(store.Eq("Patient ID", "p1"), store.Eq("Patient ID", "p3")))
+    assert sorted(ids(query.all())) == ["a1", "a3"]
@@ -0,0 +1,27 @@
+import pytest
+
+from conftest import appointment, write_rows
+
+
+def test_records_act_like_row_dicts(store):
+    record = store.Appointment.from_row(appointment("a1"))
+    assert record["Appointment ID"] == record.appointment_id == "a1"
+    assert record.get("Status") == "Scheduled" and record.get("Nope", "-") == "-"
+    assert record.to_dict() == dict(zip(store.CSVManager.TABLES["appointments.csv"], appointment("a1")))
+    with pytest.raises(KeyError):
+        record["Nope"]
+    assert not hasattr(record, "__dict__")
+
+
+def test_short_rows_are_padded_with_none(store):
+    record = store.Doctor.from_dict({"Doctor ID": "d1", "Name": "Dr Who"})
+    assert (record.name, record.license_number) == ("Dr Who", None)
+    assert store.Record.TYPES["doctors.csv"] is store.Doctor
+
+
+def test_cached_records_follow_the_table(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    records = store.TableCache.get_records("appointments.csv")
+    assert store.TableCache.get_records("appointments.csv") is records
+    store.ChangeLog.update("appointments.csv", "a1", "Status", "Completed")
+    assert store.TableCache.get_records("appointments.csv")[0].status == "Completed"
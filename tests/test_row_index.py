@@ -0,0 +1,56 @@
+import csv
+
+from conftest import appointment, write_rows
+
+
+def rewrite(rows):
+    """Replace a table's rows behind the index's back, like an external editor would"""
+    with open("appointments.csv", newline='') as file:
+        header = next(csv.reader(file))
+    with open("appointments.csv", mode='w', newline='') as file:
+        csv.writer(file).writerows([header] + rows)
+
+
+def test_lookup_reads_one_row_by_key(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2", status="Completed")])
+    assert store.RowIndex.lookup("appointments.csv", "a2")["Status"] == "Completed"
+    assert store.RowIndex.lookup("appointments.csv", "zz") is None
+
+
+def test_index_catches_up_with_appended_rows(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    store.RowIndex.lookup("appointments.csv", "a1")
+    write_rows("appointments.csv", [appointment("a2", patient_id="p2")])
+    assert store.RowIndex.lookup("appointments.csv", "a2")["Patient ID"] == "p2"
+    on_disk = store.RowIndex._load("appointments.csv")  # the appended entry reached the index file
+    assert "a2" in on_disk["keys"]
+
+
+def test_lookup_applies_the_change_log(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2")])
+    store.ChangeLog.update("appointments.csv", "a1", "Status", "Cancelled")
+    store.ChangeLog.delete("appointments.csv", "a2")
+    assert store.RowIndex.lookup("appointments.csv", "a1")["Status"] == "Cancelled"
+    assert store.RowIndex.lookup("appointments.csv", "a2") is None
+
+
+def test_rows_moved_behind_the_index_are_not_misread(store):
+    rows = [appointment("a1", patient_id="p1"), appointment("a2", patient_id="p2"), appointment("a3", patient_id="p3")]
+    write_rows("appointments.csv", rows)
+    store.RowIndex.lookup("appointments.csv", "a1")
+    rewrite([rows[1], rows[0], rows[2]])  # same size, same last row: the cheap consistency check passes
+
+    assert store.RowIndex.lookup("appointments.csv", "a1")["Patient ID"] == "p1"
+    assert store.RowIndex.lookup("appointments.csv", "a2")["Patient ID"] == "p2"
+    rewrite([rows[0], rows[1], rows[2]])
+    assert [row["Appointment ID"] for row in store.RowIndex.iter_owned("appointments.csv", {"Patient ID": "p2"})] \
+        == ["a2"]
+    rewrite([rows[1], rows[0], rows[2]])
+    assert store.RowIndex.owned_keys("appointments.csv", "Patient ID", "p1") == ["a1"]
+
+
+def test_owner_index_finds_rows_in_file_order(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2", patient_id="p2", doctor_id="d2"),
+                                    appointment("a3")])
+    owned = store.RowIndex.lookup_owned("appointments.csv", {"Patient ID": "p2", "Doctor ID": "d1"})
+    assert [row["Appointment ID"] for row in owned] == ["a1", "a2", "a3"]
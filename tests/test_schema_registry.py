@@ -0,0 +1,30 @@
+import pytest
+
+from conftest import appointment, write_rows
+
+
+def test_parser_pads_and_trims_rows_to_the_layout(store):
+    parse = store.SchemaRegistry.parser("doctors.csv")
+    assert parse(["d1", "Dr Who"]) == ("d1", "Dr Who", None, None, None)
+    assert parse(["d1", "a", "b", "c", "d", "extra"]) == ("d1", "a", "b", "c", "d")
+    assert store.SchemaRegistry.position("appointments.csv", "Date") == 5
+
+
+def test_drifted_header_is_read_by_the_layout(store):
+    with open("patients.csv", mode='w', newline='') as file:
+        file.write("Patient ID,Name,DOB,Gender,Contact,Address,Blood group,Allergies\r\n"
+                   "p1,Ann,1/1/80,Female,0123,london,A+,none\r\n")
+    with pytest.warns(UserWarning, match="missing Blood Type; unknown Blood group"):
+        rows = store.TableCache.get_rows("patients.csv")
+    assert rows[0]["Blood Type"] == "A+"
+    assert "Blood Type" in store.SchemaRegistry.drift["patients.csv"]
+
+
+def test_streaming_readers_yield_rows_one_at_a_time(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2", status="Completed")])
+    rows = store.CSVManager.iter_rows("appointments.csv", lambda row: row["Status"] == "Completed")
+    assert next(rows)["Appointment ID"] == "a2"
+    assert next(rows, None) is None
+    status = store.SchemaRegistry.position("appointments.csv", "Status")
+    tuples = list(store.CSVManager.iter_tuples("appointments.csv", lambda values: values[status] == "Scheduled"))
+    assert tuples == [tuple(appointment("a1"))]
@@ -0,0 +1,40 @@
+from conftest import doctor, patient, write_rows
+
+
+def names(rows):
+    return [row["Name"] for row in rows]
+
+
+def test_trigram_search_matches_a_linear_scan(store):
+    write_rows("patients.csv", [patient("p1", "Annabel Lee"), patient("p2", "Hannah Banes"), patient("p3", "Bob")])
+    rows = store.TableCache.get_rows("patients.csv")
+    for term in ("ann", "NNA", "an", "banes", "zzz"):
+        assert store.TrigramIndex.search("patients.csv", "Name", term) == \
+            store.SearchSortManager.linear_search(rows, "Name", term)
+
+
+def test_trigram_index_follows_appends_and_updates(store):
+    write_rows("patients.csv", [patient("p1", "Annabel Lee")])
+    assert names(store.TrigramIndex.search("patients.csv", "Name", "lee")) == ["Annabel Lee"]
+    store.TableCache.append_row("patients.csv", patient("p2", "Bruce Lee"))
+    store.ChangeLog.update("patients.csv", "p1", "Name", "Annabel Smith")
+    assert names(store.TrigramIndex.search("patients.csv", "Name", "lee")) == ["Bruce Lee"]
+
+
+def test_prefix_completion_on_ids_names_and_name_words(store):
+    write_rows("doctors.csv", [doctor("d1", "Dr Who"), doctor("d2", "Dr Watson"), doctor("x3", "Jane Doctorow")])
+    assert names(store.PrefixIndex.complete("doctors.csv", "wh")) == ["Dr Who"]
+    assert sorted(names(store.PrefixIndex.complete("doctors.csv", "dr"))) == ["Dr Watson", "Dr Who"]
+    assert [row["Doctor ID"] for row in store.PrefixIndex.complete("doctors.csv", "D", limit=1)] == ["d1"]
+    assert store.PrefixIndex.complete("doctors.csv", "zz") == []
+
+
+def test_fuzzy_search_finds_misspelled_names_closest_first(store):
+    write_rows("patients.csv", [patient("p1", "Jonathan Smyth"), patient("p2", "John Smith"),
+                                patient("p3", "Mary Jones")])
+    found = store.FuzzyIndex.search("patients.csv", "Name", "smith")
+    assert [(distance, row["Name"]) for distance, row in found] == [(0, "John Smith"), (1, "Jonathan Smyth")]
+    assert store.FuzzyIndex.search("patients.csv", "Name", "xyzzy") == []
+    store.TableCache.append_row("patients.csv", patient("p4", "Anne Smithe"))
+    assert [row["Name"] for _, row in store.FuzzyIndex.search("patients.csv", "Name", "smith", 1)] == \
+        ["John Smith", "Jonathan Smyth", "Anne Smithe"]
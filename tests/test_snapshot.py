@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from conftest import appointment, patient, restart, write_rows
+
+
+@pytest.fixture
+def appointments(store, monkeypatch):
+    monkeypatch.setattr(store.TableSnapshot, "MIN_ROWS", 3)
+    write_rows("patients.csv", [patient("p1", "Ann")])
+    write_rows("appointments.csv", [appointment(f"a{number}", date=f"2025-03-0{number}") for number in range(1, 6)])
+    return store.TableCache.get_rows("appointments.csv")
+
+
+def test_cold_start_maps_the_snapshot(store, appointments):
+    expected = list(appointments)
+    assert os.path.exists("appointments.csv.snap")
+    restart()
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert isinstance(rows, store.SnapshotTable)
+    assert list(rows) == expected
+    assert rows[-1]["Patient Name"] == "Ann"
+    assert rows.column("Date")[:2] == ["2025-03-01", "2025-03-02"]
+
+
+def test_appends_extend_a_mapped_snapshot(store, appointments):
+    restart()
+    store.TableCache.get_rows("appointments.csv")
+    store.TableCache.append_row("appointments.csv", appointment("a6"))
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert isinstance(rows, store.SnapshotTable)
+    assert [row["Appointment ID"] for row in rows][-2:] == ["a5", "a6"]
+
+
+def test_stale_snapshot_is_not_used_until_saved_again(store, appointments):
+    store.ChangeLog.update("appointments.csv", "a1", "Status", "Completed")
+    restart()
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert not isinstance(rows, store.SnapshotTable) and rows[0]["Status"] == "Completed"
+
+    store.TableSnapshot.save_all()
+    restart()
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert isinstance(rows, store.SnapshotTable) and rows[0]["Status"] == "Completed"
+
+
+def test_damaged_snapshot_falls_back_to_the_csv(store, appointments):
+    with open("appointments.csv.snap", mode='r+b') as file:
+        file.write(b"garbage!")
+    restart()
+    assert [row["Appointment ID"] for row in store.TableCache.get_rows("appointments.csv")][0] == "a1"
@@ -0,0 +1,35 @@
+from conftest import appointment
+
+
+def rows(*specs):
+    return [dict(zip(["Appointment ID", "Date", "Time", "Amount"], spec)) for spec in specs]
+
+
+def test_multi_key_sort_is_typed_and_stable(store):
+    data = rows(("a1", "3/3/25", "2:00 PM", "100"), ("a2", "2025-03-03", "09:00", "9.5"),
+                ("a3", "2025-01-10", "10:00", "100"), ("a4", "", "10:00", "x"))
+    store.SortEngine.sort(data, ["Date", ("Time", False)])
+    assert [row["Appointment ID"] for row in data] == ["a3", "a1", "a2", "a4"]  # undecodable dates last
+    store.SortEngine.sort(data, ["Amount"])
+    assert [row["Appointment ID"] for row in data] == ["a2", "a3", "a1", "a4"]  # equal amounts keep their order
+
+
+def test_text_sorts_numbers_first_then_case_folded(store):
+    data = [{"Name": name} for name in ("bob", "10", "Ann", "9", "alice")]
+    assert [row["Name"] for row in store.SortEngine.sort(data, ["Name"])] == ["9", "10", "alice", "Ann", "bob"]
+
+
+def test_bubble_sort_keeps_its_interface(store):
+    data = rows(("a1", "2025-03-03", "", ""), ("a2", "2025-01-01", "", ""))
+    assert [row["Appointment ID"] for row in store.SearchSortManager.bubble_sort(data, "Date", False)] == ["a1", "a2"]
+
+
+def test_top_k_matches_a_full_sort(store):
+    data = [dict(zip(store.CSVManager.TABLES["appointments.csv"],
+                     appointment(f"a{number}", date=f"2025-{number % 12 + 1:02}-{number % 28 + 1:02}")))
+            for number in range(200)]
+    columns = [("Date", False), "Appointment ID"]
+    expected = store.SortEngine.sort(list(data), columns)[:7]
+    assert store.TopK.select(data, 7, columns) == expected
+    assert store.TopK.select(data, 0, columns) == []
+    assert len(store.TopK.select(data[:3], 10, columns)) == 3
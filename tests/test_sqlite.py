@@ -0,0 +1,38 @@
+import pytest
+
+import meditrack_sqlite
+from conftest import appointment, write_rows
+
+
+@pytest.fixture
+def sqlite(tmp_path, monkeypatch):
+    """meditrack_sqlite on an empty database of its own"""
+    monkeypatch.setattr(meditrack_sqlite, "DATABASE", str(tmp_path / "meditrack.db"))
+    meditrack_sqlite.SQLiteStore._local.connection = None
+    yield meditrack_sqlite
+    meditrack_sqlite.SQLiteStore._local.connection.close()
+    meditrack_sqlite.SQLiteStore._local.connection = None
+
+
+def test_views_return_records_like_the_csv_managers(store, sqlite):
+    sqlite.SQLiteStore.insert("appointments", appointment("a1"))
+    sqlite.SQLiteStore.insert("appointments", appointment("a2", patient_id="p2"))
+    sqlite.SQLiteStore.insert("billing", ["i1", "p1", "Ann", "100", "Cash", "Paid", "2025-03-26"])
+
+    rows = sqlite.AppointmentManager.view_appointments(patient_id="p1")
+    records = sqlite.AppointmentManager.view_appointments(patient_id="p1", as_records=True)
+    assert isinstance(records[0], store.Appointment)
+    assert [record.to_dict() for record in records] == rows
+    assert records[0].appointment_id == "a1"
+    assert isinstance(sqlite.PaymentManager.view_payments(as_records=True)[0], store.Payment)
+    for view in (sqlite.PatientManager.view_all_patients, sqlite.DoctorManager.view_all_doctors,
+                 sqlite.PrescriptionManager.view_prescriptions, sqlite.MedicalRecordManager.view_records):
+        assert view(as_records=True) == []
+
+
+def test_migration_copies_the_csv_tables(store, sqlite):
+    write_rows("appointments.csv", [appointment("a1")])
+    sqlite.SQLiteStore.migrate_from_csv(store.CSVManager.iter_raw_rows)
+    assert [row["Appointment ID"] for row in sqlite.AppointmentManager.view_appointments()] == ["a1"]
+    with pytest.raises(ValueError):
+        sqlite.SQLiteStore.migrate_from_csv(store.CSVManager.iter_raw_rows)
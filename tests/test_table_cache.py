@@ -0,0 +1,43 @@
+from conftest import appointment, write_rows
+
+
+def test_unchanged_table_is_served_from_the_cache(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert store.TableCache.get_rows("appointments.csv") is rows
+    assert [row["Appointment ID"] for row in rows] == ["a1"]
+
+
+def test_external_write_invalidates_the_cache(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    store.TableCache.get_rows("appointments.csv")
+    write_rows("appointments.csv", [appointment("a2")])
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert [row["Appointment ID"] for row in rows] == ["a1", "a2"]
+
+
+def test_append_row_keeps_the_cached_rows_in_step(store):
+    rows = store.TableCache.get_rows("appointments.csv")
+    store.TableCache.append_row("appointments.csv", appointment("a1"))
+    appended = store.TableCache.get_rows("appointments.csv")
+    assert appended is rows
+    assert appended[-1]["Appointment ID"] == "a1"
+    with open("appointments.csv", newline='') as file:
+        assert file.read().splitlines()[-1].startswith("a1,p1")
+
+
+def test_change_log_is_merged_into_cached_rows(store):
+    write_rows("appointments.csv", [appointment("a1"), appointment("a2")])
+    store.TableCache.get_rows("appointments.csv")
+    store.ChangeLog.delete("appointments.csv", "a1")
+    store.ChangeLog.update("appointments.csv", "a2", "Status", "Completed")
+    rows = store.TableCache.get_rows("appointments.csv")
+    assert [(row["Appointment ID"], row["Status"]) for row in rows] == [("a2", "Completed")]
+
+
+def test_records_follow_the_rows(store):
+    write_rows("appointments.csv", [appointment("a1")])
+    records = store.TableCache.get_records("appointments.csv")
+    assert isinstance(records[0], store.Appointment)
+    write_rows("appointments.csv", [appointment("a2")])
+    assert [record["Appointment ID"] for record in store.TableCache.get_records("appointments.csv")] == ["a1", "a2"]
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import appointment
+
+fcntl = pytest.importorskip("fcntl")  # Windows has only exclusive locks
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRY_LOCK = """
+import fcntl, os, sys
+fd = os.open("appointments.csv.lock", os.O_RDWR | os.O_CREAT)
+try:
+    fcntl.flock(fd, (fcntl.LOCK_EX if sys.argv[1] == "exclusive" else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+except BlockingIOError:
+    sys.exit(1)
+"""
+
+APPEND = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import meditrack_store
+row = ["", "p1", "", "d1", "", "2025-03-03", "10:00", "Checkup", "Scheduled"]
+for number in range(50):
+    meditrack_store.TableCache.append_row("appointments.csv", [sys.argv[2] + str(number)] + row[1:])
+"""
+
+
+def another_process_can_lock(mode):
+    return subprocess.run([sys.executable, "-c", TRY_LOCK, mode]).returncode == 0
+
+
+def test_readers_share_and_writers_exclude(store):
+    with store.TableLock.shared("appointments.csv"):
+        assert another_process_can_lock("shared")
+        assert not another_process_can_lock("exclusive")
+    with store.TableLock.exclusive("appointments.csv"):
+        assert not another_process_can_lock("shared")
+    assert another_process_can_lock("exclusive")
+
+
+def test_locks_are_reentrant_and_upgrade(store):
+    with store.TableLock.shared("appointments.csv"):
+        with store.TableLock.exclusive("appointments.csv"):
+            store.TableCache.append_row("appointments.csv", appointment("a1"))
+            assert not another_process_can_lock("shared")
+        assert not another_process_can_lock("shared")  # the upgrade lasts until the outermost release
+    assert another_process_can_lock("exclusive")
+    assert store.TableLock.wait_stats["appointments.csv"]["acquisitions"] > 2
+
+
+def test_concurrent_writers_lose_no_rows(store):
+    writers = [subprocess.Popen([sys.executable, "-c", APPEND, REPO, prefix]) for prefix in ("x", "y", "z")]
+    assert [writer.wait() for writer in writers] == [0, 0, 0]
+    ids = [row["Appointment ID"] for row in store.CSVManager.iter_rows("appointments.csv")]
+    assert sorted(ids) == sorted(prefix + str(number) for prefix in "xyz" for number in range(50))
+    assert store.RowIndex.lookup("appointments.csv", "z49")["Patient ID"] == "p1"
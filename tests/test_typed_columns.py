@@ -0,0 +1,68 @@
+import datetime
+import decimal
+
+from conftest import write_rows
+
+
+def test_dates_times_and_amounts_decode_to_native_values(store):
+    decode = store.TypedColumns.decode
+    assert decode("Date", "3/3/25") == decode("Date", "2025-03-03") == datetime.date(2025, 3, 3)
+    assert decode("Time", "2:30 PM") == datetime.time(14, 30)
+    assert decode("Amount", "1,250.50") == decimal.Decimal("1250.50")
+    assert decode("Date", "") is None
+    assert decode("Notes", "3/3/25") == "3/3/25"
+
+
+def test_report_lists_normalised_and_invalid_values(store):
+    write_rows("billing.csv", [["i1", "p1", "", "100£", "Cash", "Paid", "soon"],
+                               ["i2", "p1", "", "20", "Cash", "Paid", "2025-01-01"]])
+    problems = store.TypedColumns.report("billing.csv")["billing.csv"]
+    assert problems["Amount"] == {"normalised": [("i1", "100£")]}
+    assert problems["Date"] == {"invalid": [("i1", "soon")]}
+
+
+def test_report_lists_undecodable_bytes_instead_of_failing(store):
+    with open("billing.csv", mode='ab') as file:
+        file.write(b"i1,p1,,100,Ca\xff\xfesh,Paid,2025-03-26\r\n")
+    problems = store.TypedColumns.report()
+    examples = problems["billing.csv"]["Payment Method"]["undecodable"]
+    assert [key for key, _ in examples] == ["i1"]
+
+
+def test_an_unreadable_table_does_not_hide_the_others(store, monkeypatch):
+    write_rows("billing.csv", [["i1", "p1", "", "100", "Cash", "Paid", "soon"]])
+    get_rows = store.TableCache.get_rows
+
+    def failing(filename):
+        if filename == "appointments.csv":
+            raise UnicodeDecodeError("utf-8", b"\xa3", 0, 1, "invalid start byte")
+        return get_rows(filename)
+    monkeypatch.setattr(store.TableCache, "get_rows", failing)
+
+    problems = store.TypedColumns.report()
+    assert list(problems["appointments.csv"]) == [""]
+    assert problems["appointments.csv"][""]["unreadable"][0][1].startswith("'utf-8' codec")
+    assert problems["billing.csv"]["Date"] == {"invalid": [("i1", "soon")]}
+
+
+def test_memo_is_bounded_and_skips_text(store, monkeypatch):
+    monkeypatch.setattr(store.TypedColumns, "DECODED_LIMIT", 10)
+    for amount in range(25):
+        store.TypedColumns.decode("Amount", str(amount))
+    assert len(store.TypedColumns._decoded) <= 10
+    store.TypedColumns._decoded.clear()
+    store.TypedColumns.range_filter([{"Notes": f"note {n}"} for n in range(100)], "Notes", "note 1", "note 5")
+    assert store.TypedColumns._decoded == {}
+
+
+def test_two_digit_birth_years_are_never_in_the_future(store):
+    decode = store.TypedColumns.decode
+    assert decode("DOB", "5/5/45") == datetime.date(1945, 5, 5)
+    assert decode("DOB", "1/5/06") == datetime.date(2006, 1, 5)
+    assert decode("DOB", "5/5/2045") == datetime.date(2045, 5, 5)  # a four-digit year is taken as written
+    assert decode("Date", "5/5/45") == datetime.date(2045, 5, 5)  # appointments may well be ahead
+
+    patients = [{"Name": name, "DOB": dob} for name, dob in (("Ann", "5/5/45"), ("Bob", "1/5/06"), ("Cy", "2/2/70"))]
+    assert [row["Name"] for row in store.SortEngine.sort(patients, ["DOB"])] == ["Ann", "Cy", "Bob"]
+    born = store.TypedColumns.range_filter(patients, "DOB", high=datetime.date(1980, 1, 1))
+    assert [row["Name"] for row in born] == ["Ann", "Cy"]